@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.services.batch_service import BatchService
+
+router = APIRouter()
+
+@router.get("/{batch_id}")
+async def get_batch(batch_id: str, db: Session = Depends(get_db)):
+    """Get a batch with its aggregated progress"""
+    batch_service = BatchService(db)
+    batch = batch_service.get_batch(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return batch
+
+@router.get("/{batch_id}/results")
+async def get_batch_results(batch_id: str, db: Session = Depends(get_db)):
+    """Download the batch's results as NDJSON, one line per input in input order"""
+    batch_service = BatchService(db)
+    if not batch_service.get_batch(batch_id):
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return StreamingResponse(
+        batch_service.iter_results_ndjson(batch_id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="batch-{batch_id}.ndjson"'}
+    )
+
+@router.post("/{batch_id}/cancel")
+async def cancel_batch(batch_id: str, db: Session = Depends(get_db)):
+    """Cancel every unfinished execution of a batch"""
+    batch_service = BatchService(db)
+    batch = await batch_service.cancel_batch(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found or already finished")
+    return batch
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import uuid
@@ -6,7 +6,10 @@ from datetime import datetime
 
 from app.core.database import get_db
 from app.models.crew import Crew, CrewCreate, CrewUpdate, CrewResponse
+from app.models.batch import BatchCreate
 from app.services.crew_service import CrewService
+from app.services.batch_service import BatchService
+from app.services.execution_queue import ExecutionQueueFullError
 
 router = APIRouter()
 
@@ -58,14 +61,52 @@ async def delete_crew(crew_id: str, db: Session = Depends(get_db)):
     return {"message": "Crew deleted successfully"}
 
 @router.post("/{crew_id}/execute")
-async def execute_crew(crew_id: str, db: Session = Depends(get_db)):
-    """Execute a crew"""
+async def execute_crew(
+    crew_id: str,
+    max_parallel_tasks: Optional[int] = Query(None, ge=1),
+    token_budget: Optional[int] = Query(None, ge=1),
+    api_call_budget: Optional[int] = Query(None, ge=1),
+    time_budget_seconds: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_db)
+):
+    """Execute a crew; budgets given here override the crew's for this run"""
     crew_service = CrewService(db)
-    execution = crew_service.execute_crew(crew_id)
+    try:
+        execution = crew_service.execute_crew(
+            crew_id,
+            max_parallel_tasks=max_parallel_tasks,
+            token_budget=token_budget,
+            api_call_budget=api_call_budget,
+            time_budget_seconds=time_budget_seconds
+        )
+    except ExecutionQueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(int(e.retry_after))}
+        )
     if not execution:
         raise HTTPException(status_code=404, detail="Crew not found")
     return execution
 
+@router.post("/{crew_id}/batch")
+async def execute_crew_batch(crew_id: str, batch: BatchCreate, db: Session = Depends(get_db)):
+    """Run a crew once per input, at most `concurrency` runs at a time"""
+    batch_service = BatchService(db)
+    try:
+        created = batch_service.create_batch(crew_id, batch.inputs, concurrency=batch.concurrency)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExecutionQueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(int(e.retry_after))}
+        )
+    if not created:
+        raise HTTPException(status_code=404, detail="Crew not found")
+    return created
+
 @router.get("/{crew_id}/export")
 async def export_crew(crew_id: str, db: Session = Depends(get_db)):
     """Export crew configuration"""
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from datetime import datetime
 
 from app.core.database import get_db
 from app.services.execution_service import ExecutionService
+from app.services.execution_queue import ExecutionQueueFullError
 
 router = APIRouter()
 
@@ -19,6 +22,30 @@ async def get_executions(
     executions = execution_service.get_executions(skip=skip, limit=limit, status=status)
     return executions
 
+@router.get("/summaries")
+async def get_execution_summaries(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    crew_id: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """Execution summaries, newest first; pass `next_cursor` back as `cursor` for the next page"""
+    execution_service = ExecutionService(db)
+    try:
+        return execution_service.get_execution_page(
+            limit=limit,
+            cursor=cursor,
+            status=status,
+            crew_id=crew_id,
+            created_after=created_after,
+            created_before=created_before
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/{execution_id}")
 async def get_execution(execution_id: str, db: Session = Depends(get_db)):
     """Get a specific execution by ID"""
@@ -28,18 +55,91 @@ async def get_execution(execution_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Execution not found")
     return execution
 
+def _parse_range(header: str, size: int) -> Tuple[int, int]:
+    """(start, end) inclusive for a single "bytes=" range; raises 416 if it can't be satisfied"""
+    unit, _, spec = header.partition("=")
+    start_text, _, end_text = spec.strip().partition("-")
+    try:
+        if unit.strip() != "bytes" or "," in spec:
+            raise ValueError
+        if start_text:
+            start = int(start_text)
+            end = min(int(end_text), size - 1) if end_text else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(0, size - int(end_text))
+            end = size - 1
+    except ValueError:
+        start, end = size, size - 1
+    if start > end or start >= size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+@router.get("/{execution_id}/result")
+async def get_execution_result(execution_id: str, request: Request, db: Session = Depends(get_db)):
+    """Download an execution's result; supports single byte-range requests"""
+    execution_service = ExecutionService(db)
+    result = execution_service.get_execution_result(execution_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Execution result not found")
+    
+    size = result["size"]
+    headers = {"Accept-Ranges": "bytes"}
+    if result["hash"]:
+        headers["ETag"] = f'"{result["hash"]}"'
+    range_header = request.headers.get("range")
+    if range_header and size:
+        start, end = _parse_range(range_header, size)
+        headers.update({"Content-Range": f"bytes {start}-{end}/{size}", "Content-Length": str(end - start + 1)})
+        return StreamingResponse(
+            result["iter_range"](start, end),
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
+            media_type="text/markdown; charset=utf-8",
+            headers=headers
+        )
+    
+    headers["Content-Length"] = str(size)
+    return StreamingResponse(result["iter_range"](0, None), media_type="text/markdown; charset=utf-8", headers=headers)
+
 @router.get("/{execution_id}/logs")
-async def get_execution_logs(execution_id: str, db: Session = Depends(get_db)):
-    """Get execution logs"""
+async def get_execution_logs(
+    execution_id: str,
+    after_seq: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Get execution logs after the `after_seq` cursor; pass back `next_after_seq` to tail or page"""
     execution_service = ExecutionService(db)
-    logs = execution_service.get_execution_logs(execution_id)
-    return {"logs": logs}
+    page = execution_service.get_execution_logs(execution_id, after_seq=after_seq, limit=limit)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    return page
 
 @router.post("/{execution_id}/cancel")
 async def cancel_execution(execution_id: str, db: Session = Depends(get_db)):
     """Cancel an execution"""
     execution_service = ExecutionService(db)
-    success = execution_service.cancel_execution(execution_id)
-    if not success:
+    cancellation = await execution_service.cancel_execution(execution_id)
+    if cancellation is None:
         raise HTTPException(status_code=404, detail="Execution not found or cannot be cancelled")
-    return {"message": "Execution cancelled successfully"} 
\ No newline at end of file
+    return {"message": "Execution cancelled successfully", **cancellation} 
+
+@router.post("/{execution_id}/resume")
+async def resume_execution(execution_id: str, db: Session = Depends(get_db)):
+    """Resume a failed or cancelled execution from its last completed task"""
+    execution_service = ExecutionService(db)
+    try:
+        execution = await execution_service.resume_execution(execution_id)
+    except ExecutionQueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(int(e.retry_after))}
+        )
+    if not execution:
+        raise HTTPException(status_code=404, detail="Execution not found or cannot be resumed")
+    return execution
@@ -4,6 +4,7 @@ from typing import List
 
 from app.core.database import get_db
 from app.services.execution_service import ExecutionService
+from app.services.cerebras_service import CerebrasService
 
 router = APIRouter()
 
@@ -31,4 +32,16 @@ async def get_system_metrics(db: Session = Depends(get_db)):
     """Get system metrics"""
     execution_service = ExecutionService(db)
     metrics = execution_service.get_system_metrics()
-    return metrics 
\ No newline at end of file
+    return metrics
+
+@router.get("/models")
+async def get_models():
+    """Get available models (served from the model catalog cache)"""
+    cerebras_service = CerebrasService()
+    return await cerebras_service.get_model_info()
+
+@router.get("/models/{model_id}/status")
+async def get_model_status(model_id: str):
+    """Get the status of a model (served from the model catalog cache)"""
+    cerebras_service = CerebrasService()
+    return await cerebras_service.get_model_status(model_id)
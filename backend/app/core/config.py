@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional, List
+from typing import Optional, List, Dict
 import os
 
 class Settings(BaseSettings):
@@ -20,12 +20,108 @@ class Settings(BaseSettings):
     # Cerebras Configuration
     CEREBRAS_API_KEY: Optional[str] = None
     CEREBRAS_BASE_URL: str = "https://api.cerebras.ai"
+    # Optional pool of endpoints/keys, e.g. [{"base_url": "https://api.cerebras.ai", "api_key": "...", "name": "key-a"}];
+    # empty uses CEREBRAS_BASE_URL + CEREBRAS_API_KEY
+    CEREBRAS_ENDPOINTS: List[Dict[str, str]] = []
+    CEREBRAS_ENDPOINT_EJECT_SECONDS: float = 30.0  # how long a throttled/failing endpoint is skipped
+    CEREBRAS_ENDPOINT_ERROR_THRESHOLD: int = 3  # consecutive errors before ejection
     CEREBRAS_MODEL_ID: str = "llama-4-maverick-17b-128e-instruct"
+    CEREBRAS_RATE_LIMIT_ENABLED: bool = True
+    CEREBRAS_REQUESTS_PER_MINUTE: int = 30
+    CEREBRAS_TOKENS_PER_MINUTE: int = 60000
+    CEREBRAS_MAX_RETRIES: int = 3
+    CEREBRAS_RETRY_BASE_DELAY: float = 0.5  # seconds
+    CEREBRAS_RETRY_MAX_DELAY: float = 8.0  # seconds
+    CEREBRAS_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CEREBRAS_CIRCUIT_RECOVERY_TIMEOUT: float = 30.0  # seconds
+    CEREBRAS_CASSETTE_MODE: str = "off"  # off | record | replay
+    CEREBRAS_CASSETTE_PATH: str = "./cassettes/cerebras.db"
+    CEREBRAS_CASSETTE_LATENCY_SCALE: float = 1.0  # 0 replays instantly
+    CEREBRAS_HEDGING_ENABLED: bool = False  # default for calls that don't opt in/out explicitly
+    CEREBRAS_HEDGE_PERCENTILE: float = 95.0  # hedge once the call is slower than this latency percentile
+    CEREBRAS_HEDGE_BUDGET_RATIO: float = 0.05  # max hedges per primary request
+    CEREBRAS_HEDGE_MODEL_ID: str = ""  # fallback tier for hedges, e.g. llama-4-scout-17b-16e-instruct; empty = same model
+    CEREBRAS_HEDGE_MIN_SAMPLES: int = 20
+    CEREBRAS_HEDGE_WINDOW: int = 200  # recent latency samples kept per model
+    
+    # Token counting / context window fitting
+    TOKENIZER_ENCODING: str = "cl100k_base"
+    DEFAULT_CONTEXT_LENGTH: int = 8192
+    CONTEXT_SAFETY_MARGIN_TOKENS: int = 64  # slack for tokenizer mismatch with the served model
+    MIN_COMPLETION_TOKENS: int = 256
+    
+    # Model catalog cache
+    MODEL_CATALOG_TTL: float = 300.0  # seconds
+    MODEL_CATALOG_MAX_STALE: float = 3600.0  # seconds a stale entry may be served while revalidating
+    MODEL_CATALOG_REFRESH_INTERVAL: float = 240.0  # seconds
+    MODEL_STATUS_TTL: float = 10.0  # seconds
+    MODEL_STATUS_MAX_KEYS: int = 100  # models whose status is cached and refreshed
+    
+    # Outbound HTTP client pool
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 100
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = 30.0  # seconds
+    HTTP_CLIENT_TIMEOUT: float = 30.0  # seconds
+    HTTP_CLIENT_CONNECT_TIMEOUT: float = 10.0  # seconds
+    HTTP_CLIENT_POOL_TIMEOUT: float = 10.0  # seconds
+    HTTP_CLIENT_HTTP2: bool = False
+    
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = "./llm_cache.db"
+    LLM_CACHE_MEMORY_ENTRIES: int = 512
+    LLM_CACHE_DISK_ENTRIES: int = 10000
+    LLM_CACHE_TTL: int = 7 * 24 * 3600  # seconds, 0 disables expiry
+    
+    # Execution results (large reports go to a content-addressed blob store)
+    BLOB_STORE_PATH: str = "./blobs"
+    BLOB_STORE_COMPRESSION_LEVEL: int = 6  # gzip level 1-9
+    RESULT_BLOB_THRESHOLD: int = 4096  # results of at least this many bytes are stored as blobs
+    RESULT_PREVIEW_CHARS: int = 280  # start of the result kept on the row for list views
     
     # CrewAI Configuration
     CREWAI_VERBOSE: bool = True
     CREWAI_MAX_ITERATIONS: int = 10
     
+    # Execution worker pool
+    EXECUTION_WORKERS: int = 4  # executions running at once
+    EXECUTION_QUEUE_MAX_DEPTH: int = 100  # queued executions beyond this are rejected with 503
+    EXECUTION_LEASE_SECONDS: int = 60  # a job whose lease isn't renewed within this is claimed again
+    EXECUTION_HEARTBEAT_INTERVAL: float = 15.0  # seconds between lease renewals
+    EXECUTION_QUEUE_POLL_INTERVAL: float = 1.0  # idle workers check for jobs from other processes this often
+    EXECUTION_MAX_ATTEMPTS: int = 3  # crashed or abandoned executions are retried up to this many runs
+    EXECUTION_RETRY_BACKOFF: float = 5.0  # seconds before the first retry of a crashed run, doubled per attempt
+    EXECUTION_CANCEL_POLL_INTERVAL: float = 1.0  # how often a run checks for a cancel made in another process
+    EXECUTION_CANCEL_TIMEOUT: float = 5.0  # how long a cancel request waits for a local run to stop
+    EXECUTION_RESUME_ORPHANS: bool = True  # at startup, resume runs interrupted by a restart (else mark them failed)
+    
+    # Batch executions (one crew over many inputs)
+    BATCH_MAX_INPUTS: int = 1000
+    BATCH_DEFAULT_CONCURRENCY: int = 4  # child executions queued or running at once per batch (at most EXECUTION_WORKERS)
+    
+    # Task result memoization across executions
+    TASK_MEMO_ENABLED: bool = True
+    TASK_MEMO_TTL: int = 7 * 24 * 3600  # seconds, 0 disables expiry
+    
+    # Execution logs (write-behind to the execution_logs table)
+    EXECUTION_LOG_FLUSH_SIZE: int = 50  # pending entries that trigger a flush
+    EXECUTION_LOG_FLUSH_INTERVAL: float = 0.5  # seconds between periodic flushes
+    EXECUTION_LOG_PAGE_SIZE: int = 100  # entries included with an execution's details
+    EXECUTION_LOG_MAX_PENDING: int = 10000  # buffered entries kept while the database can't be written
+    
+    # Task scheduling
+    EXECUTION_MAX_PARALLEL_TASKS: int = 4  # default per execution; crews and single runs can override
+    
+    # Execution budgets (0 = unlimited); crews and single runs can override
+    EXECUTION_TOKEN_BUDGET: int = 0
+    EXECUTION_API_CALL_BUDGET: int = 0
+    EXECUTION_TIME_BUDGET_SECONDS: int = 0
+    EXECUTION_BUDGET_WARN_RATIO: float = 0.8  # share of a budget that triggers a warning log
+    
+    # Execution streaming (token_delta WebSocket batching)
+    EXECUTION_STREAM_FLUSH_INTERVAL: float = 0.05  # seconds
+    EXECUTION_STREAM_FLUSH_CHARS: int = 64
+    
     # Redis (for Celery)
     REDIS_URL: str = "redis://localhost:6379"
     
@@ -1,13 +1,16 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, JSON, ForeignKey
+from sqlalchemy import create_engine, inspect, text, Column, Integer, String, DateTime, Boolean, Text, JSON, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from sqlalchemy.sql import func
 from datetime import datetime
 from typing import Optional
 import json
+import logging
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 # Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
@@ -39,6 +42,11 @@ class Crew(Base):
     category = Column(String)
     rating = Column(Integer, default=0)
     featured = Column(Boolean, default=False)
+    llm_cache_enabled = Column(Boolean, default=False)  # cache sampled (temperature > 0) completions
+    max_parallel_tasks = Column(Integer)  # None uses EXECUTION_MAX_PARALLEL_TASKS
+    token_budget = Column(Integer)  # budgets per execution; None uses the EXECUTION_*_BUDGET settings
+    api_call_budget = Column(Integer)
+    time_budget_seconds = Column(Integer)
     executions = Column(Integer, default=0)
     last_executed = Column(DateTime)
     created_at = Column(DateTime, default=func.now())
@@ -103,13 +111,101 @@ class Execution(Base):
     duration = Column(Integer, default=0)  # in milliseconds
     tokens_used = Column(Integer, default=0)
     api_calls = Column(Integer, default=0)
-    result = Column(Text)
-    logs = Column(JSON)
+    max_parallel_tasks = Column(Integer)  # per-run override of the crew's task parallelism
+    token_budget = Column(Integer)  # per-run overrides of the crew's budgets
+    api_call_budget = Column(Integer)
+    time_budget_seconds = Column(Integer)
+    inputs = Column(JSON)  # variables interpolated into the crew's prompts, e.g. {"company": "..."}
+    batch_id = Column(String, ForeignKey("execution_batches.id"), index=True)
+    batch_index = Column(Integer)  # position of this run's inputs in its batch
+    telemetry = Column(JSON)  # per-call LLM usage and timing, aggregated per agent
+    result = Column(Text)  # small results only, larger ones live in the blob store
+    result_hash = Column(String)  # sha256 of a result kept in the blob store
+    result_size = Column(Integer)  # bytes (UTF-8)
+    result_preview = Column(Text)
+    logs = Column(JSON)  # legacy; entries now live in execution_logs
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
     # Relationships
     crew = relationship("Crew", back_populates="executions_rel")
+    
+    # Keyset pagination of the executions list, newest first, optionally filtered
+    __table_args__ = (
+        Index("ix_executions_created", "created_at", "id"),
+        Index("ix_executions_status_created", "status", "created_at", "id"),
+        Index("ix_executions_crew_created", "crew_id", "created_at", "id"),
+    )
+
+class ExecutionBatch(Base):
+    """One crew run over many inputs; each input becomes a child execution"""
+    __tablename__ = "execution_batches"
+    
+    id = Column(String, primary_key=True, index=True)
+    crew_id = Column(String, ForeignKey("crews.id"))
+    crew_name = Column(String)
+    status = Column(String, default="running")  # running | completed | cancelled
+    total = Column(Integer, default=0)
+    concurrency = Column(Integer, default=1)  # children queued or running at once
+    created_at = Column(DateTime, default=func.now())
+    completed_at = Column(DateTime)
+
+class ExecutionJob(Base):
+    """Durable queue entry for an execution, claimed by workers under a time-limited lease"""
+    __tablename__ = "execution_jobs"
+    
+    execution_id = Column(String, ForeignKey("executions.id"), primary_key=True)
+    status = Column(String, default="queued")  # queued | leased | done | failed
+    attempts = Column(Integer, default=0)
+    available_at = Column(DateTime, default=func.now())  # not claimable before (retry backoff)
+    lease_owner = Column(String)
+    lease_expires_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)
+    last_error = Column(Text)
+    enqueued_at = Column(DateTime, default=func.now())
+    finished_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index("ix_execution_jobs_claim", "status", "available_at"),
+        Index("ix_execution_jobs_lease", "status", "lease_expires_at"),
+    )
+
+class ExecutionCheckpoint(Base):
+    """Output of a completed task of an execution, used to resume it without redoing the task"""
+    __tablename__ = "execution_checkpoints"
+    
+    execution_id = Column(String, ForeignKey("executions.id"), primary_key=True)
+    task_id = Column(String, primary_key=True)
+    task_name = Column(String)
+    output = Column(Text)
+    tokens_used = Column(Integer, default=0)
+    call = Column(JSON)  # the task's LLM call record (usage and timing)
+    upstream = Column(JSON)  # ids of the tasks whose outputs were fed into this one
+    completed_at = Column(DateTime, default=func.now())
+
+class TaskResult(Base):
+    """Memoized task output, reused by any execution whose task inputs hash to the same key"""
+    __tablename__ = "task_results"
+    
+    key = Column(String, primary_key=True)
+    crew_id = Column(String)
+    task_id = Column(String)
+    task_name = Column(String)
+    output = Column(Text)
+    tokens_used = Column(Integer, default=0)
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, default=func.now())
+    last_used_at = Column(DateTime, default=func.now())
+
+class ExecutionLog(Base):
+    """Append-only execution log entry; seq orders the entries of one execution"""
+    __tablename__ = "execution_logs"
+    
+    execution_id = Column(String, ForeignKey("executions.id"), primary_key=True)
+    seq = Column(Integer, primary_key=True, autoincrement=False)
+    timestamp = Column(DateTime, default=func.now())
+    type = Column(String, default="info")
+    message = Column(Text)
 
 class Template(Base):
     __tablename__ = "templates"
@@ -134,4 +230,37 @@ class SystemMetrics(Base):
     disk_usage = Column(Integer, default=0)
     active_executions = Column(Integer, default=0)
     total_executions = Column(Integer, default=0)
-    timestamp = Column(DateTime, default=func.now()) 
\ No newline at end of file
+    timestamp = Column(DateTime, default=func.now())
+
+
+def upgrade_schema(bind=engine):
+    """Create missing tables and add the columns models gained since their table was created
+    
+    create_all never alters existing tables, so databases created by an older version would
+    fail on any query of a new column. New columns are added as nullable ALTER TABLE ... ADD
+    COLUMN, existing rows get the column's scalar default, and missing indexes are created.
+    Safe to run on every startup.
+    """
+    Base.metadata.create_all(bind=bind)
+    inspector = inspect(bind)
+    quote = bind.dialect.identifier_preparer.quote
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                conn.execute(text(
+                    f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column.type.compile(dialect=bind.dialect)}"
+                ))
+                if column.default is not None and column.default.is_scalar:
+                    # Plain SQL: the model's onupdate columns may not exist yet either
+                    conn.execute(text(f"UPDATE {quote(table.name)} SET {quote(column.name)} = :value"), {"value": column.default.arg})
+                logger.info(f"Added column {table.name}.{column.name}")
+            
+            # Indexes declared on a table after it was created
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(bind=conn)
+                    logger.info(f"Created index {index.name}")
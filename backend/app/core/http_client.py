@@ -0,0 +1,82 @@
+import logging
+from typing import Dict, Any, Optional
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class HTTPClientManager:
+    """Process-wide pooled HTTP client shared by outbound API integrations"""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _create_client(self) -> httpx.AsyncClient:
+        http2 = settings.HTTP_CLIENT_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 requested but the 'h2' package is not installed. Falling back to HTTP/1.1.")
+                http2 = False
+
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY
+        )
+        timeout = httpx.Timeout(
+            settings.HTTP_CLIENT_TIMEOUT,
+            connect=settings.HTTP_CLIENT_CONNECT_TIMEOUT,
+            pool=settings.HTTP_CLIENT_POOL_TIMEOUT
+        )
+        return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+
+    async def start(self):
+        """Create the shared client (called from the app lifespan)"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+            logger.info(
+                f"HTTP client pool started (max_connections={settings.HTTP_CLIENT_MAX_CONNECTIONS}, "
+                f"max_keepalive={settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS})"
+            )
+
+    async def close(self):
+        """Close the shared client and release pooled connections"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("HTTP client pool closed")
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Get the shared client, creating it lazily outside of the app lifespan"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics"""
+        stats = {
+            "started": self._client is not None and not self._client.is_closed,
+            "max_connections": settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+            "http2": settings.HTTP_CLIENT_HTTP2,
+            "connections": 0,
+            "in_use": 0,
+            "idle": 0
+        }
+        if not stats["started"]:
+            return stats
+
+        # httpcore keeps the live connections on the transport's pool
+        pool = getattr(self._client._transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        idle = sum(1 for conn in connections if conn.is_idle())
+        stats["connections"] = len(connections)
+        stats["idle"] = idle
+        stats["in_use"] = len(connections) - idle
+        return stats
+
+http_client_manager = HTTPClientManager()
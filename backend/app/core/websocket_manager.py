@@ -88,4 +88,6 @@ class WebSocketManager:
             await websocket.send_text(message_json)
         except Exception as e:
             logger.error(f"Error sending personal message: {e}")
-            await self.disconnect(websocket) 
\ No newline at end of file
+            await self.disconnect(websocket)
+
+websocket_manager = WebSocketManager()
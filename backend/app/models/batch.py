@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, Any
+
+class BatchCreate(BaseModel):
+    inputs: List[Dict[str, Any]] = Field(..., min_length=1)
+    concurrency: Optional[int] = Field(None, ge=1)
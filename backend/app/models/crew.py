@@ -13,6 +13,11 @@ class CrewCreate(BaseModel):
     description: Optional[str] = Field(None, max_length=500)
     category: Optional[str] = Field(None, max_length=50)
     status: CrewStatus = CrewStatus.ACTIVE
+    llm_cache_enabled: bool = False
+    max_parallel_tasks: Optional[int] = Field(None, ge=1)
+    token_budget: Optional[int] = Field(None, ge=1)
+    api_call_budget: Optional[int] = Field(None, ge=1)
+    time_budget_seconds: Optional[int] = Field(None, ge=1)
     agents: Optional[List[Dict[str, Any]]] = []
     tasks: Optional[List[Dict[str, Any]]] = []
 
@@ -21,6 +26,11 @@ class CrewUpdate(BaseModel):
     description: Optional[str] = Field(None, max_length=500)
     category: Optional[str] = Field(None, max_length=50)
     status: Optional[CrewStatus] = None
+    llm_cache_enabled: Optional[bool] = None
+    max_parallel_tasks: Optional[int] = Field(None, ge=1)
+    token_budget: Optional[int] = Field(None, ge=1)
+    api_call_budget: Optional[int] = Field(None, ge=1)
+    time_budget_seconds: Optional[int] = Field(None, ge=1)
     agents: Optional[List[Dict[str, Any]]] = None
     tasks: Optional[List[Dict[str, Any]]] = None
 
@@ -32,6 +42,11 @@ class CrewResponse(BaseModel):
     category: Optional[str]
     rating: int = 0
     featured: bool = False
+    llm_cache_enabled: bool = False
+    max_parallel_tasks: Optional[int] = None
+    token_budget: Optional[int] = None
+    api_call_budget: Optional[int] = None
+    time_budget_seconds: Optional[int] = None
     executions: int = 0
     last_executed: Optional[datetime] = None
     created_at: datetime
@@ -0,0 +1,238 @@
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Iterator
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, Crew, Execution, ExecutionBatch, ExecutionJob
+from app.core.websocket_manager import websocket_manager
+from app.services.execution_queue import execution_pool
+from app.services.blob_store import blob_store, BlobNotFoundError
+
+logger = logging.getLogger(__name__)
+
+# Children read per query when streaming batch results
+RESULTS_CHUNK_SIZE = 100
+
+class BatchService:
+    """Runs a crew over many inputs as one batch of child executions
+
+    Only `concurrency` children are queued or running at a time; each child that finishes
+    queues the next ones, from whichever process ran it. Aggregated progress is sent to
+    WebSocket subscribers of the batch id (the same subscribe message as for executions).
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.websocket_manager = websocket_manager
+
+    def create_batch(self, crew_id: str, inputs: List[Dict[str, Any]], concurrency: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Create a batch with one pending execution per input and queue the first ones
+
+        The concurrency is capped at EXECUTION_WORKERS. Raises ValueError if there are more
+        than BATCH_MAX_INPUTS inputs and ExecutionQueueFullError when the queue has no room
+        for the children queued right away.
+        """
+        crew = self.db.query(Crew).filter(Crew.id == crew_id).first()
+        if not crew:
+            return None
+        if len(inputs) > settings.BATCH_MAX_INPUTS:
+            raise ValueError(f"A batch takes at most {settings.BATCH_MAX_INPUTS} inputs")
+
+        # Children beyond what the workers can run at once would only crowd the queue
+        concurrency = min(concurrency or settings.BATCH_DEFAULT_CONCURRENCY, settings.EXECUTION_WORKERS)
+        execution_pool.check_capacity(self.db, min(concurrency, len(inputs)))
+
+        now = datetime.utcnow()
+        batch = ExecutionBatch(
+            id=str(uuid.uuid4()),
+            crew_id=crew_id,
+            crew_name=crew.name,
+            status="running",
+            total=len(inputs),
+            concurrency=concurrency,
+            created_at=now
+        )
+        self.db.add(batch)
+        self.db.add_all([
+            Execution(
+                id=str(uuid.uuid4()),
+                crew_id=crew_id,
+                crew_name=crew.name,
+                status="pending",
+                inputs=item,
+                batch_id=batch.id,
+                batch_index=index,
+                started_at=now,
+                created_at=now,
+                updated_at=now
+            )
+            for index, item in enumerate(inputs)
+        ])
+        self.db.flush()
+        self._refill(batch)
+        self.db.commit()
+
+        return self._progress(batch)
+
+    def get_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        batch = self.db.query(ExecutionBatch).filter(ExecutionBatch.id == batch_id).first()
+        return self._progress(batch) if batch else None
+
+    def _refill(self, batch: ExecutionBatch) -> int:
+        """Queue pending children up to the batch's concurrency; returns how many were queued"""
+        # By status rather than job state: a child that just finished still holds its lease
+        in_flight = self.db.query(Execution).join(
+            ExecutionJob, ExecutionJob.execution_id == Execution.id
+        ).filter(
+            Execution.batch_id == batch.id,
+            Execution.status.in_(["pending", "running"]),
+            ExecutionJob.status.in_(["queued", "leased"])
+        ).count()
+        slots = batch.concurrency - in_flight
+        if slots <= 0:
+            return 0
+
+        waiting = self.db.query(Execution.id).outerjoin(
+            ExecutionJob, ExecutionJob.execution_id == Execution.id
+        ).filter(
+            Execution.batch_id == batch.id,
+            Execution.status == "pending",
+            ExecutionJob.execution_id.is_(None)
+        ).order_by(Execution.batch_index).limit(slots).all()
+        for (execution_id,) in waiting:
+            execution_pool.submit(self.db, execution_id)
+        return len(waiting)
+
+    async def on_child_finished(self, batch_id: str):
+        """Queue the next children, finish the batch when none are left and broadcast progress"""
+        self.db.rollback()
+        # Serialize refills of one batch across processes (no-op on SQLite, which serializes writers anyway)
+        batch = self.db.query(ExecutionBatch).filter(ExecutionBatch.id == batch_id).with_for_update().first()
+        if not batch:
+            return
+        if batch.status == "running":
+            self._refill(batch)
+        progress = self._progress(batch)
+        if batch.status == "running" and progress["pending"] + progress["running"] == 0:
+            batch.status = "completed"
+            batch.completed_at = datetime.utcnow()
+            progress.update(status="completed", completed_at=batch.completed_at.isoformat())
+        self.db.commit()
+
+        await self.websocket_manager.send_to_execution(batch_id, {"type": "batch_progress", "batch": progress})
+        if progress["status"] == "completed":
+            logger.info(f"Batch {batch_id} finished: {progress['completed']} completed, {progress['failed']} failed")
+            await self.websocket_manager.send_to_execution(batch_id, {"type": "batch_completed", "batch": progress})
+
+    async def cancel_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel every child that hasn't finished; running ones are stopped like single executions"""
+        batch = self.db.query(ExecutionBatch).filter(ExecutionBatch.id == batch_id).first()
+        if not batch or batch.status != "running":
+            return None
+
+        now = datetime.utcnow()
+        active = [
+            execution_id for (execution_id,) in self.db.query(Execution.id).filter(
+                Execution.batch_id == batch_id,
+                Execution.status == "running"
+            ).all()
+        ]
+        self.db.query(Execution).filter(
+            Execution.batch_id == batch_id,
+            Execution.status.in_(["pending", "running"])
+        ).update({"status": "cancelled", "completed_at": now}, synchronize_session=False)
+        batch.status = "cancelled"
+        batch.completed_at = now
+        self.db.commit()
+
+        # Runs in other processes notice the status change through their cancel watcher
+        for execution_id in active:
+            await execution_pool.cancel(execution_id)
+
+        progress = self._progress(batch)
+        await self.websocket_manager.send_to_execution(batch_id, {"type": "batch_progress", "batch": progress})
+        return progress
+
+    def _progress(self, batch: ExecutionBatch) -> Dict[str, Any]:
+        """Child counts by status, token totals and an ETA from the throughput so far"""
+        counts = {"pending": 0, "running": 0, "completed": 0, "failed": 0, "cancelled": 0}
+        tokens_used = 0
+        api_calls = 0
+        for status, count, tokens, calls in self.db.query(
+            Execution.status,
+            func.count(Execution.id),
+            func.sum(Execution.tokens_used),
+            func.sum(Execution.api_calls)
+        ).filter(Execution.batch_id == batch.id).group_by(Execution.status).all():
+            counts[status] = counts.get(status, 0) + count
+            tokens_used += tokens or 0
+            api_calls += calls or 0
+
+        finished = counts["completed"] + counts["failed"] + counts["cancelled"]
+        end = batch.completed_at or datetime.utcnow()
+        elapsed = (end - batch.created_at).total_seconds() if batch.created_at else 0.0
+        remaining = batch.total - finished
+        eta = round(elapsed / finished * remaining, 1) if finished and remaining and batch.status == "running" else None
+        return {
+            "id": batch.id,
+            "crew_id": batch.crew_id,
+            "crew_name": batch.crew_name,
+            "status": batch.status,
+            "total": batch.total,
+            "concurrency": batch.concurrency,
+            **counts,
+            "tokens_used": tokens_used,
+            "api_calls": api_calls,
+            "elapsed_seconds": round(elapsed, 1),
+            "eta_seconds": 0.0 if remaining == 0 else eta,
+            "created_at": batch.created_at.isoformat() if batch.created_at else None,
+            "completed_at": batch.completed_at.isoformat() if batch.completed_at else None
+        }
+
+    def iter_results_ndjson(self, batch_id: str) -> Iterator[str]:
+        """One JSON line per child in input order, read in chunks with a session of its own"""
+        db = SessionLocal()
+        try:
+            last_index = -1
+            while True:
+                children = db.query(Execution).filter(
+                    Execution.batch_id == batch_id,
+                    Execution.batch_index > last_index
+                ).order_by(Execution.batch_index).limit(RESULTS_CHUNK_SIZE).all()
+                if not children:
+                    break
+                for child in children:
+                    line = {
+                        "index": child.batch_index,
+                        "execution_id": child.id,
+                        "inputs": child.inputs,
+                        "status": child.status,
+                        "result": child.result,
+                        "tokens_used": child.tokens_used,
+                        "api_calls": child.api_calls,
+                        "duration": child.duration,
+                        "completed_at": child.completed_at.isoformat() if child.completed_at else None
+                    }
+                    if child.result_hash:
+                        try:
+                            line["result"] = blob_store.get(child.result_hash).decode("utf-8")
+                        except BlobNotFoundError as e:
+                            # A missing blob loses this child's result, not the rest of the stream
+                            logger.warning(f"Result of batch child {child.id} is unavailable: {e}")
+                            line["error"] = "result unavailable"
+                    yield json.dumps(line) + "\n"
+                last_index = children[-1].batch_index
+                db.expunge_all()
+        finally:
+            db.close()
+
+    async def resume_batches(self):
+        """Startup: top up running batches whose in-flight children were lost"""
+        batch_ids = [batch_id for (batch_id,) in self.db.query(ExecutionBatch.id).filter(ExecutionBatch.status == "running").all()]
+        for batch_id in batch_ids:
+            await self.on_child_finished(batch_id)
@@ -0,0 +1,91 @@
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bytes decompressed per read when streaming a blob
+READ_CHUNK_SIZE = 64 * 1024
+
+class BlobNotFoundError(Exception):
+    """Raised when a blob hash has no file in the store"""
+
+class BlobStore:
+    """Content-addressed, gzip-compressed blobs on local disk
+
+    A blob is stored once under the SHA-256 of its uncompressed bytes
+    (<root>/<aa>/<bb>/<hash>.gz), so identical content is deduplicated. Writes go to a
+    temporary file first and are renamed into place, which keeps concurrent writers safe.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._stats = {"writes": 0, "dedup_hits": 0, "reads": 0, "bytes_raw": 0, "bytes_stored": 0}
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}.gz")
+
+    def put(self, data: bytes) -> Tuple[str, int]:
+        """Store data; returns (sha256 hex digest, uncompressed size)"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if os.path.exists(path):
+            self._stats["dedup_hits"] += 1
+            return digest, len(data)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=settings.BLOB_STORE_COMPRESSION_LEVEL, mtime=0) as compressed:
+                compressed.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self._stats["writes"] += 1
+        self._stats["bytes_raw"] += len(data)
+        self._stats["bytes_stored"] += os.path.getsize(path)
+        return digest, len(data)
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self._path(digest))
+
+    def get(self, digest: str) -> bytes:
+        return b"".join(self.iter_range(digest))
+
+    def iter_range(self, digest: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yield the uncompressed bytes [start, end] (end inclusive, None for the rest) in chunks"""
+        path = self._path(digest)
+        if not os.path.exists(path):
+            raise BlobNotFoundError(f"Blob {digest} not found")
+        self._stats["reads"] += 1
+        return self._read(path, start, end)
+
+    def _read(self, path: str, start: int, end: Optional[int]) -> Iterator[bytes]:
+        with gzip.open(path, "rb") as blob:
+            if start:
+                blob.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = blob.read(READ_CHUNK_SIZE if remaining is None else min(READ_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "root": self.root,
+            **self._stats,
+            "compression_ratio": round(self._stats["bytes_stored"] / self._stats["bytes_raw"], 4) if self._stats["bytes_raw"] else None
+        }
+
+blob_store = BlobStore(settings.BLOB_STORE_PATH)
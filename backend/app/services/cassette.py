@@ -0,0 +1,119 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MODE_OFF = "off"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+class Cassette:
+    """On-disk store of recorded Cerebras interactions for deterministic replay
+
+    Interactions live in a SQLite table keyed by request hash, so replay is an
+    indexed point lookup no matter how many interactions were recorded.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._stats = {"recorded": 0, "replayed": 0, "misses": 0}
+
+    @property
+    def mode(self) -> str:
+        return settings.CEREBRAS_CASSETTE_MODE
+
+    @property
+    def latency_scale(self) -> float:
+        return settings.CEREBRAS_CASSETTE_LATENCY_SCALE
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS interactions ("
+                "key TEXT PRIMARY KEY, "
+                "kind TEXT NOT NULL, "
+                "request TEXT NOT NULL, "
+                "response TEXT NOT NULL, "
+                "ttft_ms REAL, "
+                "latency_ms REAL NOT NULL, "
+                "usage TEXT, "
+                "recorded_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT kind, response, ttft_ms, latency_ms, usage FROM interactions WHERE key = ?",
+                (key,)
+            ).fetchone()
+        if not row:
+            return None
+        kind, response, ttft_ms, latency_ms, usage = row
+        return {
+            "kind": kind,
+            "response": json.loads(response),
+            "ttft_ms": ttft_ms,
+            "latency_ms": latency_ms,
+            "usage": json.loads(usage) if usage else None
+        }
+
+    def _record(self, key: str, kind: str, request: Dict[str, Any], response: Any, ttft_ms: Optional[float], latency_ms: float, usage: Optional[Dict[str, Any]]):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO interactions (key, kind, request, response, ttft_ms, latency_ms, usage, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    kind,
+                    json.dumps(request),
+                    json.dumps(response),
+                    ttft_ms,
+                    latency_ms,
+                    json.dumps(usage) if usage else None,
+                    time.time()
+                )
+            )
+            conn.commit()
+
+    async def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        interaction = await asyncio.to_thread(self._lookup, key)
+        self._stats["replayed" if interaction else "misses"] += 1
+        return interaction
+
+    async def record(self, key: str, kind: str, request: Dict[str, Any], response: Any, ttft_ms: Optional[float], latency_ms: float, usage: Optional[Dict[str, Any]] = None):
+        try:
+            await asyncio.to_thread(self._record, key, kind, request, response, ttft_ms, latency_ms, usage)
+            self._stats["recorded"] += 1
+        except sqlite3.Error as e:
+            logger.error(f"Failed to record interaction to cassette: {e}")
+
+    async def sleep(self, recorded_ms: Optional[float]):
+        """Reproduce a recorded delay, scaled by CEREBRAS_CASSETTE_LATENCY_SCALE"""
+        if recorded_ms and self.latency_scale > 0:
+            await asyncio.sleep(recorded_ms * self.latency_scale / 1000.0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "path": self.path, "latency_scale": self.latency_scale, **self._stats}
+
+def stream_chunk_timeline(chunks: List[str], offsets_ms: List[float]) -> List[Dict[str, Any]]:
+    """Pair streamed deltas with their arrival offsets for recording"""
+    return [{"delta": delta, "offset_ms": offset} for delta, offset in zip(chunks, offsets_ms)]
+
+cassette = Cassette(settings.CEREBRAS_CASSETTE_PATH)
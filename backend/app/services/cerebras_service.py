@@ -1,107 +1,750 @@
+import asyncio
+import json
 import logging
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator, Callable, Awaitable
 import httpx
 
 from app.core.config import settings
+from app.core.http_client import http_client_manager
+from app.services.llm_cache import response_cache
+from app.services.request_coalescer import request_coalescer
+from app.services.rate_limiter import rate_limiters, ModelRateLimiter
+from app.services.token_counter import count_tokens, count_message_tokens, fit_to_context
+from app.services.model_catalog import model_catalog
+from app.services.cassette import cassette, stream_chunk_timeline, MODE_RECORD, MODE_REPLAY
+from app.services.hedging import hedging
+from app.services.endpoint_pool import endpoint_pool, Endpoint
+from app.services.llm_telemetry import CompletionResult
+from app.services.resilience import (
+    RETRYABLE_STATUS_CODES,
+    CircuitBreaker,
+    CircuitOpenError,
+    circuit_breakers,
+    retry_policy
+)
 
 logger = logging.getLogger(__name__)
 
+KNOWN_MODELS = [
+    {
+        "id": "llama-4-maverick-17b-128e-instruct",
+        "name": "Llama 4 Maverick 17B",
+        "description": "Advanced instruction-tuned model",
+        "context_length": 32768,
+        "max_tokens": 32768
+    },
+    {
+        "id": "llama-4-scout-17b-16e-instruct",
+        "name": "Llama 4 Scout 17B",
+        "description": "Fast and efficient model",
+        "context_length": 2048,
+        "max_tokens": 2048
+    }
+]
+
+class CerebrasAPIError(Exception):
+    """Raised when a Cerebras API call fails after retries (or fails fast on an open circuit)"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retryable: bool = False, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> "CerebrasAPIError":
+        retry_after = None
+        try:
+            retry_after = float(response.headers.get("retry-after", ""))
+        except ValueError:
+            pass
+        return cls(
+            f"Cerebras API error: {response.status_code} - {response.text[:500]}",
+            status_code=response.status_code,
+            retryable=response.status_code in RETRYABLE_STATUS_CODES,
+            retry_after=retry_after
+        )
+
 class CerebrasService:
     def __init__(self):
-        self.api_key = settings.CEREBRAS_API_KEY
-        self.base_url = settings.CEREBRAS_BASE_URL
         self.model_id = settings.CEREBRAS_MODEL_ID
         
-        if not self.api_key:
+        self.replay_mode = cassette.mode == MODE_REPLAY
+        if not endpoint_pool.configured and not self.replay_mode:
             logger.warning("Cerebras API key not configured. Using mock responses.")
             self.mock_mode = True
         else:
             self.mock_mode = False
-
-    async def generate_text(self, prompt: str, max_tokens: int = 1000, temperature: float = 0.7) -> str:
-        """Generate text using Cerebras model"""
-        if self.mock_mode:
-            return self._generate_mock_response(prompt)
         
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model_id,
-                        "messages": [
-                            {"role": "user", "content": prompt}
-                        ],
-                        "max_tokens": max_tokens,
-                        "temperature": temperature,
-                        "stream": False
-                    },
-                    timeout=30.0
-                )
-                
+        # No live API calls are made in mock or cassette replay mode
+        self.offline = self.mock_mode or self.replay_mode
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared pooled HTTP client (see app.core.http_client)"""
+        return http_client_manager.client
+
+    def _headers(self, endpoint: Endpoint) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {endpoint.api_key}",
+            "Content-Type": "application/json"
+        }
+
+    def _should_cache(self, temperature: float, use_cache: Optional[bool]) -> bool:
+        """Decide whether a call may be served from / stored in the response cache"""
+        if self.mock_mode or not settings.LLM_CACHE_ENABLED or use_cache is False:
+            return False
+        if use_cache is True:
+            return True
+        # Sampled outputs are only cached when explicitly enabled
+        return temperature <= 0
+
+    def _rate_limiter(self, endpoint: Endpoint, model_id: Optional[str] = None) -> Optional[ModelRateLimiter]:
+        """Limits apply per API key, so each endpoint gets its own limiter per model"""
+        if not settings.CEREBRAS_RATE_LIMIT_ENABLED:
+            return None
+        return rate_limiters.get(f"{endpoint.name}/{model_id or self.model_id}")
+
+    def _should_hedge(self, hedge: Optional[bool]) -> bool:
+        return settings.CEREBRAS_HEDGING_ENABLED if hedge is None else hedge
+
+    def _hedge_model(self, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        """Model for the backup request: the configured fallback tier if the request fits its window"""
+        model_id = settings.CEREBRAS_HEDGE_MODEL_ID or self.model_id
+        if model_id != self.model_id and self._estimate_tokens(messages, max_tokens) > self.get_context_length(model_id):
+            return self.model_id
+        return model_id
+
+    def _estimate_tokens(self, messages: List[Dict[str, str]], max_tokens: int) -> int:
+        """Prompt + completion token estimate used for admission control"""
+        return count_message_tokens(messages) + max_tokens
+
+    def get_context_length(self, model_id: Optional[str] = None) -> int:
+        """Context window of a model, in tokens"""
+        model_id = model_id or self.model_id
+        context_length = model_catalog.get_context_length(model_id)
+        if context_length:
+            return context_length
+        for model in KNOWN_MODELS:
+            if model["id"] == model_id:
+                return model["context_length"]
+        return settings.DEFAULT_CONTEXT_LENGTH
+
+    def _fit_request(self, messages: List[Dict[str, str]], max_tokens: int) -> Tuple[List[Dict[str, str]], int]:
+        """Clamp max_tokens and compact messages so the request fits the model's context window"""
+        return fit_to_context(messages, max_tokens, self.get_context_length())
+
+    def _breaker(self, endpoint: Endpoint, path: str) -> CircuitBreaker:
+        """Circuits are per endpoint, so one failing endpoint doesn't cut off the others"""
+        return circuit_breakers.get(f"{endpoint.name}/{path}")
+
+    def _pick_endpoint(self, path: str) -> Tuple[Endpoint, CircuitBreaker]:
+        """Least loaded endpoint whose circuit for the path lets a call through
+        
+        Raises CerebrasAPIError (not retryable) when the circuits of all endpoints are open.
+        """
+        skipped: List[Endpoint] = []
+        retry_in = None
+        while True:
+            endpoint = endpoint_pool.pick(exclude=skipped)
+            if endpoint is None:
+                raise CerebrasAPIError(f"Circuits for {path} are open on every endpoint", retryable=False, retry_after=retry_in)
+            breaker = self._breaker(endpoint, path)
+            try:
+                breaker.before_call()
+                return endpoint, breaker
+            except CircuitOpenError as e:
+                skipped.append(endpoint)
+                retry_in = e.retry_in if retry_in is None else min(retry_in, e.retry_in)
+
+    async def _send(
+        self,
+        path: str,
+        send: Callable[[Endpoint], Awaitable[httpx.Response]],
+        hold: bool = False,
+        model_id: Optional[str] = None,
+        estimated_tokens: Optional[int] = None,
+        owner: Optional[str] = None
+    ) -> httpx.Response:
+        """Send a request with jittered retries behind the endpoints' circuit breakers for the path
+        
+        Each attempt goes to the least loaded healthy endpoint of the pool whose circuit is not
+        open. With estimated_tokens
+        it first waits for that endpoint's rate limiter (for model_id), before the endpoint counts
+        the call as outstanding, so throttled requests don't skew the balancing. Returns only
+        successful responses; everything else raises CerebrasAPIError. With hold=True the
+        endpoint stays leased and its circuit awaits the outcome: once the body has been
+        consumed the caller must release the endpoint and record the outcome on the breaker.
+        """
+        retry_policy.record_call(path)
+        attempt = 0
+        
+        while True:
+            endpoint, breaker = self._pick_endpoint(path)
+            limiter = self._rate_limiter(endpoint, model_id) if estimated_tokens is not None else None
+            if limiter:
+                try:
+                    # Admission refunds itself if cancelled; nothing awaits between it and the send
+                    await limiter.acquire(estimated_tokens, owner)
+                except BaseException:
+                    breaker.release()
+                    raise
+            
+            endpoint_pool.lease(endpoint)
+            started = time.monotonic()
+            try:
+                response = await send(endpoint)
+            except httpx.RequestError as e:
+                endpoint_pool.release(endpoint, network_error=True)
+                breaker.record_failure()
+                error = CerebrasAPIError(f"Network error calling Cerebras API ({endpoint.name}): {e}", retryable=True)
+            except BaseException:
+                endpoint_pool.release(endpoint)
+                breaker.release()
+                raise
+            else:
                 if response.status_code == 200:
-                    data = response.json()
-                    return data["choices"][0]["message"]["content"]
+                    if not hold:
+                        breaker.record_success()
+                        endpoint_pool.release(endpoint, 200, time.monotonic() - started)
+                    return response
+                
+                await response.aread()
+                await response.aclose()
+                error = CerebrasAPIError.from_response(response)
+                endpoint_pool.release(endpoint, response.status_code, retry_after=error.retry_after)
+                # Only server-side failures count against the circuit
+                if response.status_code >= 500:
+                    breaker.record_failure()
                 else:
-                    logger.error(f"Cerebras API error: {response.status_code} - {response.text}")
-                    return self._generate_mock_response(prompt)
-                    
-        except httpx.RequestError as e:
-            logger.error(f"Network error calling Cerebras API: {e}")
-            return self._generate_mock_response(prompt)
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error calling Cerebras API: {e.response.status_code}")
-            return self._generate_mock_response(prompt)
-        except Exception as e:
-            logger.error(f"Unexpected error calling Cerebras API: {e}")
+                    breaker.record_success()
+            
+            if not retry_policy.should_retry(attempt, error.retryable):
+                if error.retryable:
+                    retry_policy.record_exhausted(path)
+                logger.error(f"{error} (endpoint={path}, attempts={attempt + 1})")
+                raise error
+            
+            delay = retry_policy.backoff_delay(attempt, error.retry_after)
+            # Another endpoint can take the retry right away if this one was throttled
+            if error.status_code == 429 and endpoint_pool.has_healthy():
+                delay = retry_policy.backoff_delay(0)
+            retry_policy.record_retry(path)
+            logger.warning(f"{error}; retrying {path} in {delay:.2f}s (attempt {attempt + 2})")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _completion_payload(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float, stream: bool, model_id: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "model": model_id or self.model_id,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": stream
+        }
+
+    async def generate_text(self, prompt: str, max_tokens: int = 1000, temperature: float = 0.7, use_cache: Optional[bool] = None, owner: Optional[str] = None) -> str:
+        """Generate text using Cerebras model"""
+        if self.mock_mode:
             return self._generate_mock_response(prompt)
+        
+        return await self.chat_completion(
+            [{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            use_cache=use_cache,
+            owner=owner
+        )
+
+    async def chat_completion(self, messages: List[Dict[str, str]], max_tokens: int = 1000, temperature: float = 0.7, use_cache: Optional[bool] = None, owner: Optional[str] = None, hedge: Optional[bool] = None) -> str:
+        """Chat completion using Cerebras model
+        
+        use_cache: True forces caching, False bypasses the cache, None caches only deterministic (temperature <= 0) calls.
+        owner: execution (or other caller) id used for fair queueing under rate limits.
+        hedge: race a backup request when the call is slow (None follows CEREBRAS_HEDGING_ENABLED).
+        Raises CerebrasAPIError if the call fails.
+        """
+        result = await self.chat_completion_result(messages, max_tokens, temperature, use_cache, owner, hedge)
+        return result.content
+
+    async def chat_completion_result(self, messages: List[Dict[str, str]], max_tokens: int = 1000, temperature: float = 0.7, use_cache: Optional[bool] = None, owner: Optional[str] = None, hedge: Optional[bool] = None) -> CompletionResult:
+        """Chat completion returning content together with token usage and timing"""
+        started = time.monotonic()
+        data, cached, coalesced = await self._complete(messages, max_tokens, temperature, use_cache, owner, hedge)
+        result = CompletionResult(model=data.get("model") or self.model_id)
+        self._finish_result(result, data["choices"][0]["message"]["content"], data.get("usage"), messages, started, None, streamed=False, cached=cached, coalesced=coalesced)
+        return result
+
+    def _finish_result(
+        self,
+        result: CompletionResult,
+        content: str,
+        usage: Optional[Dict[str, Any]],
+        messages: List[Dict[str, str]],
+        started: float,
+        first_token_at: Optional[float],
+        streamed: bool,
+        cached: bool = False,
+        coalesced: bool = False
+    ):
+        """Fill a CompletionResult from the assembled content, the provider's usage block and timings"""
+        latency = time.monotonic() - started
+        ttft = first_token_at - started if streamed and first_token_at is not None else latency
+        result.content = content
+        result.streamed = streamed
+        result.cached = cached
+        result.coalesced = coalesced
+        result.latency_ms = round(latency * 1000, 1)
+        result.ttft_ms = round(ttft * 1000, 1)
+        
+        if usage and usage.get("completion_tokens") is not None:
+            result.prompt_tokens = usage.get("prompt_tokens") or 0
+            result.completion_tokens = usage["completion_tokens"]
+            result.total_tokens = usage.get("total_tokens") or result.prompt_tokens + result.completion_tokens
+        else:
+            result.prompt_tokens = count_message_tokens(messages)
+            result.completion_tokens = count_tokens(content)
+            result.total_tokens = result.prompt_tokens + result.completion_tokens
+            result.usage_estimated = True
+        
+        generation = latency - ttft if streamed else latency
+        result.tokens_per_second = round(result.completion_tokens / generation, 1) if generation > 0 else 0.0
 
-    async def chat_completion(self, messages: List[Dict[str, str]], max_tokens: int = 1000, temperature: float = 0.7) -> str:
-        """Chat completion using Cerebras model"""
+    async def _complete(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float, use_cache: Optional[bool] = None, owner: Optional[str] = None, hedge: Optional[bool] = None) -> Tuple[Dict[str, Any], bool, bool]:
+        """Resolve a completion body from mock mode, the cache or the API
+        
+        The flags tell whether it was cached and whether it was coalesced, i.e. shared from an
+        identical call already in flight whose caller is charged for its usage.
+        """
         if self.mock_mode:
             # Use the last user message for mock response
             user_messages = [msg["content"] for msg in messages if msg["role"] == "user"]
             prompt = user_messages[-1] if user_messages else "Hello"
-            return self._generate_mock_response(prompt)
+            return self._completion_body(self._generate_mock_response(prompt)), False, False
+        
+        messages, max_tokens = self._fit_request(messages, max_tokens)
+        request_key = response_cache.make_key(self.model_id, messages, temperature, max_tokens)
+        cache_key = request_key if self._should_cache(temperature, use_cache) else None
+        if cache_key:
+            cached = await response_cache.get(cache_key)
+            if cached is not None:
+                return cached, True, False
+        
+        # Identical concurrent requests share a single in-flight call
+        completion_key = f"completion:{request_key}"
+        coalesced = request_coalescer.is_inflight(completion_key)
+        data = await request_coalescer.run(
+            completion_key,
+            lambda: self._request_completion(messages, max_tokens, temperature, owner, self._should_hedge(hedge))
+        )
+        
+        if cache_key and not coalesced:
+            await response_cache.set(cache_key, data)
+        return data, False, coalesced
+
+    async def batch_chat_completion(
+        self,
+        requests: List[Dict[str, Any]],
+        max_concurrency: int = 8,
+        cancel_event: Optional[asyncio.Event] = None,
+        fail_fast: bool = False,
+        owner: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Run many independent chat completions with bounded concurrency
+        
+        Each request is a dict with "messages" and optional "max_tokens", "temperature" and "use_cache".
+        Results keep the input order; failed or cancelled items carry an "error" instead of "content".
+        Items served from the cache or shared with an identical call are flagged "cached"/"coalesced"
+        and left out of the token totals.
+        Setting cancel_event (or the first failure when fail_fast is set) cancels all unfinished items.
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+        stop_event = asyncio.Event()
+        started = time.monotonic()
+        
+        async def run(index: int, request: Dict[str, Any]):
+            try:
+                async with semaphore:
+                    data, cached, coalesced = await self._complete(
+                        request["messages"],
+                        request.get("max_tokens", 1000),
+                        request.get("temperature", 0.7),
+                        request.get("use_cache"),
+                        owner
+                    )
+                results[index] = {
+                    "index": index,
+                    "content": data["choices"][0]["message"]["content"],
+                    "usage": data.get("usage"),
+                    "cached": cached,
+                    "coalesced": coalesced,
+                    "error": None
+                }
+            except asyncio.CancelledError:
+                results[index] = {"index": index, "content": None, "usage": None, "error": "cancelled"}
+                raise
+            except Exception as e:
+                results[index] = {"index": index, "content": None, "usage": None, "error": str(e)}
+                if fail_fast:
+                    stop_event.set()
+        
+        tasks = [asyncio.create_task(run(index, request)) for index, request in enumerate(requests)]
+        stop_waiters = [asyncio.create_task(stop_event.wait())]
+        if cancel_event is not None:
+            stop_waiters.append(asyncio.create_task(cancel_event.wait()))
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model_id,
-                        "messages": messages,
-                        "max_tokens": max_tokens,
-                        "temperature": temperature,
-                        "stream": False
-                    },
-                    timeout=30.0
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return data["choices"][0]["message"]["content"]
-                else:
-                    logger.error(f"Cerebras API error: {response.status_code} - {response.text}")
-                    return self._generate_mock_response(messages[-1]["content"] if messages else "Hello")
-                    
-        except httpx.RequestError as e:
-            logger.error(f"Network error calling Cerebras API: {e}")
-            return self._generate_mock_response(messages[-1]["content"] if messages else "Hello")
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error calling Cerebras API: {e.response.status_code}")
-            return self._generate_mock_response(messages[-1]["content"] if messages else "Hello")
-        except Exception as e:
-            logger.error(f"Unexpected error calling Cerebras API: {e}")
-            return self._generate_mock_response(messages[-1]["content"] if messages else "Hello")
+            pending = set(tasks)
+            while pending:
+                done, _ = await asyncio.wait(pending | set(stop_waiters), return_when=asyncio.FIRST_COMPLETED)
+                if any(waiter in done for waiter in stop_waiters):
+                    break
+                pending -= done
+        finally:
+            for task in tasks + stop_waiters:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, *stop_waiters, return_exceptions=True)
+        
+        elapsed = time.monotonic() - started
+        # Cached and coalesced items report the usage of a call that was charged elsewhere
+        total_tokens = sum(
+            (item["usage"] or {}).get("total_tokens", 0)
+            for item in results if item and not item.get("cached") and not item.get("coalesced")
+        )
+        succeeded = sum(1 for item in results if item and item["error"] is None)
+        cancelled = sum(1 for item in results if item and item["error"] == "cancelled")
+        return {
+            "results": results,
+            "stats": {
+                "requests": len(requests),
+                "succeeded": succeeded,
+                "failed": len(requests) - succeeded - cancelled,
+                "cancelled": cancelled,
+                "max_concurrency": max_concurrency,
+                "elapsed_s": round(elapsed, 3),
+                "total_tokens": total_tokens,
+                "requests_per_second": round(succeeded / elapsed, 2) if elapsed > 0 else 0.0,
+                "tokens_per_second": round(total_tokens / elapsed, 2) if elapsed > 0 else 0.0
+            }
+        }
+
+    async def _request_completion(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float, owner: Optional[str] = None, hedge: bool = False) -> Dict[str, Any]:
+        """Send a non-streaming completion request (hedged if requested) and return the response body"""
+        request_key = response_cache.make_key(self.model_id, messages, temperature, max_tokens)
+        if self.replay_mode:
+            return await self._replay_completion(request_key)
+        
+        if not hedge:
+            return await self._post_completion(self.model_id, messages, max_tokens, temperature, request_key, owner)
+        
+        hedge_model = self._hedge_model(messages, max_tokens)
+        return await hedging.race(
+            self.model_id,
+            lambda: self._post_completion(self.model_id, messages, max_tokens, temperature, request_key, owner),
+            lambda: self._post_completion(hedge_model, messages, max_tokens, temperature, request_key, owner)
+        )
+
+    async def _post_completion(self, model_id: str, messages: List[Dict[str, str]], max_tokens: int, temperature: float, request_key: str, owner: Optional[str] = None) -> Dict[str, Any]:
+        """POST one completion request to a model"""
+        estimated_tokens = self._estimate_tokens(messages, max_tokens)
+        payload = self._completion_payload(messages, max_tokens, temperature, stream=False, model_id=model_id)
+        limiter = None
+        sent_at = None
+        
+        async def send(endpoint: Endpoint) -> httpx.Response:
+            nonlocal limiter, sent_at
+            limiter = self._rate_limiter(endpoint, model_id)
+            sent_at = time.monotonic()
+            response = await self.client.post(
+                f"{endpoint.base_url}/v1/chat/completions",
+                headers=self._headers(endpoint),
+                json=payload,
+                timeout=30.0
+            )
+            if limiter:
+                limiter.observe_response(response.status_code, response.headers)
+            return response
+        
+        try:
+            response = await self._send("chat/completions", send, model_id=model_id, estimated_tokens=estimated_tokens, owner=owner)
+        except asyncio.CancelledError:
+            # A hedge race abandoned this call: it took at least this long
+            if sent_at is not None:
+                hedging.record_latency(model_id, "completion", time.monotonic() - sent_at)
+            raise
+        latency_ms = (time.monotonic() - sent_at) * 1000
+        hedging.record_latency(model_id, "completion", latency_ms / 1000)
+        data = response.json()
+        usage = data.get("usage") or {}
+        if limiter and usage.get("total_tokens"):
+            limiter.reconcile(estimated_tokens, usage["total_tokens"])
+        
+        if cassette.mode == MODE_RECORD:
+            await cassette.record(f"completion:{request_key}", "completion", payload, data, latency_ms, latency_ms, usage)
+        return data
+
+    async def _replay_completion(self, request_key: str) -> Dict[str, Any]:
+        """Serve a completion body from the cassette with its recorded latency"""
+        interaction = await cassette.lookup(f"completion:{request_key}")
+        if interaction is not None:
+            await cassette.sleep(interaction["latency_ms"])
+            return interaction["response"]
+        
+        # A recorded stream of the same request is just as good
+        interaction = await cassette.lookup(f"stream:{request_key}")
+        if interaction is None:
+            raise CerebrasAPIError(f"No recorded interaction for request {request_key[:12]} in cassette {cassette.path}")
+        await cassette.sleep(interaction["latency_ms"])
+        body = self._completion_body("".join(item["delta"] for item in interaction["response"]))
+        body["usage"] = interaction["usage"]
+        return body
+
+    async def _replay_stream(self, request_key: str) -> AsyncIterator[Any]:
+        """Replay recorded stream deltas on their original (scaled) timeline, then the recorded usage"""
+        interaction = await cassette.lookup(f"stream:{request_key}")
+        if interaction is not None:
+            timeline = interaction["response"]
+        else:
+            interaction = await cassette.lookup(f"completion:{request_key}")
+            if interaction is None:
+                raise CerebrasAPIError(f"No recorded interaction for request {request_key[:12]} in cassette {cassette.path}")
+            content = interaction["response"]["choices"][0]["message"]["content"]
+            timeline = [{"delta": content, "offset_ms": interaction["latency_ms"]}]
+        
+        started = time.monotonic()
+        for item in timeline:
+            if cassette.latency_scale > 0:
+                due = started + item["offset_ms"] * cassette.latency_scale / 1000.0
+                await asyncio.sleep(max(0.0, due - time.monotonic()))
+            yield item["delta"]
+        yield {"usage": interaction["usage"]}
+
+    async def stream_chat_completion(self, messages: List[Dict[str, str]], max_tokens: int = 1000, temperature: float = 0.7, use_cache: Optional[bool] = None, owner: Optional[str] = None, hedge: Optional[bool] = None, result: Optional[CompletionResult] = None) -> AsyncIterator[str]:
+        """Stream a chat completion, yielding content deltas as they arrive
+        
+        With hedging, a backup stream is opened when the first byte is late and the first to answer wins.
+        result: filled with the content, token usage and timing once the stream is complete, or with
+        the partial content and estimated usage (aborted=True) if the stream is cancelled midway.
+        Raises CerebrasAPIError if the call fails.
+        """
+        started = time.monotonic()
+        first_token_at = None
+        chunks = []
+        usage = None
+        cached = False
+        coalesced = False
+        
+        try:
+            async for item in self._stream_items(messages, max_tokens, temperature, use_cache, owner, hedge):
+                if isinstance(item, dict):
+                    usage = item.get("usage")
+                    cached = item.get("cached", False)
+                    coalesced = item.get("coalesced", False)
+                    continue
+                if first_token_at is None:
+                    first_token_at = time.monotonic()
+                chunks.append(item)
+                yield item
+        except (asyncio.CancelledError, GeneratorExit):
+            # The upstream request is closed on the way out; what it generated so far was still spent
+            if result is not None:
+                result.model = result.model or self.model_id
+                self._finish_result(result, "".join(chunks), None, messages, started, first_token_at, streamed=True)
+                result.aborted = True
+            raise
+        
+        if result is not None:
+            result.model = result.model or self.model_id
+            self._finish_result(result, "".join(chunks), usage, messages, started, first_token_at, streamed=True, cached=cached, coalesced=coalesced)
+
+    async def _stream_items(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float, use_cache: Optional[bool], owner: Optional[str], hedge: Optional[bool]) -> AsyncIterator[Any]:
+        """Content deltas from mock mode, the cache or the API, followed by a {"usage": ...} item when known"""
+        if self.mock_mode:
+            user_messages = [msg["content"] for msg in messages if msg["role"] == "user"]
+            prompt = user_messages[-1] if user_messages else "Hello"
+            async for delta in self._stream_mock_response(prompt):
+                yield delta
+            return
+        
+        messages, max_tokens = self._fit_request(messages, max_tokens)
+        request_key = response_cache.make_key(self.model_id, messages, temperature, max_tokens)
+        cache_key = request_key if self._should_cache(temperature, use_cache) else None
+        if cache_key:
+            cached = await response_cache.get(cache_key)
+            if cached is not None:
+                yield cached["choices"][0]["message"]["content"]
+                yield {"usage": cached.get("usage"), "cached": True}
+                return
+        
+        # Identical concurrent streams share one upstream request; late joiners replay buffered deltas
+        stream_key = f"stream:{request_key}"
+        # The leader's usage is replayed to joiners too, but only the leader spent it
+        coalesced = request_coalescer.is_inflight(stream_key)
+        async for item in request_coalescer.run_stream(
+            stream_key,
+            lambda: self._stream_completion(messages, max_tokens, temperature, cache_key, owner, self._should_hedge(hedge))
+        ):
+            if coalesced and isinstance(item, dict):
+                item = {**item, "coalesced": True}
+            yield item
+
+    async def _stream_completion(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float, cache_key: Optional[str] = None, owner: Optional[str] = None, hedge: bool = False) -> AsyncIterator[Any]:
+        """Send a streaming completion request (hedged if requested) and yield its content deltas, then its usage"""
+        request_key = response_cache.make_key(self.model_id, messages, temperature, max_tokens)
+        if self.replay_mode:
+            async for item in self._replay_stream(request_key):
+                yield item
+            return
+        
+        # Filled from the final stream chunk; only the winner of a hedge race gets that far
+        usage: Dict[str, Any] = {}
+        if hedge:
+            hedge_model = self._hedge_model(messages, max_tokens)
+            source = hedging.race_stream(
+                self.model_id,
+                lambda: self._open_stream(self.model_id, messages, max_tokens, temperature, owner, usage),
+                lambda: self._open_stream(hedge_model, messages, max_tokens, temperature, owner, usage)
+            )
+        else:
+            source = self._open_stream(self.model_id, messages, max_tokens, temperature, owner, usage)
+        
+        chunks = []
+        offsets_ms = []
+        async for delta, offset_ms in source:
+            chunks.append(delta)
+            offsets_ms.append(offset_ms)
+            yield delta
+        yield {"usage": usage or None}
+        
+        if cache_key:
+            body = self._completion_body("".join(chunks))
+            body["usage"] = usage or None
+            await response_cache.set(cache_key, body)
+        
+        if cassette.mode == MODE_RECORD:
+            await cassette.record(
+                f"stream:{request_key}",
+                "stream",
+                self._completion_payload(messages, max_tokens, temperature, stream=True),
+                stream_chunk_timeline(chunks, offsets_ms),
+                offsets_ms[0] if offsets_ms else None,
+                offsets_ms[-1] if offsets_ms else 0.0,
+                usage or None
+            )
+
+    async def _open_stream(self, model_id: str, messages: List[Dict[str, str]], max_tokens: int, temperature: float, owner: Optional[str] = None, usage: Optional[Dict[str, Any]] = None) -> AsyncIterator[Tuple[str, float]]:
+        """Stream one completion from a model, yielding (delta, ms since the request was sent)
+        
+        The usage block of the final chunk, if the provider sends one, is copied into `usage`.
+        """
+        estimated_tokens = self._estimate_tokens(messages, max_tokens)
+        payload = self._completion_payload(messages, max_tokens, temperature, stream=True, model_id=model_id)
+        usage = {} if usage is None else usage
+        limiter: Optional[ModelRateLimiter] = None
+        leased: Optional[Endpoint] = None
+        sent_at = None
+        headers_latency = None
+        first_byte = False
+        
+        async def send(endpoint: Endpoint) -> httpx.Response:
+            nonlocal limiter, leased, sent_at, headers_latency
+            limiter = self._rate_limiter(endpoint, model_id)
+            request = self.client.build_request(
+                "POST",
+                f"{endpoint.base_url}/v1/chat/completions",
+                headers=self._headers(endpoint),
+                json=payload,
+                timeout=30.0
+            )
+            sent_at = time.monotonic()
+            response = await self.client.send(request, stream=True)
+            headers_latency = time.monotonic() - sent_at
+            leased = endpoint
+            if limiter:
+                limiter.observe_response(response.status_code, response.headers)
+            return response
+        
+        try:
+            # Retries only cover establishing the stream; a stream that breaks midway is an error
+            response = await self._send("chat/completions", send, hold=True, model_id=model_id, estimated_tokens=estimated_tokens, owner=owner)
+            # The stream's one verdict is recorded once its body has been consumed
+            breaker = self._breaker(leased, "chat/completions")
+            completed = False
+            try:
+                async for delta in self._iter_sse_deltas(response, usage):
+                    offset_ms = (time.monotonic() - sent_at) * 1000
+                    if not first_byte:
+                        first_byte = True
+                        hedging.record_latency(model_id, "stream", offset_ms / 1000)
+                    yield delta, offset_ms
+                if limiter and usage.get("total_tokens"):
+                    limiter.reconcile(estimated_tokens, usage["total_tokens"])
+                completed = True
+            except httpx.RequestError as e:
+                endpoint, leased = leased, None
+                endpoint_pool.release(endpoint, network_error=True)
+                breaker.record_failure()
+                raise CerebrasAPIError(f"Cerebras stream interrupted ({endpoint.name}): {e}")
+            finally:
+                await response.aclose()
+                if leased is not None:
+                    endpoint_pool.release(leased, 200, headers_latency)
+                    if completed:
+                        breaker.record_success()
+                    else:
+                        # Abandoned midway (cancelled, lost a hedge race): no verdict on the upstream
+                        breaker.release()
+        except (asyncio.CancelledError, GeneratorExit):
+            # Abandoned (e.g. lost a hedge race) before the first byte: it took at least this long
+            if not first_byte and sent_at is not None:
+                hedging.record_latency(model_id, "stream", time.monotonic() - sent_at)
+            raise
+
+    def _completion_body(self, content: str) -> Dict[str, Any]:
+        """Build a non-streaming response body from assembled stream content"""
+        return {
+            "model": self.model_id,
+            "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+            ]
+        }
+
+    async def _iter_sse_deltas(self, response: httpx.Response, usage: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """Parse server-sent event lines from a streaming completion into content deltas
+        
+        A usage block (sent with the final chunk) is copied into `usage` when given.
+        """
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            
+            payload = line[len("data:"):].strip()
+            if payload == "[DONE]":
+                break
+            
+            try:
+                chunk = json.loads(payload)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping malformed stream chunk: {payload[:200]}")
+                continue
+            
+            if usage is not None and chunk.get("usage"):
+                usage.update(chunk["usage"])
+            
+            for choice in chunk.get("choices") or []:
+                delta = (choice.get("delta") or {}).get("content")
+                if delta:
+                    yield delta
+
+    async def _stream_mock_response(self, prompt: str) -> AsyncIterator[str]:
+        """Stream the mock response word by word"""
+        words = self._generate_mock_response(prompt).split(" ")
+        for index, word in enumerate(words):
+            yield word if index == 0 else f" {word}"
+            await asyncio.sleep(0)
 
     def _generate_mock_response(self, prompt: str) -> str:
         """Generate mock response for development/testing"""
@@ -242,51 +885,36 @@ I've analyzed your request and provided a comprehensive response that addresses
 
     async def get_model_info(self) -> Dict[str, Any]:
         """Get information about available models"""
-        if self.mock_mode:
+        if self.offline:
             return {
-                "models": [
-                    {
-                        "id": "llama-4-maverick-17b-128e-instruct",
-                        "name": "Llama 4 Maverick 17B",
-                        "description": "Advanced instruction-tuned model",
-                        "context_length": 32768,
-                        "max_tokens": 32768
-                    },
-                    {
-                        "id": "llama-4-scout-17b-16e-instruct",
-                        "name": "Llama 4 Scout 17B",
-                        "description": "Fast and efficient model",
-                        "context_length": 2048,
-                        "max_tokens": 2048
-                    }
-                ],
+                "models": KNOWN_MODELS,
                 "current_model": self.model_id
             }
         
+        return await model_catalog.get_models(self._load_model_info)
+
+    async def _load_model_info(self) -> Dict[str, Any]:
+        return await request_coalescer.run("models", self._fetch_model_info)
+
+    async def _fetch_model_info(self) -> Dict[str, Any]:
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/v1/models",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
+            response = await self._send(
+                "models",
+                lambda endpoint: self.client.get(
+                    f"{endpoint.base_url}/v1/models",
+                    headers=self._headers(endpoint),
                     timeout=10.0
                 )
-                
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    logger.error(f"Error getting models: {response.status_code}")
-                    return {"error": "Failed to get model information"}
+            )
+            return response.json()
                     
-        except Exception as e:
+        except CerebrasAPIError as e:
             logger.error(f"Error getting model info: {e}")
             return {"error": "Failed to get model information"}
 
     async def get_model_status(self, model_id: str) -> Dict[str, Any]:
         """Get status of a specific model"""
-        if self.mock_mode:
+        if self.offline:
             return {
                 "model_id": model_id,
                 "status": "available",
@@ -295,23 +923,26 @@ I've analyzed your request and provided a comprehensive response that addresses
                 "estimated_time": 0
             }
         
+        return await model_catalog.get_status(model_id, lambda: self._load_model_status(model_id))
+
+    async def _load_model_status(self, model_id: str) -> Dict[str, Any]:
+        return await request_coalescer.run(
+            f"model_status:{model_id}",
+            lambda: self._fetch_model_status(model_id)
+        )
+
+    async def _fetch_model_status(self, model_id: str) -> Dict[str, Any]:
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/v1/models/{model_id}/status",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
+            response = await self._send(
+                "models/status",
+                lambda endpoint: self.client.get(
+                    f"{endpoint.base_url}/v1/models/{model_id}/status",
+                    headers=self._headers(endpoint),
                     timeout=10.0
                 )
-                
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    logger.error(f"Error getting model status: {response.status_code}")
-                    return {"error": "Failed to get model status"}
+            )
+            return response.json()
                     
-        except Exception as e:
+        except CerebrasAPIError as e:
             logger.error(f"Error getting model status: {e}")
-            return {"error": "Failed to get model status"} 
\ No newline at end of file
+            return {"error": "Failed to get model status"}
@@ -8,6 +8,7 @@ from app.core.database import Crew, Agent, Task, Execution
 from app.models.crew import CrewCreate, CrewUpdate, CrewResponse
 from app.services.execution_service import ExecutionService
 from app.services.cerebras_service import CerebrasService
+from app.services.execution_queue import execution_pool
 
 class CrewService:
     def __init__(self, db: Session):
@@ -43,6 +44,11 @@ class CrewService:
             description=crew_data.description,
             status=crew_data.status.value,
             category=crew_data.category,
+            llm_cache_enabled=crew_data.llm_cache_enabled,
+            max_parallel_tasks=crew_data.max_parallel_tasks,
+            token_budget=crew_data.token_budget,
+            api_call_budget=crew_data.api_call_budget,
+            time_budget_seconds=crew_data.time_budget_seconds,
             created_at=datetime.now(timezone.utc),
             updated_at=datetime.now(timezone.utc)
         )
@@ -106,6 +112,16 @@ class CrewService:
             crew.category = crew_data.category
         if crew_data.status is not None:
             crew.status = crew_data.status.value
+        if crew_data.llm_cache_enabled is not None:
+            crew.llm_cache_enabled = crew_data.llm_cache_enabled
+        if crew_data.max_parallel_tasks is not None:
+            crew.max_parallel_tasks = crew_data.max_parallel_tasks
+        if crew_data.token_budget is not None:
+            crew.token_budget = crew_data.token_budget
+        if crew_data.api_call_budget is not None:
+            crew.api_call_budget = crew_data.api_call_budget
+        if crew_data.time_budget_seconds is not None:
+            crew.time_budget_seconds = crew_data.time_budget_seconds
         
         crew.updated_at = datetime.now(timezone.utc)
         
@@ -123,34 +139,49 @@ class CrewService:
         self.db.commit()
         return True
 
-    def execute_crew(self, crew_id: str) -> Optional[Dict[str, Any]]:
-        """Execute a crew"""
+    def execute_crew(
+        self,
+        crew_id: str,
+        max_parallel_tasks: Optional[int] = None,
+        token_budget: Optional[int] = None,
+        api_call_budget: Optional[int] = None,
+        time_budget_seconds: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Execute a crew; the optional arguments override the crew's parallelism and budgets for this run"""
         crew = self.db.query(Crew).filter(Crew.id == crew_id).first()
         if not crew:
             return None
         
+        # Backpressure: refuse before creating a record that could never be picked up
+        execution_pool.check_capacity(self.db)
+        
         # Create execution record
         execution = Execution(
             id=str(uuid.uuid4()),
             crew_id=crew_id,
             crew_name=crew.name,
-            status="running",
+            status="pending",
+            max_parallel_tasks=max_parallel_tasks,
+            token_budget=token_budget,
+            api_call_budget=api_call_budget,
+            time_budget_seconds=time_budget_seconds,
             started_at=datetime.now(timezone.utc),
             created_at=datetime.now(timezone.utc),
             updated_at=datetime.now(timezone.utc)
         )
         
         self.db.add(execution)
-        self.db.commit()
+        self.db.flush()
         
-        # Start execution in background
+        # Queue for the execution worker pool in the same transaction, so no execution is left without a job
         self.execution_service.start_execution(execution.id, crew_id)
+        self.db.commit()
         
         return {
             "id": execution.id,
             "crew_id": crew_id,
             "crew_name": crew.name,
-            "status": "running",
+            "status": "pending",
             "started_at": execution.started_at.isoformat()
         }
 
@@ -169,7 +200,12 @@ class CrewService:
                 "name": crew.name,
                 "description": crew.description,
                 "category": crew.category,
-                "status": crew.status
+                "status": crew.status,
+                "llm_cache_enabled": crew.llm_cache_enabled,
+                "max_parallel_tasks": crew.max_parallel_tasks,
+                "token_budget": crew.token_budget,
+                "api_call_budget": crew.api_call_budget,
+                "time_budget_seconds": crew.time_budget_seconds
             },
             "agents": [
                 {
@@ -210,6 +246,11 @@ class CrewService:
             description=crew_data["crew"]["description"],
             category=crew_data["crew"]["category"],
             status=crew_data["crew"]["status"],
+            llm_cache_enabled=crew_data["crew"].get("llm_cache_enabled", False),
+            max_parallel_tasks=crew_data["crew"].get("max_parallel_tasks"),
+            token_budget=crew_data["crew"].get("token_budget"),
+            api_call_budget=crew_data["crew"].get("api_call_budget"),
+            time_budget_seconds=crew_data["crew"].get("time_budget_seconds"),
             created_at=datetime.utcnow(),
             updated_at=datetime.utcnow()
         )
@@ -0,0 +1,149 @@
+import logging
+import time
+from typing import Dict, Any, List, Optional, Sequence
+from urllib.parse import urlparse
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in the latency moving average
+LATENCY_EWMA_ALPHA = 0.2
+
+class Endpoint:
+    """One Cerebras base URL + API key pair and its live load/health figures"""
+
+    def __init__(self, name: str, base_url: str, api_key: Optional[str]):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.inflight = 0
+        self.consecutive_errors = 0
+        self.ejected_until = 0.0
+        self.latency_ewma: Optional[float] = None
+        self._stats = {"requests": 0, "successes": 0, "errors": 0, "rate_limited": 0, "ejections": 0}
+
+    def is_ejected(self, now: float) -> bool:
+        return now < self.ejected_until
+
+    def eject(self, seconds: float, reason: str):
+        now = time.monotonic()
+        if not self.is_ejected(now):
+            self._stats["ejections"] += 1
+            logger.warning(f"Ejecting Cerebras endpoint '{self.name}' for {seconds:.1f}s ({reason})")
+        self.ejected_until = max(self.ejected_until, now + seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        finished = self._stats["successes"] + self._stats["errors"] + self._stats["rate_limited"]
+        return {
+            "base_url": self.base_url,
+            "inflight": self.inflight,
+            **self._stats,
+            "error_rate": round((self._stats["errors"] + self._stats["rate_limited"]) / finished, 4) if finished else 0.0,
+            "latency_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            "ejected_for_s": round(max(0.0, self.ejected_until - now), 2)
+        }
+
+class EndpointPool:
+    """Least-outstanding-requests balancing over the configured Cerebras endpoints
+
+    Endpoints that answer 429 are ejected for their retry-after (or CEREBRAS_ENDPOINT_EJECT_SECONDS);
+    endpoints failing CEREBRAS_ENDPOINT_ERROR_THRESHOLD times in a row are ejected as well.
+    """
+
+    def __init__(self):
+        self._endpoints: Optional[List[Endpoint]] = None
+        self._next = 0
+
+    @property
+    def endpoints(self) -> List[Endpoint]:
+        if self._endpoints is None:
+            self._endpoints = self._load_endpoints()
+        return self._endpoints
+
+    def _load_endpoints(self) -> List[Endpoint]:
+        """CEREBRAS_ENDPOINTS, or the single CEREBRAS_BASE_URL / CEREBRAS_API_KEY pair"""
+        endpoints = []
+        for index, entry in enumerate(settings.CEREBRAS_ENDPOINTS):
+            base_url = entry.get("base_url") or settings.CEREBRAS_BASE_URL
+            name = entry.get("name") or f"{urlparse(base_url).netloc or base_url}#{index}"
+            endpoints.append(Endpoint(name, base_url, entry.get("api_key") or settings.CEREBRAS_API_KEY))
+        if not endpoints and settings.CEREBRAS_API_KEY:
+            endpoints.append(Endpoint("default", settings.CEREBRAS_BASE_URL, settings.CEREBRAS_API_KEY))
+        return endpoints
+
+    @property
+    def configured(self) -> bool:
+        return any(endpoint.api_key for endpoint in self.endpoints)
+
+    def has_healthy(self) -> bool:
+        now = time.monotonic()
+        return any(not endpoint.is_ejected(now) for endpoint in self.endpoints)
+
+    def acquire(self) -> Endpoint:
+        """Pick an endpoint and count the call against it"""
+        return self.lease(self.pick())
+
+    def pick(self, exclude: Sequence[Endpoint] = ()) -> Optional[Endpoint]:
+        """The healthy endpoint with the fewest outstanding requests; not counted until leased
+
+        If every endpoint is ejected, the one that recovers first is used rather than failing outright.
+        Endpoints in `exclude` are skipped; None if that leaves none.
+        """
+        if not self.endpoints:
+            raise RuntimeError("No Cerebras endpoints configured")
+        endpoints = [endpoint for endpoint in self.endpoints if endpoint not in exclude]
+        if not endpoints:
+            return None
+
+        now = time.monotonic()
+        # Rotate the starting point so ties don't always land on the first endpoint
+        start = self._next % len(endpoints)
+        self._next += 1
+        ordered = endpoints[start:] + endpoints[:start]
+        healthy = [endpoint for endpoint in ordered if not endpoint.is_ejected(now)]
+        if healthy:
+            endpoint = min(healthy, key=lambda e: e.inflight)
+        else:
+            endpoint = min(ordered, key=lambda e: e.ejected_until)
+        return endpoint
+
+    def lease(self, endpoint: Endpoint) -> Endpoint:
+        """Count a call against the endpoint until it is released"""
+        endpoint.inflight += 1
+        endpoint._stats["requests"] += 1
+        return endpoint
+
+    def release(
+        self,
+        endpoint: Endpoint,
+        status_code: Optional[int] = None,
+        latency: Optional[float] = None,
+        retry_after: Optional[float] = None,
+        network_error: bool = False
+    ):
+        """Finish a call; status_code None without network_error means no verdict (e.g. cancelled)"""
+        endpoint.inflight = max(0, endpoint.inflight - 1)
+
+        if status_code == 200:
+            endpoint._stats["successes"] += 1
+            endpoint.consecutive_errors = 0
+            if latency is not None:
+                endpoint.latency_ewma = latency if endpoint.latency_ewma is None else (
+                    LATENCY_EWMA_ALPHA * latency + (1 - LATENCY_EWMA_ALPHA) * endpoint.latency_ewma
+                )
+        elif status_code == 429:
+            endpoint._stats["rate_limited"] += 1
+            endpoint.eject(retry_after or settings.CEREBRAS_ENDPOINT_EJECT_SECONDS, "rate limited")
+        elif network_error or status_code in (401, 403) or (status_code is not None and status_code >= 500):
+            endpoint._stats["errors"] += 1
+            endpoint.consecutive_errors += 1
+            if endpoint.consecutive_errors >= settings.CEREBRAS_ENDPOINT_ERROR_THRESHOLD:
+                endpoint.eject(settings.CEREBRAS_ENDPOINT_EJECT_SECONDS, f"{endpoint.consecutive_errors} consecutive errors")
+                endpoint.consecutive_errors = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {endpoint.name: endpoint.get_stats() for endpoint in self.endpoints}
+
+endpoint_pool = EndpointPool()
@@ -0,0 +1,117 @@
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.llm_telemetry import ExecutionTelemetry
+from app.services.token_counter import count_message_tokens
+
+# Completion tokens requested per task call when the token budget leaves more room
+DEFAULT_MAX_TOKENS = 1000
+
+class BudgetExceededError(Exception):
+    """Raised when an execution has used up one of its budgets"""
+
+    def __init__(self, resource: str, limit: float, used: float):
+        self.resource = resource
+        self.limit = limit
+        self.used = used
+        super().__init__(f"{resource} budget exceeded ({used:,}/{limit:,})")
+
+class ExecutionBudget:
+    """Token, API call and wall-clock limits of one execution
+
+    Usage is read from the execution's telemetry, i.e. the usage blocks of the Cerebras
+    responses (cached and coalesced calls are free). Each call is admitted with a
+    reservation for one API call and its prompt plus max_tokens, so calls of tasks running
+    in parallel can't overrun a budget together; the telemetry settles the reservation to
+    the actual usage. The budget is checked again after each call. Tokens and API calls
+    include work restored from checkpoints; time counts from the start of the current run.
+    """
+
+    def __init__(self, telemetry: ExecutionTelemetry, tokens: Optional[int] = None, api_calls: Optional[int] = None, seconds: Optional[int] = None):
+        self.telemetry = telemetry
+        self.limits = {"tokens": tokens or None, "api_calls": api_calls or None, "seconds": seconds or None}
+        self.started = time.monotonic()
+        self._warned: set = set()
+
+    @classmethod
+    def for_execution(cls, telemetry: ExecutionTelemetry, execution: Any, crew: Any) -> "ExecutionBudget":
+        """Budgets of a run: the execution's overrides, then the crew's, then the settings"""
+        return cls(
+            telemetry,
+            tokens=execution.token_budget or crew.token_budget or settings.EXECUTION_TOKEN_BUDGET,
+            api_calls=execution.api_call_budget or crew.api_call_budget or settings.EXECUTION_API_CALL_BUDGET,
+            seconds=execution.time_budget_seconds or crew.time_budget_seconds or settings.EXECUTION_TIME_BUDGET_SECONDS
+        )
+
+    @property
+    def limited(self) -> bool:
+        return any(self.limits.values())
+
+    def used(self) -> Dict[str, float]:
+        return {
+            "tokens": self.telemetry.tokens_used,
+            "api_calls": self.telemetry.api_calls,
+            "seconds": round(time.monotonic() - self.started, 1)
+        }
+
+    def remaining_seconds(self) -> Optional[float]:
+        if not self.limits["seconds"]:
+            return None
+        return max(0.0, self.limits["seconds"] - (time.monotonic() - self.started))
+
+    async def check_call(self, messages: List[Dict[str, str]]) -> Tuple[int, Optional[int]]:
+        """Admit one more LLM call and reserve what it may spend
+        
+        Returns (max_tokens, reservation); the reservation is settled by telemetry.record, or
+        released with telemetry.release if the call fails. When only the reservations of calls
+        in flight stand in the way, waits for them to settle. Raises BudgetExceededError once
+        the actual usage leaves no room.
+        """
+        if not self.limited:
+            return DEFAULT_MAX_TOKENS, None
+        prompt_tokens = count_message_tokens(messages)
+        while True:
+            used = self.used()
+            if self.limits["api_calls"] and used["api_calls"] >= self.limits["api_calls"]:
+                raise BudgetExceededError("api_calls", self.limits["api_calls"], used["api_calls"])
+            if self.limits["seconds"] and used["seconds"] >= self.limits["seconds"]:
+                raise BudgetExceededError("seconds", self.limits["seconds"], used["seconds"])
+            # The prompt is spent too, so only what is left after it can be generated
+            if self.limits["tokens"] and self.limits["tokens"] - used["tokens"] - prompt_tokens <= 0:
+                raise BudgetExceededError("tokens", self.limits["tokens"], used["tokens"])
+
+            calls_free = not self.limits["api_calls"] or used["api_calls"] + self.telemetry.reserved_calls < self.limits["api_calls"]
+            max_tokens = DEFAULT_MAX_TOKENS
+            if self.limits["tokens"]:
+                max_tokens = min(DEFAULT_MAX_TOKENS, self.limits["tokens"] - used["tokens"] - self.telemetry.reserved_tokens - prompt_tokens)
+            # Calls in flight usually spend less than they reserve, so wait rather than start short
+            if calls_free and (max_tokens >= DEFAULT_MAX_TOKENS or (max_tokens > 0 and not self.telemetry.reserved_calls)):
+                return max_tokens, self.telemetry.reserve(prompt_tokens + max_tokens)
+            await self.telemetry.wait_settled()
+
+    def check(self):
+        """Raise BudgetExceededError if usage has gone past a limit"""
+        used = self.used()
+        for resource, limit in self.limits.items():
+            if limit and used[resource] > limit:
+                raise BudgetExceededError(resource, limit, used[resource])
+
+    def new_warnings(self) -> List[str]:
+        """Resources that have just passed EXECUTION_BUDGET_WARN_RATIO of their limit (reported once)"""
+        used = self.used()
+        crossed = [
+            resource for resource, limit in self.limits.items()
+            if limit and resource not in self._warned and used[resource] >= limit * settings.EXECUTION_BUDGET_WARN_RATIO
+        ]
+        self._warned.update(crossed)
+        return crossed
+
+    def to_dict(self) -> Dict[str, Any]:
+        used = self.used()
+        return {
+            "limits": self.limits,
+            "used": used,
+            "remaining": {resource: max(0, limit - used[resource]) if limit else None for resource, limit in self.limits.items()},
+            "fraction": {resource: round(used[resource] / limit, 4) if limit else None for resource, limit in self.limits.items()}
+        }
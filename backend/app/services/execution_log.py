@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, ExecutionLog
+
+logger = logging.getLogger(__name__)
+
+class ExecutionLogStore:
+    """Append-only execution logs with a write-behind buffer
+
+    Entries get the next sequence number of their execution when appended and are written
+    to the execution_logs table in batches by a background flusher, in a thread so the event
+    loop never waits on the database: once EXECUTION_LOG_FLUSH_SIZE entries are pending, and
+    every EXECUTION_LOG_FLUSH_INTERVAL seconds. Reads merge the stored rows with entries
+    still buffered or being written, so tailing clients see them right away.
+    
+    A batch rejected for a duplicate (execution_id, seq), e.g. after another process took
+    over an execution and numbered from the stored max, is written row by row and the
+    conflicting entries get the next free seq. While the database is unavailable at most
+    EXECUTION_LOG_MAX_PENDING entries are kept, dropping the oldest.
+    """
+
+    def __init__(self):
+        self._pending: List[Dict[str, Any]] = []
+        self._writing: List[List[Dict[str, Any]]] = []
+        self._next_seq: Dict[str, int] = {}
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self._stats = {"appended": 0, "flushes": 0, "flushed": 0, "flush_errors": 0, "resequenced": 0, "dropped": 0, "total_flush_ms": 0.0}
+
+    def _stored_max_seq(self, db: Session, execution_id: str) -> int:
+        return db.query(func.max(ExecutionLog.seq)).filter(ExecutionLog.execution_id == execution_id).scalar() or 0
+
+    def _load_max_seq(self, execution_id: str) -> int:
+        db = SessionLocal()
+        try:
+            return self._stored_max_seq(db, execution_id)
+        finally:
+            db.close()
+
+    async def _allocate_seq(self, execution_id: str) -> int:
+        if execution_id not in self._next_seq:
+            # Continue after entries of an earlier run (e.g. a retried or resumed execution)
+            last = await asyncio.to_thread(self._load_max_seq, execution_id)
+            self._next_seq.setdefault(execution_id, last + 1)
+        seq = self._next_seq[execution_id]
+        self._next_seq[execution_id] = seq + 1
+        return seq
+
+    async def append(self, execution_id: str, entry: Dict[str, Any]) -> int:
+        """Buffer a log entry ({"timestamp", "message", "type"}) and return its seq"""
+        seq = await self._allocate_seq(execution_id)
+        timestamp = entry.get("timestamp")
+        self._pending.append({
+            "execution_id": execution_id,
+            "seq": seq,
+            "timestamp": datetime.fromisoformat(timestamp) if isinstance(timestamp, str) else timestamp or datetime.utcnow(),
+            "type": entry.get("type", "info"),
+            "message": entry.get("message")
+        })
+        self._stats["appended"] += 1
+        if len(self._pending) >= settings.EXECUTION_LOG_FLUSH_SIZE:
+            self._wakeup.set()
+        return seq
+
+    async def flush(self):
+        """Write all buffered entries in one batch; on failure they stay buffered for the next flush
+        
+        The buffer is swapped on the event loop and written in a thread. A flush whose caller is
+        cancelled still settles its batch once the write is done, so no entry is lost.
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+            self._writing.append(batch)
+            started = time.monotonic()
+            write = asyncio.get_running_loop().run_in_executor(None, self._write, batch)
+            try:
+                outcome = await asyncio.shield(write)
+            except asyncio.CancelledError:
+                write.add_done_callback(lambda done: self._settle(batch, done.result(), started))
+                raise
+            self._settle(batch, outcome, started)
+
+    def _write(self, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Blocking part of a flush (runs in a thread); never raises, failures are in the outcome"""
+        outcome = {"flushed": 0, "resequenced": 0, "dropped": 0, "last_seq": {}, "unwritten": [], "error": None}
+        db = SessionLocal()
+        try:
+            try:
+                db.bulk_insert_mappings(ExecutionLog, batch)
+                db.commit()
+                outcome["flushed"] = len(batch)
+            except IntegrityError:
+                db.rollback()
+                # Row by row, so one conflicting entry never holds back the rest of the batch
+                for index, entry in enumerate(batch):
+                    try:
+                        self._insert_one(db, entry, outcome)
+                    except Exception:
+                        batch = batch[index:]
+                        raise
+        except Exception as e:
+            db.rollback()
+            outcome["unwritten"] = batch
+            outcome["error"] = e
+        finally:
+            db.close()
+        return outcome
+
+    def _insert_one(self, db: Session, entry: Dict[str, Any], outcome: Dict[str, Any]):
+        """Insert a single entry; on a seq conflict it moves to the next seq free in the table"""
+        try:
+            db.bulk_insert_mappings(ExecutionLog, [entry])
+            db.commit()
+            outcome["flushed"] += 1
+            return
+        except IntegrityError:
+            db.rollback()
+        
+        execution_id = entry["execution_id"]
+        seq = max(
+            self._stored_max_seq(db, execution_id),
+            self._next_seq.get(execution_id, 1) - 1,
+            outcome["last_seq"].get(execution_id, 0)
+        ) + 1
+        try:
+            db.bulk_insert_mappings(ExecutionLog, [{**entry, "seq": seq}])
+            db.commit()
+            outcome["flushed"] += 1
+            outcome["resequenced"] += 1
+            outcome["last_seq"][execution_id] = seq
+        except IntegrityError:
+            # Lost the race for the new seq too; dropping beats blocking every other entry
+            db.rollback()
+            outcome["dropped"] += 1
+            logger.warning(f"Dropped execution log entry {execution_id}#{entry['seq']} after a seq conflict")
+
+    def _settle(self, batch: List[Dict[str, Any]], outcome: Dict[str, Any], started: float):
+        """Apply the outcome of a write on the event loop"""
+        self._writing.remove(batch)
+        for execution_id, seq in outcome["last_seq"].items():
+            # Later entries continue after a moved one
+            if execution_id in self._next_seq:
+                self._next_seq[execution_id] = max(self._next_seq[execution_id], seq + 1)
+        self._stats["flushed"] += outcome["flushed"]
+        self._stats["resequenced"] += outcome["resequenced"]
+        self._stats["dropped"] += outcome["dropped"]
+        if outcome["error"] is None:
+            self._stats["flushes"] += 1
+            self._stats["total_flush_ms"] += (time.monotonic() - started) * 1000
+            return
+        self._pending = outcome["unwritten"] + self._pending
+        self._stats["flush_errors"] += 1
+        logger.error(f"Flushing {len(outcome['unwritten'])} execution log entries failed: {outcome['error']}")
+        self._trim()
+
+    def _trim(self):
+        """Keep at most EXECUTION_LOG_MAX_PENDING buffered entries, dropping the oldest"""
+        overflow = len(self._pending) - settings.EXECUTION_LOG_MAX_PENDING
+        if overflow > 0:
+            del self._pending[:overflow]
+            self._stats["dropped"] += overflow
+            logger.warning(f"Execution log buffer full, dropped the {overflow} oldest entries")
+
+    async def finish(self, execution_id: str):
+        """Flush and drop the sequence counter of an execution that stopped running here"""
+        await self.flush()
+        self._next_seq.pop(execution_id, None)
+
+    def read(self, db: Session, execution_id: str, after_seq: int = 0, limit: int = 100) -> Tuple[List[Dict[str, Any]], bool]:
+        """Entries with seq > after_seq in order, at most `limit`; the flag tells whether more follow"""
+        rows = db.query(ExecutionLog).filter(
+            ExecutionLog.execution_id == execution_id,
+            ExecutionLog.seq > after_seq
+        ).order_by(ExecutionLog.seq).limit(limit + 1).all()
+        entries = {row.seq: self._to_dict(row.seq, row.timestamp, row.type, row.message) for row in rows}
+        for item in [item for batch in self._writing for item in batch] + self._pending:
+            if item["execution_id"] == execution_id and item["seq"] > after_seq:
+                entries.setdefault(item["seq"], self._to_dict(item["seq"], item["timestamp"], item["type"], item["message"]))
+        ordered = [entries[seq] for seq in sorted(entries)]
+        return ordered[:limit], len(ordered) > limit
+
+    def _to_dict(self, seq: int, timestamp: Optional[datetime], type: str, message: str) -> Dict[str, Any]:
+        return {
+            "seq": seq,
+            "timestamp": timestamp.isoformat() if timestamp else None,
+            "message": message,
+            "type": type
+        }
+
+    async def _flush_loop(self):
+        while not self._stopping.is_set():
+            try:
+                # Woken early when the buffer fills up
+                await asyncio.wait_for(self._wakeup.wait(), settings.EXECUTION_LOG_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def start(self):
+        """Start the periodic flusher (called from the app lifespan)"""
+        if self._flusher is None or self._flusher.done():
+            self._stopping.clear()
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._flusher:
+            # Let the flusher finish its current write rather than cancelling it half way
+            self._stopping.set()
+            self._wakeup.set()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        flushes = self._stats["flushes"]
+        return {
+            "pending": len(self._pending),
+            "appended": self._stats["appended"],
+            "flushes": flushes,
+            "flushed": self._stats["flushed"],
+            "flush_errors": self._stats["flush_errors"],
+            "resequenced": self._stats["resequenced"],
+            "dropped": self._stats["dropped"],
+            "avg_batch_size": round(self._stats["flushed"] / flushes, 1) if flushes else 0.0,
+            "avg_flush_ms": round(self._stats["total_flush_ms"] / flushes, 2) if flushes else 0.0
+        }
+
+execution_log = ExecutionLogStore()
@@ -0,0 +1,389 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, Execution, ExecutionJob
+
+logger = logging.getLogger(__name__)
+
+# runner(db, execution_id) runs one execution to completion
+ExecutionRunner = Callable[[Session, str], Awaitable[None]]
+
+# Candidates read per claim attempt where rows can't be locked (another worker may win each one)
+CLAIM_CANDIDATES = 5
+
+class ExecutionQueueFullError(Exception):
+    """Raised when the execution queue is at EXECUTION_QUEUE_MAX_DEPTH"""
+
+    def __init__(self, depth: int, retry_after: float):
+        super().__init__(f"Execution queue is full ({depth} waiting)")
+        self.depth = depth
+        self.retry_after = retry_after
+
+class ExecutionWorkerPool:
+    """Workers draining the durable execution queue (the execution_jobs table)
+
+    Any number of processes can run a pool against the same database. A worker claims a
+    job by taking a lease on it, renews the lease with heartbeats while the execution runs,
+    and marks the job done at the end. Leases of crashed workers expire and the job is
+    claimed again. Claims use SELECT ... FOR UPDATE SKIP LOCKED where the database supports
+    it; elsewhere (SQLite) a conditional UPDATE inside the claim transaction decides who wins.
+    Each execution runs with its own database session.
+    
+    Running executions are registered by id so they can be cancelled: locally through
+    cancel(), or from any other process by setting the execution's status to "cancelled",
+    which the pool's monitor notices within EXECUTION_CANCEL_POLL_INTERVAL. The monitor
+    also renews the leases of all runs of the process, in one query per tick. Queue
+    queries run in a thread so a locked database never blocks the event loop.
+    """
+
+    def __init__(self):
+        self.process_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._workers: List[asyncio.Task] = []
+        self._runner: Optional[ExecutionRunner] = None
+        self._wakeup = asyncio.Event()
+        self._busy = 0
+        self._running: Dict[str, asyncio.Task] = {}
+        self._leases: Dict[str, str] = {}  # execution id -> lease owner, for runs in this process
+        self._monitor: Optional[asyncio.Task] = None
+        self._cancel_signals: Dict[str, float] = {}
+        self._stats = {
+            "submitted": 0,
+            "rejected": 0,
+            "claimed": 0,
+            "reclaimed": 0,
+            "completed": 0,
+            "failed": 0,
+            "retried": 0,
+            "lost_leases": 0,
+            "cancelled": 0,
+            "max_cancel_latency_ms": 0.0,
+            "total_wait_ms": 0.0,
+            "total_run_ms": 0.0,
+            "total_cancel_latency_ms": 0.0
+        }
+
+    def _claimable(self, now: datetime):
+        return or_(
+            and_(ExecutionJob.status == "queued", ExecutionJob.available_at <= now),
+            and_(ExecutionJob.status == "leased", ExecutionJob.lease_expires_at < now)
+        )
+
+    def queue_length(self, db: Session) -> int:
+        return db.query(ExecutionJob).filter(ExecutionJob.status == "queued").count()
+
+    def retry_after(self, depth: int) -> float:
+        """Rough seconds until a slot frees up, from the average run time"""
+        finished = self._stats["completed"] + self._stats["failed"]
+        avg_run = self._stats["total_run_ms"] / finished / 1000 if finished else 30.0
+        return max(1.0, avg_run * depth / max(1, len(self._workers) or settings.EXECUTION_WORKERS))
+
+    def check_capacity(self, db: Session, count: int = 1):
+        """Raise ExecutionQueueFullError if submitting `count` executions would exceed EXECUTION_QUEUE_MAX_DEPTH"""
+        depth = self.queue_length(db)
+        if depth + count > settings.EXECUTION_QUEUE_MAX_DEPTH:
+            self._stats["rejected"] += 1
+            raise ExecutionQueueFullError(depth, self.retry_after(depth))
+
+    def submit(self, db: Session, execution_id: str):
+        """Add a job for the execution to the caller's transaction; it is claimable once committed
+
+        An execution that was queued before (e.g. one being resumed) gets its finished job re-armed.
+        """
+        now = datetime.utcnow()
+        job = db.query(ExecutionJob).filter(ExecutionJob.execution_id == execution_id).first()
+        if job is None:
+            db.add(ExecutionJob(execution_id=execution_id, status="queued", available_at=now, enqueued_at=now))
+        else:
+            job.status = "queued"
+            job.attempts = 0
+            job.available_at = now
+            job.enqueued_at = now
+            job.lease_owner = None
+            job.lease_expires_at = None
+            job.last_error = None
+            job.finished_at = None
+        self._stats["submitted"] += 1
+        self._wakeup.set()
+
+    def _claim(self, owner: str) -> Optional[Tuple[str, int, bool, datetime]]:
+        """Lease the oldest claimable job; returns (execution_id, attempts, reclaimed, enqueued_at)"""
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            query = db.query(ExecutionJob).filter(self._claimable(now)).order_by(ExecutionJob.enqueued_at)
+            if db.bind.dialect.name in ("postgresql", "mysql"):
+                candidates = query.with_for_update(skip_locked=True).limit(1).all()
+            else:
+                candidates = query.limit(CLAIM_CANDIDATES).all()
+
+            for job in candidates:
+                reclaimed = job.status == "leased"
+                # Compare-and-set: only succeeds if nobody claimed the job since we read it
+                won = db.query(ExecutionJob).filter(
+                    ExecutionJob.execution_id == job.execution_id,
+                    self._claimable(now)
+                ).update(
+                    {
+                        "status": "leased",
+                        "lease_owner": owner,
+                        "lease_expires_at": now + timedelta(seconds=settings.EXECUTION_LEASE_SECONDS),
+                        "heartbeat_at": now,
+                        "attempts": ExecutionJob.attempts + 1
+                    },
+                    synchronize_session=False
+                )
+                if won:
+                    # Read before the commit expires the row, which would reload the incremented count
+                    claim = (job.execution_id, (job.attempts or 0) + 1, reclaimed, job.enqueued_at)
+                    db.commit()
+                    return claim
+            db.rollback()
+            return None
+        finally:
+            db.close()
+
+    def _poll(self, leases: Dict[str, str], renew: bool) -> Tuple[List[str], List[str]]:
+        """Cancel check and (if renew) lease renewal for all runs of this process
+        
+        Returns the ids of executions marked cancelled and of those whose lease expired and
+        was taken over.
+        """
+        db = SessionLocal()
+        try:
+            ids = list(leases)
+            cancelled = [
+                execution_id for (execution_id,) in db.query(Execution.id).filter(
+                    Execution.id.in_(ids),
+                    Execution.status == "cancelled"
+                ).all()
+            ]
+            lost: List[str] = []
+            if renew:
+                now = datetime.utcnow()
+                db.query(ExecutionJob).filter(
+                    ExecutionJob.execution_id.in_(ids),
+                    ExecutionJob.lease_owner.in_(set(leases.values())),
+                    ExecutionJob.status == "leased"
+                ).update(
+                    {"lease_expires_at": now + timedelta(seconds=settings.EXECUTION_LEASE_SECONDS), "heartbeat_at": now},
+                    synchronize_session=False
+                )
+                held = dict(db.query(ExecutionJob.execution_id, ExecutionJob.lease_owner).filter(
+                    ExecutionJob.execution_id.in_(ids),
+                    ExecutionJob.status == "leased"
+                ).all())
+                lost = [execution_id for execution_id, owner in leases.items() if held.get(execution_id) != owner]
+            db.commit()
+            return cancelled, lost
+        finally:
+            db.close()
+
+    def _settle(self, execution_id: str, owner: str, status: str, error: Optional[str] = None, retry_in: Optional[float] = None):
+        """Finish, fail, requeue or release a job we hold"""
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            values: Dict[str, Any] = {"status": status, "lease_owner": None, "lease_expires_at": None, "last_error": error}
+            if status == "queued":
+                values["available_at"] = now + timedelta(seconds=retry_in or 0)
+            else:
+                values["finished_at"] = now
+            db.query(ExecutionJob).filter(
+                ExecutionJob.execution_id == execution_id,
+                ExecutionJob.lease_owner == owner
+            ).update(values, synchronize_session=False)
+
+            if status == "failed":
+                execution = db.query(Execution).filter(Execution.id == execution_id).first()
+                if execution and execution.status in ("pending", "running"):
+                    execution.status = "failed"
+                    execution.completed_at = now
+            db.commit()
+        finally:
+            db.close()
+
+    async def _in_thread(self, func: Callable[..., Any], *args) -> Any:
+        """Run a blocking queue query in a thread
+        
+        Once submitted it runs to the end even if the caller is cancelled (e.g. at shutdown),
+        so a settle is never dropped half way.
+        """
+        return await asyncio.shield(asyncio.get_running_loop().run_in_executor(None, func, *args))
+
+    async def _monitor_runs(self):
+        """Heartbeats and cancel checks for every run of this process, one query round per tick"""
+        last_renewal = time.monotonic()
+        while True:
+            await asyncio.sleep(min(settings.EXECUTION_CANCEL_POLL_INTERVAL, settings.EXECUTION_HEARTBEAT_INTERVAL))
+            if not self._leases:
+                last_renewal = time.monotonic()
+                continue
+            leases = dict(self._leases)
+            renew = time.monotonic() - last_renewal >= settings.EXECUTION_HEARTBEAT_INTERVAL
+            try:
+                cancelled, lost = await self._in_thread(self._poll, leases, renew)
+            except Exception as e:
+                logger.error(f"Execution monitor poll failed: {e}")
+                continue
+            if renew:
+                last_renewal = time.monotonic()
+            
+            for execution_id in cancelled:
+                run = self._running.get(execution_id)
+                if run is not None:
+                    self._signal_cancel(execution_id, run)
+            for execution_id in lost:
+                run = self._running.get(execution_id)
+                if run is not None and execution_id not in self._cancel_signals:
+                    logger.warning(f"Lease on execution {execution_id} was lost by {leases[execution_id]}, stopping it")
+                    self._stats["lost_leases"] += 1
+                    run.cancel()
+
+    def _signal_cancel(self, execution_id: str, run: asyncio.Task):
+        if execution_id not in self._cancel_signals:
+            self._cancel_signals[execution_id] = time.monotonic()
+            run.cancel()
+
+    async def cancel(self, execution_id: str) -> Optional[float]:
+        """Cancel an execution running in this process and wait (up to EXECUTION_CANCEL_TIMEOUT) for it to stop
+
+        Returns the milliseconds from the cancel to the run having stopped (in-flight LLM calls
+        aborted and partial results recorded), or None if it doesn't run here or didn't stop in time.
+        """
+        run = self._running.get(execution_id)
+        if run is None:
+            return None
+        self._signal_cancel(execution_id, run)
+        requested = self._cancel_signals[execution_id]
+        await asyncio.wait([run], timeout=settings.EXECUTION_CANCEL_TIMEOUT)
+        if not run.done():
+            logger.warning(f"Execution {execution_id} did not stop within {settings.EXECUTION_CANCEL_TIMEOUT}s of being cancelled")
+            return None
+        return round((time.monotonic() - requested) * 1000, 1)
+
+    async def _wait_for_work(self):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), settings.EXECUTION_QUEUE_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _worker(self, index: int):
+        owner = f"{self.process_id}/{index}"
+        while True:
+            try:
+                claim = await self._in_thread(self._claim, owner)
+            except Exception as e:
+                logger.error(f"Execution worker {owner} could not claim a job: {e}")
+                claim = None
+            if claim is None:
+                await self._wait_for_work()
+                continue
+
+            execution_id, attempts, reclaimed, enqueued_at = claim
+            self._stats["claimed"] += 1
+            if reclaimed:
+                self._stats["reclaimed"] += 1
+                logger.info(f"Reclaimed execution {execution_id} from an expired lease (attempt {attempts})")
+            if attempts > settings.EXECUTION_MAX_ATTEMPTS:
+                self._stats["failed"] += 1
+                await self._in_thread(self._settle, execution_id, owner, "failed", f"Gave up after {attempts - 1} attempts")
+                continue
+            await self._run(owner, execution_id, attempts, enqueued_at)
+
+    async def _run(self, owner: str, execution_id: str, attempts: int, enqueued_at: Optional[datetime]):
+        self._busy += 1
+        started = time.monotonic()
+        if enqueued_at:
+            self._stats["total_wait_ms"] += max(0.0, (datetime.utcnow() - enqueued_at).total_seconds() * 1000)
+        db = SessionLocal()
+        run = asyncio.ensure_future(self._runner(db, execution_id))
+        self._running[execution_id] = run
+        self._leases[execution_id] = owner
+        try:
+            await asyncio.wait([run])
+        except asyncio.CancelledError:
+            # Pool shutting down: hand the job back so another worker can pick it up right away
+            run.cancel()
+            await asyncio.gather(run, return_exceptions=True)
+            await self._in_thread(self._settle, execution_id, owner, "queued")
+            raise
+        finally:
+            db.close()
+            del self._running[execution_id]
+            self._leases.pop(execution_id, None)
+            cancel_requested = self._cancel_signals.pop(execution_id, None)
+            self._busy -= 1
+            self._stats["total_run_ms"] += (time.monotonic() - started) * 1000
+
+        if run.cancelled():
+            if cancel_requested is None:
+                # Lease lost, the job now belongs to someone else
+                return
+            latency_ms = (time.monotonic() - cancel_requested) * 1000
+            self._stats["cancelled"] += 1
+            self._stats["total_cancel_latency_ms"] += latency_ms
+            self._stats["max_cancel_latency_ms"] = round(max(self._stats["max_cancel_latency_ms"], latency_ms), 1)
+            await self._in_thread(self._settle, execution_id, owner, "done")
+            return
+        error = run.exception()
+        if error is None:
+            self._stats["completed"] += 1
+            await self._in_thread(self._settle, execution_id, owner, "done")
+        elif attempts < settings.EXECUTION_MAX_ATTEMPTS:
+            retry_in = settings.EXECUTION_RETRY_BACKOFF * 2 ** (attempts - 1)
+            self._stats["retried"] += 1
+            logger.error(f"Execution {execution_id} crashed ({error}), retrying in {retry_in:.0f}s")
+            await self._in_thread(self._settle, execution_id, owner, "queued", str(error), retry_in)
+        else:
+            self._stats["failed"] += 1
+            logger.error(f"Execution {execution_id} crashed ({error}), giving up after {attempts} attempts")
+            await self._in_thread(self._settle, execution_id, owner, "failed", str(error))
+
+    async def start(self, runner: ExecutionRunner):
+        """Start the workers (called from the app lifespan)"""
+        self._runner = runner
+        if self._workers:
+            return
+        self._workers = [asyncio.create_task(self._worker(index)) for index in range(max(1, settings.EXECUTION_WORKERS))]
+        self._monitor = asyncio.create_task(self._monitor_runs())
+        logger.info(f"Started {len(self._workers)} execution workers in {self.process_id}")
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._monitor:
+            self._monitor.cancel()
+            await asyncio.gather(self._monitor, return_exceptions=True)
+            self._monitor = None
+
+    def get_stats(self, db: Session) -> Dict[str, Any]:
+        workers = len(self._workers)
+        claimed = self._stats["claimed"]
+        cancelled = self._stats["cancelled"]
+        return {
+            "process": self.process_id,
+            "workers": workers,
+            "busy_workers": self._busy,
+            "utilization": round(self._busy / workers, 4) if workers else 0.0,
+            "queue_length": self.queue_length(db),
+            "leased": db.query(ExecutionJob).filter(ExecutionJob.status == "leased").count(),
+            "max_queue_depth": settings.EXECUTION_QUEUE_MAX_DEPTH,
+            **{key: value for key, value in self._stats.items() if not key.startswith("total_")},
+            "running": list(self._running),
+            "avg_queue_wait_ms": round(self._stats["total_wait_ms"] / claimed, 1) if claimed else 0.0,
+            "avg_cancel_latency_ms": round(self._stats["total_cancel_latency_ms"] / cancelled, 1) if cancelled else 0.0
+        }
+
+execution_pool = ExecutionWorkerPool()
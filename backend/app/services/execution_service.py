@@ -1,23 +1,81 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from sqlalchemy import func, or_, tuple_
+from sqlalchemy.orm import Session, defer
+from typing import List, Optional, Dict, Any, Tuple
 import asyncio
+import base64
 import json
+import logging
+import time
 from datetime import datetime, timezone
 import uuid
 
-from app.core.database import Execution, Crew, Agent, Task
-from app.services.cerebras_service import CerebrasService
-from app.core.websocket_manager import WebSocketManager
+from app.core.config import settings
+from app.core.database import Execution, ExecutionJob, ExecutionCheckpoint, TaskResult, Crew, Agent, Task
+from app.services.cerebras_service import CerebrasService, CerebrasAPIError
+from app.core.websocket_manager import websocket_manager
+from app.core.http_client import http_client_manager
+from app.services.llm_cache import response_cache
+from app.services.request_coalescer import request_coalescer
+from app.services.rate_limiter import rate_limiters
+from app.services.resilience import circuit_breakers, retry_policy
+from app.services.model_catalog import model_catalog
+from app.services.cassette import cassette
+from app.services.hedging import hedging
+from app.services.endpoint_pool import endpoint_pool
+from app.services.llm_telemetry import CompletionResult, ExecutionTelemetry
+from app.services.task_scheduler import TaskGraph, TaskScheduler
+from app.services.execution_queue import execution_pool
+from app.services.execution_log import execution_log
+from app.services.task_memo import task_memo
+from app.services.blob_store import blob_store, BlobNotFoundError
+from app.services.batch_service import BatchService
+from app.services.execution_budget import ExecutionBudget, BudgetExceededError, DEFAULT_MAX_TOKENS
+
+logger = logging.getLogger(__name__)
+
+# Columns of the executions list; reports, logs and telemetry are left out
+SUMMARY_COLUMNS = (
+    Execution.id,
+    Execution.crew_id,
+    Execution.crew_name,
+    Execution.status,
+    Execution.started_at,
+    Execution.completed_at,
+    Execution.duration,
+    Execution.tokens_used,
+    Execution.api_calls,
+    Execution.result_size,
+    Execution.result_preview,
+    Execution.created_at
+)
+
+def _encode_cursor(created_at: datetime, execution_id: str) -> str:
+    payload = json.dumps([created_at.isoformat(), execution_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        created_at, execution_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at), str(execution_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
 
 class ExecutionService:
     def __init__(self, db: Session):
         self.db = db
         self.cerebras_service = CerebrasService()
-        self.websocket_manager = WebSocketManager()
+        self.websocket_manager = websocket_manager
 
     def get_executions(self, skip: int = 0, limit: int = 100, status: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get all executions with optional filtering"""
-        query = self.db.query(Execution)
+        """Get all executions with optional filtering
+        
+        Rows carry a preview of the result; the full report is served by get_execution_result.
+        """
+        # Heavy columns stay unloaded; rows from before result previews get one cut by the database
+        query = self.db.query(
+            Execution,
+            func.substr(Execution.result, 1, settings.RESULT_PREVIEW_CHARS).label("inline_preview")
+        ).options(defer(Execution.result), defer(Execution.logs), defer(Execution.telemetry))
         
         if status:
             query = query.filter(Execution.status == status)
@@ -34,11 +92,55 @@ class ExecutionService:
                 "duration": exec.duration,
                 "tokens_used": exec.tokens_used,
                 "api_calls": exec.api_calls,
-                "result": exec.result,
+                "result_preview": exec.result_preview or inline_preview,
+                "result_size": exec.result_size,
+                "result_hash": exec.result_hash,
                 "created_at": exec.created_at.isoformat() if exec.created_at else None
             }
-            for exec in executions
+            for exec, inline_preview in executions
+        ]
+
+    def get_execution_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        crew_id: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """A page of execution summaries, newest first, with an opaque cursor for the next page
+        
+        Keyset pagination on (created_at, id) selecting only summary columns, so any page costs
+        the same as the first. Raises ValueError for a malformed cursor.
+        """
+        query = self.db.query(*SUMMARY_COLUMNS)
+        if status:
+            query = query.filter(Execution.status == status)
+        if crew_id:
+            query = query.filter(Execution.crew_id == crew_id)
+        if created_after:
+            query = query.filter(Execution.created_at >= created_after)
+        if created_before:
+            query = query.filter(Execution.created_at < created_before)
+        if cursor:
+            query = query.filter(tuple_(Execution.created_at, Execution.id) < _decode_cursor(cursor))
+        
+        rows = query.order_by(Execution.created_at.desc(), Execution.id.desc()).limit(limit + 1).all()
+        items = [
+            {
+                **row._asdict(),
+                "started_at": row.started_at.isoformat() if row.started_at else None,
+                "completed_at": row.completed_at.isoformat() if row.completed_at else None,
+                "created_at": row.created_at.isoformat() if row.created_at else None
+            }
+            for row in rows[:limit]
         ]
+        last = rows[limit - 1] if len(rows) > limit else None
+        return {
+            "items": items,
+            "next_cursor": _encode_cursor(last.created_at, last.id) if last else None
+        }
 
     def get_execution(self, execution_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific execution by ID"""
@@ -56,33 +158,72 @@ class ExecutionService:
             "duration": execution.duration,
             "tokens_used": execution.tokens_used,
             "api_calls": execution.api_calls,
-            "result": execution.result,
-            "logs": execution.logs or [],
+            "inputs": execution.inputs,
+            "batch_id": execution.batch_id,
+            "telemetry": execution.telemetry,
+            "result": self._load_result(execution),
+            "result_size": execution.result_size,
+            "result_hash": execution.result_hash,
+            **self._log_page(execution, 0, settings.EXECUTION_LOG_PAGE_SIZE),
             "created_at": execution.created_at.isoformat() if execution.created_at else None
         }
 
     def start_execution(self, execution_id: str, crew_id: str):
-        """Start a crew execution"""
-        # Get crew and its agents/tasks
-        crew = self.db.query(Crew).filter(Crew.id == crew_id).first()
-        if not crew:
+        """Queue a crew execution for the worker pool; takes effect when the caller commits"""
+        execution_pool.submit(self.db, execution_id)
+
+    async def run_execution(self, execution_id: str):
+        """Run a queued execution; called by a pool worker with its own session"""
+        execution = self.db.query(Execution).filter(Execution.id == execution_id).first()
+        if not execution:
             return
         
-        agents = self.db.query(Agent).filter(Agent.crew_id == crew_id).all()
-        tasks = self.db.query(Task).filter(Task.crew_id == crew_id).all()
-        
-        # Start execution in background
-        asyncio.create_task(self._execute_crew(execution_id, crew, agents, tasks))
+        batch_id = execution.batch_id
+        try:
+            if execution.status not in ("pending", "running"):
+                # Cancelled while queued ("running" means a previous worker's lease expired mid-run)
+                return
+            
+            crew = self.db.query(Crew).filter(Crew.id == execution.crew_id).first()
+            if not crew:
+                return
+            
+            agents = self.db.query(Agent).filter(Agent.crew_id == crew.id).all()
+            tasks = self.db.query(Task).filter(Task.crew_id == crew.id).all()
+            await self._execute_crew(execution_id, crew, agents, tasks)
+        finally:
+            if batch_id:
+                # Let the next input of the batch start
+                await BatchService(self.db).on_child_finished(batch_id)
 
     async def _execute_crew(self, execution_id: str, crew: Crew, agents: List[Agent], tasks: List[Task]):
         """Execute crew in background"""
+        telemetry = ExecutionTelemetry()
+        # Finished task outputs and the text of calls aborted by a cancel, kept for partial results
+        completed_outputs: Dict[str, str] = {}
+        partial_outputs: Dict[str, str] = {}
+        budget: Optional[ExecutionBudget] = None
         try:
             # Update execution status
             execution = self.db.query(Execution).filter(Execution.id == execution_id).first()
             if not execution:
                 return
             
+            # Tasks finished by an earlier, interrupted run of this execution are not run again
+            checkpoints = self._load_checkpoints(execution_id, tasks)
+            for checkpoint in checkpoints:
+                completed_outputs[checkpoint.task_id] = checkpoint.output
+                if checkpoint.call:
+                    call_record = dict(checkpoint.call)
+                    agent_name = call_record.pop("agent", None)
+                    task_name = call_record.pop("task", None)
+                    telemetry.record(CompletionResult(**call_record), agent_name, task_name)
+            
+            budget = ExecutionBudget.for_execution(telemetry, execution, crew)
+            
             execution.status = "running"
+            if not checkpoints:
+                execution.started_at = datetime.utcnow()
             self.db.commit()
             
             # Send WebSocket update
@@ -96,18 +237,12 @@ class ExecutionService:
                 }
             )
             
-            # Simulate execution steps
-            logs = []
-            tokens_used = 0
-            api_calls = 0
-            
             # Step 1: Initialize
             log_entry = {
                 "timestamp": datetime.utcnow().isoformat(),
                 "message": f"🚀 Starting execution of crew: {crew.name}",
                 "type": "info"
             }
-            logs.append(log_entry)
             await self._send_log_update(execution_id, log_entry)
             
             # Step 2: Process each agent
@@ -117,44 +252,118 @@ class ExecutionService:
                     "message": f"🧠 Initializing agent: {agent.name} ({agent.role})",
                     "type": "info"
                 }
-                logs.append(log_entry)
                 await self._send_log_update(execution_id, log_entry)
-                
-                # Simulate agent processing
-                await asyncio.sleep(2)
-                tokens_used += 1500
-                api_calls += 3
-                
+            
+            # Step 3: Process tasks, independent ones concurrently
+            graph = TaskGraph(tasks, agents)
+            scheduler = TaskScheduler(
+                graph,
+                execution.max_parallel_tasks or crew.max_parallel_tasks or settings.EXECUTION_MAX_PARALLEL_TASKS
+            )
+            plan = scheduler.get_plan()
+            log_entry = {
+                "timestamp": datetime.utcnow().isoformat(),
+                "message": (
+                    f"🗺️ Scheduling {plan['tasks']} tasks, up to {plan['max_parallel']} at a time "
+                    f"(critical path: {plan['critical_path']} tasks)"
+                ),
+                "type": "info"
+            }
+            await self._send_log_update(execution_id, log_entry)
+            
+            if checkpoints:
                 log_entry = {
                     "timestamp": datetime.utcnow().isoformat(),
-                    "message": f"✅ Agent {agent.name} initialized successfully",
-                    "type": "success"
+                    "message": f"♻️ Resuming from checkpoints: {len(checkpoints)}/{len(tasks)} tasks already completed",
+                    "type": "info"
+                }
+                await self._send_log_update(execution_id, log_entry)
+            
+            if budget.limited:
+                limits = budget.limits
+                log_entry = {
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "message": "💰 Budget: " + ", ".join(
+                        f"{limits[resource]:,} {label}" for resource, label in (("tokens", "tokens"), ("api_calls", "API calls"), ("seconds", "seconds"))
+                        if limits[resource]
+                    ),
+                    "type": "info"
                 }
-                logs.append(log_entry)
                 await self._send_log_update(execution_id, log_entry)
             
-            # Step 3: Process tasks
-            for task in tasks:
+            async def run_task(task: Task, upstream: List[Tuple[Task, str]]) -> str:
                 log_entry = {
                     "timestamp": datetime.utcnow().isoformat(),
                     "message": f"📝 Processing task: {task.name}",
                     "type": "info"
                 }
-                logs.append(log_entry)
                 await self._send_log_update(execution_id, log_entry)
                 
-                # Simulate task processing
-                await asyncio.sleep(3)
-                tokens_used += 2000
-                api_calls += 5
+                agent = self._find_task_agent(task, agents)
+                temperature = agent.temperature if agent and agent.temperature is not None else 0.7
+                
+                # Reuse the output of an earlier run if nothing that shapes this task's prompt changed
+                memo_key = None
+                if self._should_memoize(crew, temperature):
+                    memo_key = task_memo.make_key(agent, task, self.cerebras_service.model_id, temperature, [output for _, output in upstream], execution.inputs)
+                    memoized = task_memo.get(self.db, memo_key)
+                    if memoized is not None:
+                        return await self._replay_memoized_task(execution_id, task, agent, upstream, memoized, telemetry, completed_outputs)
+                
+                # Run the task against the model, streaming tokens to subscribers
+                messages = self._build_task_messages(agent, task, upstream, execution.inputs)
+                max_tokens, reservation = await budget.check_call(messages)
+                call = CompletionResult()
+                try:
+                    output = await self._stream_task_output(
+                        execution_id,
+                        task,
+                        messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        use_cache=True if crew.llm_cache_enabled else None,
+                        result=call
+                    )
+                except asyncio.CancelledError:
+                    if call.aborted:
+                        telemetry.record(call, agent.name if agent else None, task.name, reservation)
+                        partial_outputs[task.id] = call.content
+                    else:
+                        telemetry.release(reservation)
+                    raise
+                except Exception:
+                    telemetry.release(reservation)
+                    raise
+                telemetry.record(call, agent.name if agent else None, task.name, reservation)
+                completed_outputs[task.id] = output
+                self._save_checkpoint(execution_id, task, output, call, agent, upstream)
+                # Outputs cut short by a budget-clamped max_tokens are not memoized
+                if memo_key and max_tokens == DEFAULT_MAX_TOKENS:
+                    task_memo.put(self.db, memo_key, task, output, 0 if call.cached or call.coalesced else call.total_tokens)
                 
                 log_entry = {
                     "timestamp": datetime.utcnow().isoformat(),
-                    "message": f"✅ Task '{task.name}' completed successfully",
+                    "message": (
+                        f"✅ Task '{task.name}' completed successfully "
+                        f"({'cached' if call.cached else f'{call.total_tokens:,} tokens, TTFT {call.ttft_ms:.0f}ms, {call.tokens_per_second:.0f} tokens/s'})"
+                    ),
                     "type": "success"
                 }
-                logs.append(log_entry)
                 await self._send_log_update(execution_id, log_entry)
+                
+                # The output is kept even if this call used up the budget
+                await self._send_budget_update(execution_id, budget)
+                budget.check()
+                return output
+            
+            try:
+                outputs = await asyncio.wait_for(
+                    scheduler.run(run_task, completed=dict(completed_outputs)),
+                    budget.remaining_seconds()
+                )
+            except asyncio.TimeoutError:
+                raise BudgetExceededError("seconds", budget.limits["seconds"], budget.used()["seconds"])
+            task_outputs = [(task, outputs[task.id]) for task in graph.topological_order()]
             
             # Step 4: Generate final result
             log_entry = {
@@ -162,12 +371,11 @@ class ExecutionService:
                 "message": "🎯 Generating final results and report",
                 "type": "info"
             }
-            logs.append(log_entry)
             await self._send_log_update(execution_id, log_entry)
             
-            await asyncio.sleep(2)
-            tokens_used += 3000
-            api_calls += 8
+            tokens_used = telemetry.tokens_used
+            api_calls = telemetry.api_calls
+            agent_telemetry = telemetry.to_dict()["agents"]
             
             # Generate mock result
             result = f"""
@@ -188,10 +396,10 @@ class ExecutionService:
 - **API Calls**: {api_calls}
 
 ## Agent Performance
-{chr(10).join([f"- **{agent.name}** ({agent.role}): Completed successfully" for agent in agents])}
+{chr(10).join([self._format_agent_performance(agent, agent_telemetry.get(agent.name)) for agent in agents])}
 
 ## Task Results
-{chr(10).join([f"- **{task.name}**: {task.description}" for task in tasks])}
+{chr(10).join([f"### {task.name}{chr(10)}{output.strip()}{chr(10)}" for task, output in task_outputs])}
 
 ## Recommendations
 1. All agents performed as expected
@@ -203,16 +411,27 @@ class ExecutionService:
 *Generated by CrewAI Dashboard*
             """.strip()
             
-            # Update execution with results
-            execution.status = "completed"
-            execution.completed_at = datetime.utcnow()
-            execution.duration = int((execution.completed_at - execution.started_at).total_seconds() * 1000)
-            execution.tokens_used = tokens_used
-            execution.api_calls = api_calls
-            execution.result = result
-            execution.logs = logs
-            
+            # Update execution with results, unless it was cancelled meanwhile
+            completed_at = datetime.utcnow()
+            duration = int((completed_at - execution.started_at).total_seconds() * 1000)
+            updated = self.db.query(Execution).filter(
+                Execution.id == execution_id,
+                Execution.status == "running"
+            ).update(
+                {
+                    "status": "completed",
+                    "completed_at": completed_at,
+                    "duration": duration,
+                    "tokens_used": tokens_used,
+                    "api_calls": api_calls,
+                    "telemetry": {**telemetry.to_dict(), "budget": budget.to_dict()} if budget.limited else telemetry.to_dict(),
+                    **self._result_columns(result)
+                },
+                synchronize_session=False
+            )
             self.db.commit()
+            if not updated:
+                return
             
             # Send completion update
             await self.websocket_manager.send_to_execution(
@@ -221,19 +440,40 @@ class ExecutionService:
                     "type": "execution_completed",
                     "execution_id": execution_id,
                     "result": result,
-                    "duration": execution.duration,
+                    "duration": duration,
                     "tokens_used": tokens_used,
                     "api_calls": api_calls,
+                    "telemetry": telemetry.to_dict()["totals"],
                     "timestamp": datetime.utcnow().isoformat()
                 }
             )
             
+        except BudgetExceededError as e:
+            await self._record_budget_exceeded(execution_id, crew, tasks, telemetry, budget, e, completed_outputs, partial_outputs)
+            
+        except asyncio.CancelledError:
+            await self._record_cancellation(execution_id, crew, tasks, telemetry, completed_outputs, partial_outputs)
+            raise
+            
         except Exception as e:
             # Handle execution error
+            error_message = f"Cerebras API call failed: {e}" if isinstance(e, CerebrasAPIError) else str(e)
+            log_entry = {
+                "timestamp": datetime.utcnow().isoformat(),
+                "message": f"❌ Execution failed: {error_message}",
+                "type": "error"
+            }
+            await self._send_log_update(execution_id, log_entry)
+            
+            self.db.rollback()
             execution = self.db.query(Execution).filter(Execution.id == execution_id).first()
-            if execution:
+            if execution and execution.status == "running":
                 execution.status = "failed"
                 execution.completed_at = datetime.utcnow()
+                # Tokens spent before the failure are still real usage
+                execution.tokens_used = telemetry.tokens_used
+                execution.api_calls = telemetry.api_calls
+                execution.telemetry = telemetry.to_dict()
                 self.db.commit()
             
             await self.websocket_manager.send_to_execution(
@@ -241,13 +481,452 @@ class ExecutionService:
                 {
                     "type": "execution_failed",
                     "execution_id": execution_id,
-                    "error": str(e),
+                    "error": error_message,
                     "timestamp": datetime.utcnow().isoformat()
                 }
             )
+        finally:
+            await execution_log.finish(execution_id)
+
+    async def _record_cancellation(
+        self,
+        execution_id: str,
+        crew: Crew,
+        tasks: List[Task],
+        telemetry: ExecutionTelemetry,
+        completed_outputs: Dict[str, str],
+        partial_outputs: Dict[str, str]
+    ):
+        """Store what a cancelled run produced and spent before it stopped
+        
+        Only acts on executions marked "cancelled"; a run stopped for another reason (lost lease,
+        shutdown) leaves the row to whoever runs it next.
+        """
+        self.db.rollback()
+        execution = self.db.query(Execution).filter(Execution.id == execution_id).first()
+        if not execution or execution.status != "cancelled":
+            return
+        
+        # By now every in-flight LLM call has been aborted, so this spans request to last token spent
+        stopped_at = datetime.utcnow()
+        latency_ms = round((stopped_at - execution.completed_at).total_seconds() * 1000, 1) if execution.completed_at else None
+        cancellation = {
+            "latency_ms": latency_ms,
+            "tasks_completed": len(completed_outputs),
+            "tasks_aborted": [task.name for task in tasks if task.id in partial_outputs],
+            "tasks_not_started": len(tasks) - len(completed_outputs) - len(partial_outputs)
+        }
+        log_entry = {
+            "timestamp": stopped_at.isoformat(),
+            "message": f"🛑 Execution cancelled: {len(completed_outputs)}/{len(tasks)} tasks completed, stopped in {latency_ms or 0:.0f}ms",
+            "type": "warning"
+        }
+        
+        execution.duration = int((execution.completed_at - execution.started_at).total_seconds() * 1000) if execution.started_at and execution.completed_at else None
+        execution.tokens_used = telemetry.tokens_used
+        execution.api_calls = telemetry.api_calls
+        execution.telemetry = {**telemetry.to_dict(), "cancellation": cancellation}
+        for column, value in self._result_columns(self._partial_report(crew, tasks, completed_outputs, partial_outputs, "cancelled")).items():
+            setattr(execution, column, value)
+        self.db.commit()
+        
+        await self._send_log_update(execution_id, log_entry)
+        await self.websocket_manager.send_to_execution(
+            execution_id,
+            {
+                "type": "execution_stopped",
+                "execution_id": execution_id,
+                "reason": "cancelled",
+                "tokens_used": telemetry.tokens_used,
+                "api_calls": telemetry.api_calls,
+                "cancellation": cancellation,
+                "timestamp": stopped_at.isoformat()
+            }
+        )
+
+    async def _record_budget_exceeded(
+        self,
+        execution_id: str,
+        crew: Crew,
+        tasks: List[Task],
+        telemetry: ExecutionTelemetry,
+        budget: ExecutionBudget,
+        error: BudgetExceededError,
+        completed_outputs: Dict[str, str],
+        partial_outputs: Dict[str, str]
+    ):
+        """Fail a run that used up a budget, keeping the outputs it produced before the abort
+        
+        In-flight calls of other tasks have been aborted by then; their partial output is kept too.
+        """
+        self.db.rollback()
+        execution = self.db.query(Execution).filter(Execution.id == execution_id).first()
+        if not execution or execution.status != "running":
+            return
+        
+        stopped_at = datetime.utcnow()
+        budget_info = {
+            **budget.to_dict(),
+            "exceeded": {"resource": error.resource, "limit": error.limit, "used": error.used},
+            "tasks_completed": len(completed_outputs),
+            "tasks_aborted": [task.name for task in tasks if task.id in partial_outputs],
+            "tasks_not_started": len(tasks) - len(completed_outputs) - len(partial_outputs)
+        }
+        log_entry = {
+            "timestamp": stopped_at.isoformat(),
+            "message": f"💸 Execution stopped, {error}: {len(completed_outputs)}/{len(tasks)} tasks completed",
+            "type": "error"
+        }
+        
+        execution.status = "failed"
+        execution.completed_at = stopped_at
+        execution.duration = int((stopped_at - execution.started_at).total_seconds() * 1000) if execution.started_at else None
+        execution.tokens_used = telemetry.tokens_used
+        execution.api_calls = telemetry.api_calls
+        execution.telemetry = {**telemetry.to_dict(), "budget": budget_info}
+        for column, value in self._result_columns(self._partial_report(crew, tasks, completed_outputs, partial_outputs, "budget exceeded")).items():
+            setattr(execution, column, value)
+        self.db.commit()
+        
+        await self._send_log_update(execution_id, log_entry)
+        await self.websocket_manager.send_to_execution(
+            execution_id,
+            {
+                "type": "execution_stopped",
+                "execution_id": execution_id,
+                "reason": "budget_exceeded",
+                "tokens_used": telemetry.tokens_used,
+                "api_calls": telemetry.api_calls,
+                "budget": budget_info,
+                "timestamp": stopped_at.isoformat()
+            }
+        )
+
+    def _partial_report(self, crew: Crew, tasks: List[Task], completed_outputs: Dict[str, str], partial_outputs: Dict[str, str], reason: str) -> Optional[str]:
+        """Report of a run stopped early: completed task outputs and the partial ones of aborted calls"""
+        sections = []
+        for task in tasks:
+            if task.id in completed_outputs:
+                sections.append(f"### {task.name}\n{completed_outputs[task.id].strip()}\n")
+            elif task.id in partial_outputs:
+                sections.append(f"### {task.name} ({reason}, partial output)\n{partial_outputs[task.id].strip()}\n")
+        if not sections:
+            return None
+        return f"# Crew Execution Report: {crew.name} ({reason})\n\n## Task Results\n" + "\n".join(sections)
+
+    async def _replay_memoized_task(
+        self,
+        execution_id: str,
+        task: Task,
+        agent: Optional[Agent],
+        upstream: List[Tuple[Task, str]],
+        memoized: TaskResult,
+        telemetry: ExecutionTelemetry,
+        completed_outputs: Dict[str, str]
+    ) -> str:
+        """Complete a task with its memoized output instead of calling the model"""
+        output = memoized.output
+        call = CompletionResult(content=output, model=self.cerebras_service.model_id, cached=True)
+        await self._send_token_delta(execution_id, task.id, output)
+        telemetry.record(call, agent.name if agent else None, task.name)
+        completed_outputs[task.id] = output
+        self._save_checkpoint(execution_id, task, output, call, agent, upstream)
+        
+        log_entry = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "message": f"♻️ Task '{task.name}' is unchanged since an earlier run, reusing its output ({memoized.tokens_used or 0:,} tokens saved)",
+            "type": "success"
+        }
+        await self._send_log_update(execution_id, log_entry)
+        return output
+
+    def _result_columns(self, result: Optional[str]) -> Dict[str, Any]:
+        """Execution column values for a result; large ones go to the blob store, the row keeps a preview"""
+        if result is None:
+            return {"result": None, "result_hash": None, "result_size": None, "result_preview": None}
+        
+        data = result.encode("utf-8")
+        columns = {"result_size": len(data), "result_preview": result[:settings.RESULT_PREVIEW_CHARS]}
+        if len(data) >= settings.RESULT_BLOB_THRESHOLD:
+            digest, _ = blob_store.put(data)
+            return {**columns, "result": None, "result_hash": digest}
+        return {**columns, "result": result, "result_hash": None}
+
+    def _load_result(self, execution: Execution) -> Optional[str]:
+        """Full result text, read from the blob store when it lives there; None if its blob is gone"""
+        if execution.result_hash:
+            try:
+                return blob_store.get(execution.result_hash).decode("utf-8")
+            except BlobNotFoundError as e:
+                logger.warning(f"Result of execution {execution.id} is unavailable: {e}")
+                return None
+        return execution.result
+
+    def get_execution_result(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """Size, hash and a ranged reader of an execution's result; None if there is none (or its blob is gone)"""
+        execution = self.db.query(Execution).filter(Execution.id == execution_id).first()
+        if not execution:
+            return None
+        if execution.result_hash:
+            digest = execution.result_hash
+            if not blob_store.exists(digest):
+                logger.warning(f"Result of execution {execution.id} is unavailable: blob {digest} not found")
+                return None
+            return {
+                "size": execution.result_size,
+                "hash": digest,
+                "iter_range": lambda start, end: blob_store.iter_range(digest, start, end)
+            }
+        if execution.result is None:
+            return None
+        
+        data = execution.result.encode("utf-8")
+        return {
+            "size": len(data),
+            "hash": None,
+            "iter_range": lambda start, end: iter([data[start:None if end is None else end + 1]])
+        }
+
+    def _load_checkpoints(self, execution_id: str, tasks: List[Task]) -> List[ExecutionCheckpoint]:
+        """Checkpoints of this execution for tasks the crew still has"""
+        task_ids = [task.id for task in tasks]
+        return self.db.query(ExecutionCheckpoint).filter(
+            ExecutionCheckpoint.execution_id == execution_id,
+            ExecutionCheckpoint.task_id.in_(task_ids)
+        ).all()
+
+    def _save_checkpoint(self, execution_id: str, task: Task, output: str, call: CompletionResult, agent: Optional[Agent], upstream: List[Tuple[Task, str]]):
+        """Persist a completed task so a resumed run can skip it"""
+        self.db.merge(ExecutionCheckpoint(
+            execution_id=execution_id,
+            task_id=task.id,
+            task_name=task.name,
+            output=output,
+            tokens_used=0 if call.cached or call.coalesced else call.total_tokens,
+            call={"agent": agent.name if agent else None, "task": task.name, **call.to_dict()},
+            upstream=[upstream_task.id for upstream_task, _ in upstream],
+            completed_at=datetime.utcnow()
+        ))
+        self.db.commit()
+
+    async def resume_execution(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """Queue a failed or cancelled execution again; it continues after its last completed task
+        
+        Raises ExecutionQueueFullError when the queue is full. Returns None if the execution
+        doesn't exist or isn't in a resumable state.
+        """
+        execution = self.db.query(Execution).filter(Execution.id == execution_id).first()
+        if not execution or execution.status not in ["failed", "cancelled"]:
+            return None
+        
+        execution_pool.check_capacity(self.db)
+        checkpoints = self.db.query(ExecutionCheckpoint).filter(ExecutionCheckpoint.execution_id == execution_id).count()
+        execution.status = "pending"
+        execution.completed_at = None
+        for column, value in self._result_columns(None).items():
+            setattr(execution, column, value)
+        self.start_execution(execution.id, execution.crew_id)
+        self.db.commit()
+        
+        await self._send_log_update(execution_id, {
+            "timestamp": datetime.utcnow().isoformat(),
+            "message": f"♻️ Resume requested ({checkpoints} tasks checkpointed)",
+            "type": "info"
+        })
+        await execution_log.finish(execution_id)
+        return {"id": execution.id, "status": "pending", "checkpoints": checkpoints}
+
+    async def recover_orphaned_executions(self) -> Dict[str, int]:
+        """Startup sweep for executions left "running" (or "pending") with no job that will run them
+        
+        Those are resumed from their checkpoints when EXECUTION_RESUME_ORPHANS is set, otherwise
+        marked failed. Runs whose lease merely expired are picked up by the worker pool itself.
+        """
+        orphans = self.db.query(Execution).outerjoin(
+            ExecutionJob, ExecutionJob.execution_id == Execution.id
+        ).filter(
+            Execution.status.in_(["running", "pending"]),
+            or_(ExecutionJob.execution_id.is_(None), ExecutionJob.status.in_(["done", "failed"])),
+            # Pending batch children without a job are just waiting for their turn
+            or_(Execution.batch_id.is_(None), Execution.status == "running")
+        ).all()
+        
+        recovered = {"resumed": 0, "failed": 0}
+        for execution in orphans:
+            if settings.EXECUTION_RESUME_ORPHANS:
+                execution.status = "pending"
+                self.start_execution(execution.id, execution.crew_id)
+                log_entry = {
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "message": "♻️ Execution was interrupted by a restart, resuming from its checkpoints",
+                    "type": "warning"
+                }
+                recovered["resumed"] += 1
+            else:
+                execution.status = "failed"
+                execution.completed_at = datetime.utcnow()
+                log_entry = {
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "message": "❌ Execution was interrupted by a restart",
+                    "type": "error"
+                }
+                recovered["failed"] += 1
+            await execution_log.append(execution.id, log_entry)
+            await execution_log.finish(execution.id)
+        self.db.commit()
+        
+        if orphans:
+            logger.warning(f"Recovered {len(orphans)} interrupted executions: {recovered}")
+        return recovered
+
+    def _format_agent_performance(self, agent: Agent, stats: Optional[Dict[str, Any]]) -> str:
+        """One report line with an agent's LLM usage"""
+        if not stats:
+            return f"- **{agent.name}** ({agent.role}): No LLM calls"
+        line = f"- **{agent.name}** ({agent.role}): {stats['calls']} calls, {stats['total_tokens']:,} tokens"
+        if stats["calls"]:
+            line += f", avg TTFT {stats['avg_ttft_ms']:.0f}ms, avg latency {stats['avg_latency_ms']:.0f}ms"
+            if stats["tokens_per_second"]:
+                line += f", {stats['tokens_per_second']:.0f} tokens/s"
+        if stats["cached_calls"]:
+            line += f", {stats['cached_calls']} cached"
+        if stats.get("coalesced_calls"):
+            line += f", {stats['coalesced_calls']} shared with identical calls"
+        return line
+
+    def _should_memoize(self, crew: Crew, temperature: float) -> bool:
+        """Whether task outputs may be served from / stored in the task memo
+        
+        Follows the response cache: never for mock or cassette replay outputs, and sampled
+        (temperature > 0) outputs only for crews with llm_cache_enabled.
+        """
+        if not settings.TASK_MEMO_ENABLED or self.cerebras_service.offline:
+            return False
+        return bool(crew.llm_cache_enabled) or temperature <= 0
+
+    def _find_task_agent(self, task: Task, agents: List[Agent]) -> Optional[Agent]:
+        """Resolve the agent assigned to a task by id or name"""
+        for agent in agents:
+            if task.assigned_agent in (agent.id, agent.name):
+                return agent
+        return agents[0] if agents else None
+
+    def _build_task_messages(self, agent: Optional[Agent], task: Task, upstream: Optional[List[Tuple[Task, str]]] = None, inputs: Optional[Dict[str, Any]] = None) -> List[Dict[str, str]]:
+        """Build the chat messages for a task from its agent, definition, upstream task outputs and run inputs
+        
+        Inputs fill {name} placeholders in the agent and task texts; inputs no placeholder refers to
+        are listed in the prompt instead.
+        """
+        inputs = inputs or {}
+        used: set = set()
+        messages = []
+        if agent:
+            system_prompt = f"You are {agent.name}, a {self._fill_inputs(agent.role, inputs, used)}.\nYour goal: {self._fill_inputs(agent.goal, inputs, used)}"
+            if agent.backstory:
+                system_prompt += f"\nBackstory: {self._fill_inputs(agent.backstory, inputs, used)}"
+            messages.append({"role": "system", "content": system_prompt})
+        
+        prompt = f"Task: {self._fill_inputs(task.description, inputs, used)}\n\nExpected output: {self._fill_inputs(task.expected_output, inputs, used)}"
+        if task.context:
+            prompt += f"\n\nContext: {self._fill_inputs(task.context, inputs, used)}"
+        for upstream_task, output in upstream or []:
+            prompt += f"\n\nOutput of task '{upstream_task.name}':\n{output.strip()}"
+        unused = [name for name in inputs if name not in used]
+        if unused:
+            prompt += "\n\nInputs:\n" + "\n".join(f"- {name}: {inputs[name]}" for name in unused)
+        if task.output_format and task.output_format != "text":
+            prompt += f"\n\nRespond in {task.output_format} format."
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    def _fill_inputs(self, text: Optional[str], inputs: Dict[str, Any], used: set) -> Optional[str]:
+        """Replace {name} placeholders with input values, noting which inputs were used"""
+        if not text:
+            return text
+        for name, value in inputs.items():
+            placeholder = "{" + name + "}"
+            if placeholder in text:
+                used.add(name)
+                text = text.replace(placeholder, value if isinstance(value, str) else json.dumps(value))
+        return text
+
+    async def _stream_task_output(self, execution_id: str, task: Task, messages: List[Dict[str, str]], max_tokens: int = 1000, temperature: float = 0.7, use_cache: Optional[bool] = None, result: Optional[CompletionResult] = None) -> str:
+        """Stream a task completion, forwarding batched token deltas to subscribers
+        
+        result: filled with the call's usage and timing (see CerebrasService.stream_chat_completion).
+        """
+        chunks = []
+        pending = []
+        pending_chars = 0
+        last_flush = time.monotonic()
+        
+        async for delta in self.cerebras_service.stream_chat_completion(
+            messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            use_cache=use_cache,
+            owner=execution_id,
+            result=result
+        ):
+            chunks.append(delta)
+            pending.append(delta)
+            pending_chars += len(delta)
+            
+            # Flush the first delta immediately, then batch by size or time
+            now = time.monotonic()
+            if (
+                len(chunks) == 1
+                or pending_chars >= settings.EXECUTION_STREAM_FLUSH_CHARS
+                or now - last_flush >= settings.EXECUTION_STREAM_FLUSH_INTERVAL
+            ):
+                await self._send_token_delta(execution_id, task.id, "".join(pending))
+                pending = []
+                pending_chars = 0
+                last_flush = now
+        
+        if pending:
+            await self._send_token_delta(execution_id, task.id, "".join(pending))
+        
+        return "".join(chunks)
+
+    async def _send_token_delta(self, execution_id: str, task_id: str, delta: str):
+        """Send a batch of streamed tokens via WebSocket"""
+        await self.websocket_manager.send_to_execution(
+            execution_id,
+            {
+                "type": "token_delta",
+                "execution_id": execution_id,
+                "task_id": task_id,
+                "delta": delta,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        )
+
+    async def _send_budget_update(self, execution_id: str, budget: ExecutionBudget):
+        """Send budget consumption via WebSocket, logging a warning when a budget runs low"""
+        if not budget.limited:
+            return
+        for resource in budget.new_warnings():
+            used = budget.used()[resource]
+            limit = budget.limits[resource]
+            await self._send_log_update(execution_id, {
+                "timestamp": datetime.utcnow().isoformat(),
+                "message": f"⚠️ {used / limit:.0%} of the {resource} budget used ({used:,}/{limit:,})",
+                "type": "warning"
+            })
+        await self.websocket_manager.send_to_execution(
+            execution_id,
+            {
+                "type": "budget_update",
+                "execution_id": execution_id,
+                "budget": budget.to_dict(),
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        )
 
     async def _send_log_update(self, execution_id: str, log_entry: Dict[str, Any]):
-        """Send log update via WebSocket"""
+        """Append a log entry to the execution log and send it via WebSocket"""
+        log_entry["seq"] = await execution_log.append(execution_id, log_entry)
         await self.websocket_manager.send_to_execution(
             execution_id,
             {
@@ -257,35 +936,55 @@ class ExecutionService:
             }
         )
 
-    def cancel_execution(self, execution_id: str) -> bool:
-        """Cancel an execution"""
+    async def cancel_execution(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel an execution and stop its run
+        
+        A run in this process is cancelled right away (aborting in-flight LLM calls) and awaited;
+        one in another process stops within EXECUTION_CANCEL_POLL_INTERVAL. Returns None if the
+        execution doesn't exist or already finished.
+        """
         execution = self.db.query(Execution).filter(Execution.id == execution_id).first()
         if not execution or execution.status not in ["running", "pending"]:
-            return False
+            return None
         
         execution.status = "cancelled"
         execution.completed_at = datetime.utcnow()
         self.db.commit()
         
         # Send cancellation update
-        asyncio.create_task(self.websocket_manager.send_to_execution(
+        await self.websocket_manager.send_to_execution(
             execution_id,
             {
                 "type": "execution_cancelled",
                 "execution_id": execution_id,
                 "timestamp": datetime.utcnow().isoformat()
             }
-        ))
+        )
         
-        return True
+        latency_ms = await execution_pool.cancel(execution_id)
+        return {"stopped": latency_ms is not None, "cancel_latency_ms": latency_ms}
 
-    def get_execution_logs(self, execution_id: str) -> List[Dict[str, Any]]:
-        """Get execution logs"""
+    def get_execution_logs(self, execution_id: str, after_seq: int = 0, limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Get a page of execution logs after the `after_seq` cursor"""
         execution = self.db.query(Execution).filter(Execution.id == execution_id).first()
         if not execution:
-            return []
+            return None
         
-        return execution.logs or []
+        return self._log_page(execution, after_seq, limit or settings.EXECUTION_LOG_PAGE_SIZE)
+
+    def _log_page(self, execution: Execution, after_seq: int, limit: int) -> Dict[str, Any]:
+        """Log entries with seq > after_seq, plus the cursor to continue from"""
+        logs, has_more = execution_log.read(self.db, execution.id, after_seq, limit)
+        if not logs and execution.logs:
+            # Executions from before the log table keep their entries in the JSON column
+            legacy = [{"seq": index + 1, **entry} for index, entry in enumerate(execution.logs)]
+            logs = legacy[after_seq:after_seq + limit]
+            has_more = len(legacy) > after_seq + limit
+        return {
+            "logs": logs,
+            "next_after_seq": logs[-1]["seq"] if logs else after_seq,
+            "has_more": has_more
+        }
 
     def get_system_metrics(self) -> Dict[str, Any]:
         """Get system metrics - currently using mock data for development
@@ -309,5 +1008,19 @@ class ExecutionService:
             "disk_usage": 34,
             "active_executions": active_executions,
             "total_executions": total_executions,
+            "http_pool": http_client_manager.get_pool_stats(),
+            "llm_cache": response_cache.get_stats(),
+            "request_coalescing": request_coalescer.get_stats(),
+            "rate_limits": rate_limiters.get_stats(),
+            "circuit_breakers": circuit_breakers.get_stats(),
+            "retries": retry_policy.get_stats(),
+            "model_catalog": model_catalog.get_stats(),
+            "cassette": cassette.get_stats(),
+            "hedging": hedging.get_stats(),
+            "execution_pool": execution_pool.get_stats(self.db),
+            "execution_logs": execution_log.get_stats(),
+            "task_memo": task_memo.get_stats(),
+            "result_blobs": blob_store.get_stats(),
+            "endpoints": endpoint_pool.get_stats(),
             "timestamp": datetime.now(timezone.utc).isoformat()
         } 
\ No newline at end of file
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import math
+from collections import deque
+from typing import Dict, Any, Deque, Optional, Callable, Awaitable, AsyncIterator, Tuple, TypeVar
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_EXHAUSTED = object()
+
+class HedgingController:
+    """Hedged requests: if the primary call is slower than the recent latency percentile,
+    fire a backup call and keep whichever answers first, within a fixed extra-request budget"""
+
+    def __init__(self):
+        self._latencies: Dict[Tuple[str, str], Deque[float]] = {}
+        self._stats = {"primaries": 0, "hedges": 0, "hedge_wins": 0, "skipped_budget": 0}
+
+    def record_latency(self, model_id: str, kind: str, seconds: float):
+        """Record a first-byte latency sample (full latency for non-streaming calls)"""
+        samples = self._latencies.get((model_id, kind))
+        if samples is None:
+            samples = deque(maxlen=settings.CEREBRAS_HEDGE_WINDOW)
+            self._latencies[(model_id, kind)] = samples
+        samples.append(seconds)
+
+    def hedge_delay(self, model_id: str, kind: str) -> Optional[float]:
+        """Latency percentile after which a hedge is fired; None until enough samples exist"""
+        samples = self._latencies.get((model_id, kind))
+        if not samples or len(samples) < settings.CEREBRAS_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, math.ceil(settings.CEREBRAS_HEDGE_PERCENTILE / 100.0 * len(ordered)) - 1)
+        return ordered[max(0, index)]
+
+    def _take_budget(self) -> bool:
+        if self._stats["hedges"] + 1 > settings.CEREBRAS_HEDGE_BUDGET_RATIO * self._stats["primaries"]:
+            self._stats["skipped_budget"] += 1
+            return False
+        self._stats["hedges"] += 1
+        return True
+
+    async def race(
+        self,
+        model_id: str,
+        primary: Callable[[], Awaitable[T]],
+        hedge: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Await primary(), hedging with hedge() once the primary exceeds the latency percentile"""
+        self._stats["primaries"] += 1
+        delay = self.hedge_delay(model_id, "completion")
+        primary_task = asyncio.ensure_future(primary())
+        if delay is None:
+            return await primary_task
+
+        tasks = [primary_task]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self._take_budget():
+                return await primary_task
+
+            tasks.append(asyncio.ensure_future(hedge()))
+            return await self._first_success(tasks)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _first_success(self, tasks: list):
+        """Result of whichever task succeeds first; raise only if all fail"""
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not tasks[0]:
+                        self._stats["hedge_wins"] += 1
+                    return task.result()
+                error = error or task.exception()
+        raise error
+
+    async def race_stream(
+        self,
+        model_id: str,
+        primary: Callable[[], AsyncIterator[T]],
+        hedge: Callable[[], AsyncIterator[T]]
+    ) -> AsyncIterator[T]:
+        """Like race(), but the race is won by the first streamed chunk; the loser's stream is closed"""
+        self._stats["primaries"] += 1
+        delay = self.hedge_delay(model_id, "stream")
+        streams = [primary()]
+        firsts = [asyncio.ensure_future(_first_item(streams[0]))]
+        winner = 0
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(firsts, timeout=delay)
+                if not done and self._take_budget():
+                    streams.append(hedge())
+                    firsts.append(asyncio.ensure_future(_first_item(streams[1])))
+                    await self._first_success(firsts)
+                    winner = next(i for i, task in enumerate(firsts) if task.done() and task.exception() is None)
+            first = await firsts[winner]
+        finally:
+            for index, task in enumerate(firsts):
+                if index != winner and not task.done():
+                    task.cancel()
+            await asyncio.gather(*[task for index, task in enumerate(firsts) if index != winner], return_exceptions=True)
+            for index, stream in enumerate(streams):
+                if index != winner:
+                    await stream.aclose()
+
+        if first is _EXHAUSTED:
+            return
+        yield first
+        async for item in streams[winner]:
+            yield item
+
+    def get_stats(self) -> Dict[str, Any]:
+        primaries = self._stats["primaries"]
+        hedges = self._stats["hedges"]
+        return {
+            "enabled": settings.CEREBRAS_HEDGING_ENABLED,
+            **self._stats,
+            "hedge_rate": round(hedges / primaries, 4) if primaries else 0.0,
+            "win_rate": round(self._stats["hedge_wins"] / hedges, 4) if hedges else 0.0,
+            "delays_ms": {
+                f"{model_id}/{kind}": round(delay * 1000, 1)
+                for (model_id, kind) in self._latencies
+                for delay in [self.hedge_delay(model_id, kind)]
+                if delay is not None
+            }
+        }
+
+async def _first_item(stream: AsyncIterator[T]):
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return _EXHAUSTED
+
+hedging = HedgingController()
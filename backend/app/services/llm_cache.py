@@ -0,0 +1,180 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class LLMResponseCache:
+    """Two-tier (in-memory LRU + on-disk SQLite) cache for LLM completions"""
+
+    def __init__(self, path: str, max_memory_entries: int, max_disk_entries: int, ttl: int):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_count = 0
+        self._disk_lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "expired": 0
+        }
+
+    @staticmethod
+    def make_key(model_id: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> str:
+        """Hash the full request into a cache key"""
+        payload = json.dumps(
+            {
+                "model": model_id,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens
+            },
+            sort_keys=True,
+            separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed_at ON llm_cache (accessed_at)")
+            self._conn.commit()
+            self._disk_count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        return self._conn
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl > 0 and time.time() - created_at > self.ttl
+
+    def _memory_put(self, key: str, created_at: float, value: Dict[str, Any]):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["memory_evictions"] += 1
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        with self._disk_lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if not row:
+                return None
+
+            value, created_at = row
+            if self._is_expired(created_at):
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                conn.commit()
+                self._disk_count -= 1
+                self._stats["expired"] += 1
+                return None
+
+            conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            return created_at, json.loads(value)
+
+    def _disk_put(self, key: str, created_at: float, value: Dict[str, Any]):
+        with self._disk_lock:
+            conn = self._connect()
+            existed = conn.execute("SELECT 1 FROM llm_cache WHERE key = ?", (key,)).fetchone() is not None
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), created_at, created_at)
+            )
+            if not existed:
+                self._disk_count += 1
+
+            # Size-based eviction of the least recently accessed entries
+            overflow = self._disk_count - self.max_disk_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                    (overflow,)
+                )
+                self._disk_count -= overflow
+                self._stats["disk_evictions"] += overflow
+            conn.commit()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached completion, promoting disk hits into memory"""
+        entry = self._memory.get(key)
+        if entry is not None:
+            created_at, value = entry
+            if not self._is_expired(created_at):
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return value
+            del self._memory[key]
+            self._stats["expired"] += 1
+
+        try:
+            entry = await asyncio.to_thread(self._disk_get, key)
+        except sqlite3.Error as e:
+            logger.error(f"LLM cache disk read failed: {e}")
+            entry = None
+
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+
+        created_at, value = entry
+        self._memory_put(key, created_at, value)
+        self._stats["disk_hits"] += 1
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        """Store a completion in both tiers"""
+        created_at = time.time()
+        self._memory_put(key, created_at, value)
+        self._stats["writes"] += 1
+        try:
+            await asyncio.to_thread(self._disk_put, key, created_at, value)
+        except sqlite3.Error as e:
+            logger.error(f"LLM cache disk write failed: {e}")
+
+    def clear(self):
+        """Drop all cached entries"""
+        self._memory.clear()
+        with self._disk_lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM llm_cache")
+            conn.commit()
+            self._disk_count = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache hit/miss/eviction counters"""
+        hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            "enabled": settings.LLM_CACHE_ENABLED,
+            **self._stats,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_entries": self._disk_count
+        }
+
+response_cache = LLMResponseCache(
+    path=settings.LLM_CACHE_PATH,
+    max_memory_entries=settings.LLM_CACHE_MEMORY_ENTRIES,
+    max_disk_entries=settings.LLM_CACHE_DISK_ENTRIES,
+    ttl=settings.LLM_CACHE_TTL
+)
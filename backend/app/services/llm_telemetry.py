@@ -0,0 +1,122 @@
+import asyncio
+from dataclasses import dataclass, asdict, field
+from typing import Dict, Any, List, Optional
+
+@dataclass
+class CompletionResult:
+    """Content of one LLM call plus its usage and timing"""
+
+    content: str = ""
+    model: Optional[str] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    ttft_ms: Optional[float] = None  # time to first token; equals latency for non-streaming calls
+    latency_ms: float = 0.0
+    tokens_per_second: float = 0.0  # completion tokens over the generation time (after the first token when streaming)
+    streamed: bool = False
+    cached: bool = False  # served from the response cache, no tokens spent
+    coalesced: bool = False  # joined another caller's identical in-flight request, which accounts for its usage
+    usage_estimated: bool = False  # provider sent no usage block, counts come from the local tokenizer
+    aborted: bool = False  # cancelled mid-call; content and usage cover what was generated before the abort
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("content")
+        return data
+
+@dataclass
+class _Totals:
+    calls: int = 0
+    cached_calls: int = 0
+    coalesced_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    llm_time_ms: float = 0.0
+    ttft_ms_sum: float = 0.0
+    generation_ms_sum: float = 0.0
+
+    def add(self, result: CompletionResult):
+        if result.cached:
+            self.cached_calls += 1
+            return
+        if result.coalesced:
+            self.coalesced_calls += 1
+            return
+        self.calls += 1
+        self.prompt_tokens += result.prompt_tokens
+        self.completion_tokens += result.completion_tokens
+        self.total_tokens += result.total_tokens
+        self.llm_time_ms += result.latency_ms
+        self.ttft_ms_sum += result.ttft_ms or 0.0
+        self.generation_ms_sum += result.latency_ms - (result.ttft_ms or 0.0) if result.streamed else result.latency_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "cached_calls": self.cached_calls,
+            "coalesced_calls": self.coalesced_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "llm_time_ms": round(self.llm_time_ms, 1),
+            "avg_ttft_ms": round(self.ttft_ms_sum / self.calls, 1) if self.calls else None,
+            "avg_latency_ms": round(self.llm_time_ms / self.calls, 1) if self.calls else None,
+            "tokens_per_second": round(self.completion_tokens * 1000 / self.generation_ms_sum, 1) if self.generation_ms_sum > 0 else None
+        }
+
+@dataclass
+class ExecutionTelemetry:
+    """Per-call LLM records of one execution, aggregated overall and per agent
+
+    Cached and coalesced calls are listed but spend no tokens or API calls. Calls admitted
+    by a budget hold a reservation (tokens they may spend) until they are recorded or released.
+    """
+
+    calls: List[Dict[str, Any]] = field(default_factory=list)
+    totals: _Totals = field(default_factory=_Totals)
+    agents: Dict[str, _Totals] = field(default_factory=dict)
+    reserved_tokens: int = 0
+    reserved_calls: int = 0
+    _settled: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def reserve(self, tokens: int) -> int:
+        self.reserved_tokens += tokens
+        self.reserved_calls += 1
+        return tokens
+
+    def release(self, reservation: Optional[int]):
+        """Drop a call's reservation (it was recorded, failed or never sent)"""
+        if reservation is None:
+            return
+        self.reserved_tokens -= reservation
+        self.reserved_calls -= 1
+        settled, self._settled = self._settled, asyncio.Event()
+        settled.set()
+
+    async def wait_settled(self):
+        """Wait until some reservation is released"""
+        await self._settled.wait()
+
+    def record(self, result: CompletionResult, agent: Optional[str] = None, task: Optional[str] = None, reservation: Optional[int] = None):
+        """Add a call's actual usage, settling its reservation"""
+        self.calls.append({"agent": agent, "task": task, **result.to_dict()})
+        self.totals.add(result)
+        self.agents.setdefault(agent or "unassigned", _Totals()).add(result)
+        self.release(reservation)
+
+    @property
+    def tokens_used(self) -> int:
+        return self.totals.total_tokens
+
+    @property
+    def api_calls(self) -> int:
+        return self.totals.calls
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "totals": self.totals.to_dict(),
+            "agents": {name: totals.to_dict() for name, totals in self.agents.items()},
+            "calls": self.calls
+        }
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Any, Optional, Callable, Awaitable, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[], Awaitable[Dict[str, Any]]]
+
+class ModelCatalog:
+    """In-process cache of the model list and per-model status with stale-while-revalidate
+
+    Status is only cached for models of the catalog, for at most MODEL_STATUS_MAX_KEYS of them
+    (least recently read evicted). The refresher drops status keys that failed to refresh or
+    haven't been read within MODEL_CATALOG_MAX_STALE.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._loaders: Dict[str, Loader] = {}
+        self._last_read: Dict[str, float] = {}
+        self._revalidating: Dict[str, asyncio.Task] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0, "evictions": 0}
+
+    def _ttl(self, key: str) -> float:
+        return settings.MODEL_STATUS_TTL if key.startswith("status:") else settings.MODEL_CATALOG_TTL
+
+    async def _load(self, key: str, loader: Loader) -> Dict[str, Any]:
+        """Fetch and store a fresh value; failed fetches never replace cached data"""
+        self._stats["refreshes"] += 1
+        value = await loader()
+        if not value or "error" in value:
+            self._stats["refresh_errors"] += 1
+        else:
+            self._entries[key] = (time.monotonic(), value)
+        return value
+
+    def _revalidate(self, key: str, loader: Loader):
+        task = self._revalidating.get(key)
+        if task is None or task.done():
+            task = asyncio.create_task(self._load(key, loader))
+            task.add_done_callback(lambda _: self._revalidating.pop(key, None))
+            self._revalidating[key] = task
+
+    def _register(self, key: str, loader: Loader):
+        if key not in self._loaders and key.startswith("status:"):
+            status_keys = [name for name in self._loaders if name.startswith("status:")]
+            if len(status_keys) >= settings.MODEL_STATUS_MAX_KEYS:
+                self._drop(min(status_keys, key=lambda name: self._last_read.get(name, 0.0)))
+                self._stats["evictions"] += 1
+        self._loaders[key] = loader
+        self._last_read[key] = time.monotonic()
+
+    def _drop(self, key: str):
+        self._loaders.pop(key, None)
+        self._last_read.pop(key, None)
+        self._entries.pop(key, None)
+
+    async def get(self, key: str, loader: Loader) -> Dict[str, Any]:
+        """Return the cached value; stale values are served while a refresh runs in the background"""
+        self._register(key, loader)
+        entry = self._entries.get(key)
+        if entry is not None:
+            fetched_at, value = entry
+            age = time.monotonic() - fetched_at
+            if age < self._ttl(key):
+                self._stats["hits"] += 1
+                return value
+            if age < self._ttl(key) + settings.MODEL_CATALOG_MAX_STALE:
+                self._stats["stale_hits"] += 1
+                self._revalidate(key, loader)
+                return value
+
+        self._stats["misses"] += 1
+        value = await self._load(key, loader)
+        # Upstream failed: an expired entry beats an error
+        if (not value or "error" in value) and entry is not None:
+            return entry[1]
+        return value
+
+    async def get_models(self, loader: Loader) -> Dict[str, Any]:
+        return await self.get("models", loader)
+
+    async def get_status(self, model_id: str, loader: Loader) -> Dict[str, Any]:
+        """Cached status of a catalog model; ids come from clients, so unknown ones are never cached"""
+        models = self._models()
+        if models is None:
+            # No catalog to check against yet: answer without keeping anything around
+            return await loader()
+        if model_id not in models:
+            return {"model_id": model_id, "error": "Unknown model"}
+        return await self.get(f"status:{model_id}", loader)
+
+    def _models(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Models of the cached catalog by id, None if it hasn't been loaded"""
+        entry = self._entries.get("models")
+        if entry is None:
+            return None
+        catalog = entry[1]
+        return {model.get("id"): model for model in catalog.get("models") or catalog.get("data") or []}
+
+    def get_context_length(self, model_id: str) -> Optional[int]:
+        """Context window reported by the cached catalog, if the provider exposes it"""
+        model = (self._models() or {}).get(model_id)
+        if model is None:
+            return None
+        return model.get("context_length") or model.get("context_window")
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(settings.MODEL_CATALOG_REFRESH_INTERVAL)
+            now = time.monotonic()
+            for key, loader in list(self._loaders.items()):
+                if key != "models" and now - self._last_read.get(key, 0.0) > settings.MODEL_CATALOG_MAX_STALE:
+                    # Nobody asks for this model's status any more
+                    self._drop(key)
+                    continue
+                try:
+                    value = await self._load(key, loader)
+                    failed = not value or "error" in value
+                except Exception as e:
+                    self._stats["refresh_errors"] += 1
+                    logger.error(f"Model catalog refresh of '{key}' failed: {e}")
+                    failed = True
+                if failed and key != "models":
+                    self._drop(key)
+
+    async def start(self, models_loader: Loader):
+        """Warm the catalog and start the background refresher (called from the app lifespan)"""
+        self._loaders["models"] = models_loader
+        try:
+            await self._load("models", models_loader)
+        except Exception as e:
+            logger.error(f"Initial model catalog load failed: {e}")
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        tasks = [task for task in [self._refresh_task, *self._revalidating.values()] if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refresh_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            **self._stats,
+            "entries": {key: round(now - fetched_at, 1) for key, (fetched_at, _) in self._entries.items()},
+            "status_keys": sum(1 for key in self._loaders if key.startswith("status:")),
+            "refresher_running": self._refresh_task is not None and not self._refresh_task.done()
+        }
+
+model_catalog = ModelCatalog()
@@ -0,0 +1,244 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Any, Deque, Optional, Mapping
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OWNER = "default"
+
+class TokenBucket:
+    """Continuously refilling token bucket"""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+            self.updated_at = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available"""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.tokens
+        if missing <= 0:
+            return 0.0
+        if self.refill_per_second <= 0:
+            return float("inf")
+        return missing / self.refill_per_second
+
+    def consume(self, amount: float, now: float):
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float, now: float):
+        self._refill(now)
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def resize(self, capacity: float, now: float):
+        """Adopt a new per-minute capacity reported by the provider"""
+        self._refill(now)
+        self.capacity = capacity
+        self.refill_per_second = capacity / 60.0
+        self.tokens = min(self.tokens, capacity)
+
+    def cap(self, remaining: float, now: float):
+        """Never believe we have more than the provider says is left"""
+        self._refill(now)
+        self.tokens = min(self.tokens, remaining)
+
+    def drain(self, now: float):
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0)
+
+class _Waiter:
+    def __init__(self, tokens: float):
+        self.tokens = tokens
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.enqueued_at = time.monotonic()
+
+class ModelRateLimiter:
+    """Admission control for one model: requests-per-minute and tokens-per-minute buckets
+    with a round-robin wait queue across owners (executions)"""
+
+    def __init__(self, model_id: str, requests_per_minute: int, tokens_per_minute: int):
+        self.model_id = model_id
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self.blocked_until = 0.0
+
+        self._queues: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._stats = {
+            "admitted": 0,
+            "queued": 0,
+            "throttled": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0
+        }
+
+    def _time_until(self, tokens: float, now: float) -> float:
+        return max(
+            self.blocked_until - now,
+            self.requests.time_until(1, now),
+            self.tokens.time_until(tokens, now)
+        )
+
+    def _admit(self, tokens: float, now: float, waited: float = 0.0):
+        self.requests.consume(1, now)
+        self.tokens.consume(tokens, now)
+        wait_ms = waited * 1000
+        self._stats["admitted"] += 1
+        self._stats["total_wait_ms"] += wait_ms
+        self._stats["max_wait_ms"] = max(self._stats["max_wait_ms"], wait_ms)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def acquire(self, tokens: float, owner: Optional[str] = None) -> float:
+        """Wait until a request of `tokens` estimated tokens may be sent; returns seconds waited"""
+        now = time.monotonic()
+        if not self._queues and self._time_until(tokens, now) <= 0:
+            self._admit(tokens, now)
+            return 0.0
+
+        waiter = _Waiter(tokens)
+        self._queues.setdefault(owner or DEFAULT_OWNER, deque()).append(waiter)
+        self._stats["queued"] += 1
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Admitted just as we were cancelled, give the budget back
+                self.release(tokens)
+            raise
+        return time.monotonic() - waiter.enqueued_at
+
+    async def _dispatch(self):
+        """Grant queued waiters one owner at a time so no execution starves the others"""
+        while self._queues:
+            owner, queue = next(iter(self._queues.items()))
+            while queue and queue[0].future.done():
+                queue.popleft()
+            if not queue:
+                del self._queues[owner]
+                continue
+
+            waiter = queue[0]
+            now = time.monotonic()
+            wait = self._time_until(waiter.tokens, now)
+            if wait > 0:
+                await asyncio.sleep(min(wait, 1.0))
+                continue
+
+            queue.popleft()
+            self._admit(waiter.tokens, now, waited=now - waiter.enqueued_at)
+            waiter.future.set_result(None)
+
+            # Rotate the owner to the back of the line
+            del self._queues[owner]
+            if queue:
+                self._queues[owner] = queue
+
+    def release(self, tokens: float):
+        """Return the budget of a request that was never sent"""
+        now = time.monotonic()
+        self.requests.refund(1, now)
+        self.tokens.refund(tokens, now)
+
+    def reconcile(self, estimated_tokens: float, actual_tokens: float):
+        """Correct the token bucket once the real usage is known"""
+        now = time.monotonic()
+        difference = estimated_tokens - actual_tokens
+        if difference > 0:
+            self.tokens.refund(difference, now)
+        elif difference < 0:
+            self.tokens.consume(-difference, now)
+
+    def observe_response(self, status_code: int, headers: Mapping[str, str]):
+        """Adapt bucket sizes from rate-limit headers and back off on 429s"""
+        now = time.monotonic()
+
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            limit = _parse_float(headers.get(f"x-ratelimit-limit-{kind}-minute"))
+            if limit:
+                if limit != bucket.capacity:
+                    logger.info(f"Adjusting {self.model_id} {kind}/minute limit to {limit:g}")
+                    bucket.resize(limit, now)
+            remaining = _parse_float(headers.get(f"x-ratelimit-remaining-{kind}-minute"))
+            if remaining is not None:
+                bucket.cap(remaining, now)
+
+        if status_code == 429:
+            self._stats["throttled"] += 1
+            retry_after = _parse_float(headers.get("retry-after"))
+            if retry_after is None:
+                retry_after = _parse_float(headers.get("x-ratelimit-reset-tokens-minute")) or 1.0
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+            self.requests.drain(now)
+            logger.warning(f"Rate limited on {self.model_id}, pausing admissions for {retry_after:.1f}s")
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        self.requests._refill(now)
+        self.tokens._refill(now)
+        admitted = self._stats["admitted"]
+        return {
+            "queue_depth": self.queue_depth,
+            "waiting_owners": len(self._queues),
+            "admitted": admitted,
+            "queued": self._stats["queued"],
+            "throttled": self._stats["throttled"],
+            "avg_wait_ms": round(self._stats["total_wait_ms"] / admitted, 2) if admitted else 0.0,
+            "max_wait_ms": round(self._stats["max_wait_ms"], 2),
+            "requests_per_minute": self.requests.capacity,
+            "tokens_per_minute": self.tokens.capacity,
+            "requests_available": round(self.requests.tokens, 2),
+            "tokens_available": round(self.tokens.tokens, 2),
+            "blocked_for_s": round(max(0.0, self.blocked_until - now), 2)
+        }
+
+def _parse_float(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+class RateLimiterRegistry:
+    """Process-wide per-model rate limiters"""
+
+    def __init__(self):
+        self._limiters: Dict[str, ModelRateLimiter] = {}
+
+    def get(self, model_id: str) -> ModelRateLimiter:
+        limiter = self._limiters.get(model_id)
+        if limiter is None:
+            limiter = ModelRateLimiter(
+                model_id,
+                requests_per_minute=settings.CEREBRAS_REQUESTS_PER_MINUTE,
+                tokens_per_minute=settings.CEREBRAS_TOKENS_PER_MINUTE
+            )
+            self._limiters[model_id] = limiter
+        return limiter
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.CEREBRAS_RATE_LIMIT_ENABLED,
+            "models": {model_id: limiter.get_stats() for model_id, limiter in self._limiters.items()}
+        }
+
+rate_limiters = RateLimiterRegistry()
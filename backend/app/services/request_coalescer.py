@@ -0,0 +1,123 @@
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional, Callable, Awaitable, AsyncIterator, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class _SharedStream:
+    """Buffered fan-out of one async iterator to many subscribers"""
+
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._event = asyncio.Event()
+
+    def publish(self):
+        event, self._event = self._event, asyncio.Event()
+        event.set()
+
+    async def wait(self):
+        await self._event.wait()
+
+class RequestCoalescer:
+    """Single-flight execution: concurrent callers with the same key share one in-flight request"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._streams: Dict[str, _SharedStream] = {}
+        self._waiters: Dict[str, int] = {}
+        self._stats = {"leaders": 0, "coalesced": 0}
+
+    def _join(self, key: str, leader: bool):
+        self._stats["leaders" if leader else "coalesced"] += 1
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+
+    def _leave(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is not task:
+            return
+        self._waiters[key] -= 1
+        # Nobody is waiting for the result any more, stop spending on it; the key is freed right
+        # away so a caller arriving before the task has wound down starts a fresh request
+        if self._waiters[key] <= 0 and not task.done():
+            self._forget(key, task)
+            task.cancel()
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            self._streams.pop(key, None)
+            self._waiters.pop(key, None)
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """Run factory() once per key and share its result with all concurrent callers"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self._join(key, leader=True)
+        else:
+            self._join(key, leader=False)
+
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._leave(key, task)
+
+    async def run_stream(self, key: str, factory: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """Consume factory() once per key and replay every chunk to all concurrent subscribers"""
+        task = self._inflight.get(key)
+        shared = self._streams.get(key)
+        if task is None or shared is None:
+            shared = _SharedStream()
+            task = asyncio.ensure_future(self._pump(shared, factory))
+            self._inflight[key] = task
+            self._streams[key] = shared
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self._join(key, leader=True)
+        else:
+            self._join(key, leader=False)
+
+        try:
+            index = 0
+            while True:
+                while index < len(shared.chunks):
+                    yield shared.chunks[index]
+                    index += 1
+                if shared.done:
+                    if shared.error is not None:
+                        raise shared.error
+                    return
+                await shared.wait()
+        finally:
+            self._leave(key, task)
+
+    async def _pump(self, shared: _SharedStream, factory: Callable[[], AsyncIterator[T]]):
+        try:
+            async for chunk in factory():
+                shared.chunks.append(chunk)
+                shared.publish()
+        except BaseException as e:
+            shared.error = e
+            if not isinstance(e, asyncio.CancelledError):
+                logger.debug(f"Coalesced stream failed: {e}")
+        finally:
+            shared.done = True
+            shared.publish()
+
+    def is_inflight(self, key: str) -> bool:
+        """Whether a call for the key is running, i.e. a caller would join it rather than lead"""
+        return key in self._inflight
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing counters and per-key waiter counts"""
+        return {
+            **self._stats,
+            "inflight": len(self._inflight),
+            "waiters": {key[:48]: count for key, count in self._waiters.items()}
+        }
+
+request_coalescer = RequestCoalescer()
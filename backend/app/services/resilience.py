@@ -0,0 +1,142 @@
+import logging
+import random
+import time
+from typing import Dict, Any, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because its circuit is open"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Circuit '{name}' is open, retry in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+class CircuitBreaker:
+    """Closed / open / half-open circuit breaker for one upstream endpoint"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._stats = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through"""
+        if self.state == self.OPEN:
+            elapsed = time.monotonic() - self.opened_at
+            if elapsed < self.recovery_timeout:
+                self._stats["rejected"] += 1
+                raise CircuitOpenError(self.name, self.recovery_timeout - elapsed)
+            self.state = self.HALF_OPEN
+            logger.info(f"Circuit '{self.name}' half-open, probing upstream")
+
+        if self.state == self.HALF_OPEN:
+            # Only a single probe is allowed while half-open
+            if self._probe_in_flight:
+                self._stats["rejected"] += 1
+                raise CircuitOpenError(self.name, 0.0)
+            self._probe_in_flight = True
+
+    def record_success(self):
+        self._stats["successes"] += 1
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit '{self.name}' closed")
+        self.state = self.CLOSED
+
+    def record_failure(self):
+        self._stats["failures"] += 1
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self._stats["opened"] += 1
+                logger.warning(f"Circuit '{self.name}' opened after {self.consecutive_failures} consecutive failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """Forget a half-open probe that ended without an upstream verdict (e.g. cancelled)"""
+        self._probe_in_flight = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            **self._stats
+        }
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, plus retry counters per endpoint"""
+
+    def __init__(self, max_retries: int, base_delay: float, max_delay: float):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _endpoint_stats(self, endpoint: str) -> Dict[str, int]:
+        return self._stats.setdefault(endpoint, {"calls": 0, "retries": 0, "exhausted": 0})
+
+    def should_retry(self, attempt: int, retryable: bool) -> bool:
+        return retryable and attempt < self.max_retries
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def record_call(self, endpoint: str):
+        self._endpoint_stats(endpoint)["calls"] += 1
+
+    def record_retry(self, endpoint: str):
+        self._endpoint_stats(endpoint)["retries"] += 1
+
+    def record_exhausted(self, endpoint: str):
+        self._endpoint_stats(endpoint)["exhausted"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {endpoint: dict(stats) for endpoint, stats in self._stats.items()}
+
+class CircuitBreakerRegistry:
+    """Process-wide circuit breakers keyed by endpoint"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name,
+                failure_threshold=settings.CEREBRAS_CIRCUIT_FAILURE_THRESHOLD,
+                recovery_timeout=settings.CEREBRAS_CIRCUIT_RECOVERY_TIMEOUT
+            )
+            self._breakers[name] = breaker
+        return breaker
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {name: breaker.get_stats() for name, breaker in self._breakers.items()}
+
+circuit_breakers = CircuitBreakerRegistry()
+retry_policy = RetryPolicy(
+    max_retries=settings.CEREBRAS_MAX_RETRIES,
+    base_delay=settings.CEREBRAS_RETRY_BASE_DELAY,
+    max_delay=settings.CEREBRAS_RETRY_MAX_DELAY
+)
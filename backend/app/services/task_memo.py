@@ -0,0 +1,92 @@
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import Agent, Task, TaskResult
+
+logger = logging.getLogger(__name__)
+
+def _hash(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+class TaskMemo:
+    """Task outputs memoized across executions (the task_results table)
+
+    A task's key covers everything that shapes its prompt: the agent's identity and sampling
+    settings, the task definition, the run's inputs and the hashes of the upstream outputs
+    fed into it. Editing one task of a crew therefore changes its key and those of the tasks
+    downstream of it, while every other task is served from the memo.
+    """
+
+    def __init__(self):
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "writes": 0, "tokens_saved": 0}
+
+    @staticmethod
+    def make_key(agent: Optional[Agent], task: Task, model_id: str, temperature: float, upstream_outputs: List[str], inputs: Optional[Dict[str, Any]] = None) -> str:
+        return _hash({
+            "agent": {
+                "name": agent.name if agent else None,
+                "role": agent.role if agent else None,
+                "goal": agent.goal if agent else None,
+                "backstory": agent.backstory if agent else None,
+                "model": agent.model if agent else None
+            },
+            "model": model_id,
+            "temperature": temperature,
+            "task": {
+                "description": task.description,
+                "expected_output": task.expected_output,
+                "output_format": task.output_format,
+                "context": task.context
+            },
+            "upstream": [hashlib.sha256(output.encode("utf-8")).hexdigest() for output in upstream_outputs],
+            "inputs": inputs or {}
+        })
+
+    def get(self, db: Session, key: str) -> Optional[TaskResult]:
+        """The stored result for a key, or None (expired entries count as misses)"""
+        entry = db.query(TaskResult).filter(TaskResult.key == key).first()
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+        if settings.TASK_MEMO_TTL and entry.created_at and entry.created_at < datetime.utcnow() - timedelta(seconds=settings.TASK_MEMO_TTL):
+            self._stats["expired"] += 1
+            self._stats["misses"] += 1
+            return None
+
+        entry.hits = (entry.hits or 0) + 1
+        entry.last_used_at = datetime.utcnow()
+        db.commit()
+        self._stats["hits"] += 1
+        self._stats["tokens_saved"] += entry.tokens_used or 0
+        return entry
+
+    def put(self, db: Session, key: str, task: Task, output: str, tokens_used: int):
+        db.merge(TaskResult(
+            key=key,
+            crew_id=task.crew_id,
+            task_id=task.id,
+            task_name=task.name,
+            output=output,
+            tokens_used=tokens_used,
+            hits=0,
+            created_at=datetime.utcnow(),
+            last_used_at=datetime.utcnow()
+        ))
+        db.commit()
+        self._stats["writes"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "enabled": settings.TASK_MEMO_ENABLED,
+            **self._stats,
+            "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0
+        }
+
+task_memo = TaskMemo()
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import logging
+from typing import Dict, Any, List, Optional, Set, Tuple, Callable, Awaitable
+
+from app.core.database import Agent, Task
+
+logger = logging.getLogger(__name__)
+
+# run_task(task, upstream) -> output; upstream pairs each context dependency with its output
+TaskRunner = Callable[[Task, List[Tuple[Task, str]]], Awaitable[str]]
+
+class TaskCycleError(ValueError):
+    """Raised when task dependencies form a cycle"""
+
+class TaskGraph:
+    """Task dependencies of a crew
+
+    A task depends on the tasks its `context` lists (a JSON list of task ids/names); their
+    outputs are fed into its prompt. A free-text context names no tasks, so that task runs
+    after every task declared before it, as crews ran before scheduling. Tasks assigned to
+    the same agent also run one after another, in declared order. Listed dependencies that
+    form a cycle fall back to declaration order instead of failing the run.
+    """
+
+    def __init__(self, tasks: List[Task], agents: List[Agent]):
+        self.tasks = list(tasks)
+        self.by_id: Dict[str, Task] = {task.id: task for task in self.tasks}
+        self.context_deps: Dict[str, List[str]] = {task.id: self._context_references(task) for task in self.tasks}
+        self.deps: Dict[str, Set[str]] = {task.id: set(self.context_deps[task.id]) for task in self.tasks}
+
+        for index, task in enumerate(self.tasks):
+            if self._has_free_text_context(task):
+                self.deps[task.id].update(earlier.id for earlier in self.tasks[:index])
+
+        last_by_agent: Dict[str, str] = {}
+        for task in self.tasks:
+            agent_key = self._agent_key(task, agents)
+            if agent_key is None:
+                continue
+            previous = last_by_agent.get(agent_key)
+            # Only order in declaration direction, and never against an explicit context dependency
+            if previous is not None and task.id not in self.deps[previous]:
+                self.deps[task.id].add(previous)
+            last_by_agent[agent_key] = task.id
+
+        if self._has_cycle():
+            # Keep only the dependencies on earlier-declared tasks, which can't form a cycle
+            position = {task.id: index for index, task in enumerate(self.tasks)}
+            cycle = [task.name for task in self.tasks if any(position[dep] > position[task.id] for dep in self.deps[task.id])]
+            logger.warning(f"Task context dependencies form a cycle, running these tasks in declared order: {', '.join(cycle)}")
+            for task_id in self.deps:
+                self.deps[task_id] = {dep for dep in self.deps[task_id] if position[dep] < position[task_id]}
+                self.context_deps[task_id] = [dep for dep in self.context_deps[task_id] if position[dep] < position[task_id]]
+
+    def _agent_key(self, task: Task, agents: List[Agent]) -> Optional[str]:
+        if not task.assigned_agent:
+            return None
+        for agent in agents:
+            if task.assigned_agent in (agent.id, agent.name):
+                return agent.id
+        return task.assigned_agent
+
+    def _context_list(self, task: Task) -> Optional[List[Any]]:
+        """The task's context as a JSON list of task ids/names, None if it is empty or free text"""
+        context = (task.context or "").strip()
+        if not context:
+            return None
+        try:
+            names = json.loads(context)
+        except ValueError:
+            return None
+        return names if isinstance(names, list) else None
+
+    def _has_free_text_context(self, task: Task) -> bool:
+        return bool((task.context or "").strip()) and self._context_list(task) is None
+
+    def _context_references(self, task: Task) -> List[str]:
+        """Ids of the other tasks this task's context lists, in declaration order"""
+        names = self._context_list(task)
+        if not names:
+            return []
+        wanted = {str(name).strip().lower() for name in names}
+        return [
+            other.id for other in self.tasks
+            if other.id != task.id and (other.id.lower() in wanted or (other.name or "").lower() in wanted)
+        ]
+
+    def _has_cycle(self) -> bool:
+        try:
+            self.topological_order()
+        except TaskCycleError:
+            return True
+        return False
+
+    def topological_order(self) -> List[Task]:
+        """Tasks in dependency order, keeping declaration order among independent tasks"""
+        remaining = {task_id: set(deps) for task_id, deps in self.deps.items()}
+        order = []
+        while remaining:
+            ready = [task.id for task in self.tasks if task.id in remaining and not remaining[task.id]]
+            if not ready:
+                cycle = ", ".join(self.by_id[task_id].name for task_id in remaining)
+                raise TaskCycleError(f"Task dependencies form a cycle between: {cycle}")
+            for task_id in ready:
+                order.append(self.by_id[task_id])
+                del remaining[task_id]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    def critical_path_length(self) -> int:
+        """Number of tasks on the longest dependency chain"""
+        depth: Dict[str, int] = {}
+        for task in self.topological_order():
+            depth[task.id] = 1 + max((depth[dep] for dep in self.deps[task.id]), default=0)
+        return max(depth.values(), default=0)
+
+class TaskScheduler:
+    """Runs a TaskGraph with up to `max_parallel` tasks in flight
+
+    A task starts as soon as all of its dependencies have finished. The first failure
+    cancels the tasks still running and is re-raised.
+    """
+
+    def __init__(self, graph: TaskGraph, max_parallel: int):
+        self.graph = graph
+        self.max_parallel = max(1, max_parallel)
+
+    async def run(self, run_task: TaskRunner, completed: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Run every task and return their outputs by task id
+        
+        completed: outputs of tasks finished earlier (e.g. restored from checkpoints); they are not run again.
+        """
+        order = self.graph.topological_order()
+        outputs: Dict[str, str] = dict(completed or {})
+        running: Dict[asyncio.Task, str] = {}
+        pending = [task.id for task in order if task.id not in outputs]
+
+        try:
+            while pending or running:
+                # Start ready tasks in topological order while there is capacity
+                for task_id in list(pending):
+                    if len(running) >= self.max_parallel:
+                        break
+                    if self.graph.deps[task_id] <= outputs.keys():
+                        pending.remove(task_id)
+                        task = self.graph.by_id[task_id]
+                        upstream = [(self.graph.by_id[dep], outputs[dep]) for dep in self.graph.context_deps[task_id]]
+                        running[asyncio.ensure_future(run_task(task, upstream))] = task_id
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    task_id = running.pop(future)
+                    outputs[task_id] = future.result()
+        finally:
+            for future in running:
+                future.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
+        return outputs
+
+    def get_plan(self) -> Dict[str, Any]:
+        """Dependency summary for logs and clients"""
+        return {
+            "tasks": len(self.graph.tasks),
+            "max_parallel": self.max_parallel,
+            "critical_path": self.graph.critical_path_length(),
+            "dependencies": {
+                task.name: [self.graph.by_id[dep].name for dep in self.graph.deps[task.id]]
+                for task in self.graph.tasks
+            }
+        }
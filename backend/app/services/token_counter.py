@@ -0,0 +1,101 @@
+import logging
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from app.core.config import settings
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken is listed in requirements.txt
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Chat formatting overhead per message and for the reply primer (OpenAI-style accounting)
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARKER = "\n...[truncated]"
+
+@lru_cache(maxsize=1)
+def _get_encoder():
+    """Load the tokenizer once per process; None means fall back to a character estimate"""
+    if tiktoken is None:
+        logger.warning("tiktoken is not installed, token counts will be estimated from character length")
+        return None
+    try:
+        return tiktoken.get_encoding(settings.TOKENIZER_ENCODING)
+    except Exception as e:
+        logger.warning(f"Could not load tokenizer '{settings.TOKENIZER_ENCODING}' ({e}), estimating token counts")
+        return None
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """Count the tokens in a piece of text"""
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(encoder.encode(text, disallowed_special=()))
+
+def count_message_tokens(messages: List[Dict[str, str]]) -> int:
+    """Count the prompt tokens of a chat message list"""
+    return sum(TOKENS_PER_MESSAGE + count_tokens(msg.get("content") or "") for msg in messages) + TOKENS_PER_REPLY
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Keep the beginning of `text` so that it fits in `max_tokens` (including the marker)"""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    budget = max(0, max_tokens - count_tokens(TRUNCATION_MARKER))
+    encoder = _get_encoder()
+    if encoder is None:
+        return text[:budget * CHARS_PER_TOKEN] + TRUNCATION_MARKER
+    return encoder.decode(encoder.encode(text, disallowed_special=())[:budget]) + TRUNCATION_MARKER
+
+def fit_to_context(messages: List[Dict[str, str]], max_tokens: int, context_length: int) -> Tuple[List[Dict[str, str]], int]:
+    """Make prompt + completion fit the model's context window
+
+    Clamps max_tokens to the remaining window. If even the minimum completion does not fit,
+    the oldest non-system messages are dropped first (the latest message is always kept),
+    then the longest remaining message is truncated until the prompt fits.
+    Returns the (possibly new) message list and max_tokens.
+    """
+    window = context_length - settings.CONTEXT_SAFETY_MARGIN_TOKENS
+    min_completion = min(max_tokens, settings.MIN_COMPLETION_TOKENS)
+    prompt_tokens = count_message_tokens(messages)
+
+    if prompt_tokens + max_tokens <= window:
+        return messages, max_tokens
+    if prompt_tokens + min_completion <= window:
+        return messages, window - prompt_tokens
+
+    fitted = [dict(msg) for msg in messages]
+    prompt_budget = window - min_completion
+
+    # Compact history: drop the oldest conversational turns
+    while count_message_tokens(fitted) > prompt_budget:
+        droppable = [i for i, msg in enumerate(fitted[:-1]) if msg.get("role") != "system"]
+        if not droppable:
+            break
+        del fitted[droppable[0]]
+
+    # Still too long: truncate the longest message (ties resolved by position)
+    while count_message_tokens(fitted) > prompt_budget:
+        overflow = count_message_tokens(fitted) - prompt_budget
+        index = max(range(len(fitted)), key=lambda i: (count_tokens(fitted[i].get("content") or ""), -i))
+        content = fitted[index].get("content") or ""
+        content_tokens = count_tokens(content)
+        if content_tokens == 0:
+            break
+        fitted[index]["content"] = truncate_to_tokens(content, max(0, content_tokens - overflow))
+        if count_tokens(fitted[index]["content"]) >= content_tokens:
+            break
+
+    dropped = len(messages) - len(fitted)
+    logger.info(
+        f"Prompt of {prompt_tokens} tokens exceeded the {context_length}-token window; "
+        f"dropped {dropped} message(s) and truncated to {count_message_tokens(fitted)} tokens"
+    )
+    return fitted, max(1, min(max_tokens, window - count_message_tokens(fitted)))
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI-compatible stand-in for the Cerebras API
+
+Lets the full CerebrasService path (connection pooling, streaming, retries,
+rate limiting) run offline with configurable latency and failure profiles.
+
+    python cerebras_stub_server.py --profile realistic --port 8100
+
+then point the backend at it:
+
+    CEREBRAS_BASE_URL=http://localhost:8100 CEREBRAS_API_KEY=stub python start.py
+
+Every option can also be set through STUB_* environment variables
+(e.g. STUB_TTFT_MS=300) and changed at runtime with PUT /_stub/config.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+import uuid
+from typing import Dict, Any, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import uvicorn
+
+PROFILES: Dict[str, Dict[str, Any]] = {
+    # Near-zero latency, for measuring client-side overhead
+    "fast": {"ttft_ms": 5, "ttft_jitter_ms": 0, "tokens_per_second": 5000, "error_rate": 0.0, "rate_limit_rate": 0.0},
+    # Roughly what a hosted inference API feels like
+    "realistic": {"ttft_ms": 250, "ttft_jitter_ms": 150, "tokens_per_second": 1500, "error_rate": 0.0, "rate_limit_rate": 0.0},
+    # Long tails, for hedging and timeout testing
+    "slow": {"ttft_ms": 1500, "ttft_jitter_ms": 2500, "tokens_per_second": 200, "error_rate": 0.0, "rate_limit_rate": 0.0},
+    # Transient failures and throttling, for retry / circuit breaker / limiter testing
+    "flaky": {"ttft_ms": 250, "ttft_jitter_ms": 150, "tokens_per_second": 1500, "error_rate": 0.1, "rate_limit_rate": 0.1}
+}
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    **PROFILES["realistic"],
+    "completion_tokens": 400,  # upper bound, also capped by the request's max_tokens
+    "requests_per_minute": 0,  # enforced limit, 0 disables
+    "tokens_per_minute": 0,  # enforced limit, 0 disables
+    "retry_after_s": 2.0,
+    "stream_chunk_tokens": 4,
+    "seed": None
+}
+
+MODELS = [
+    {
+        "id": "llama-4-maverick-17b-128e-instruct",
+        "object": "model",
+        "owned_by": "stub",
+        "context_length": 32768
+    },
+    {
+        "id": "llama-4-scout-17b-16e-instruct",
+        "object": "model",
+        "owned_by": "stub",
+        "context_length": 2048
+    }
+]
+
+WORDS = (
+    "analysis market strategy data model agent task research report insight growth risk "
+    "customer product team result trend signal forecast review plan metric quality system"
+).split()
+
+config: Dict[str, Any] = dict(DEFAULT_CONFIG)
+stats = {"requests": 0, "streams": 0, "errors_injected": 0, "rate_limited": 0, "completion_tokens": 0}
+window: List[tuple] = []  # (timestamp, tokens) of admitted requests in the last minute
+
+app = FastAPI(title="Cerebras API stand-in", version="1.0.0")
+
+def _apply_env(target: Dict[str, Any]):
+    for key, default in DEFAULT_CONFIG.items():
+        raw = os.getenv(f"STUB_{key.upper()}")
+        if raw is None:
+            continue
+        if isinstance(default, bool):
+            target[key] = raw.lower() == "true"
+        elif isinstance(default, int):
+            target[key] = int(raw)
+        elif isinstance(default, float):
+            target[key] = float(raw)
+        else:
+            target[key] = raw
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+def _completion_text(messages: List[Dict[str, str]], n_tokens: int) -> List[str]:
+    """Deterministic pseudo-text for a prompt, one word per token"""
+    digest = hashlib.sha256(json.dumps(messages, sort_keys=True).encode()).digest()
+    rng = random.Random(digest)
+    return [rng.choice(WORDS) for _ in range(n_tokens)]
+
+def _ttft() -> float:
+    jitter = random.expovariate(1.0 / config["ttft_jitter_ms"]) if config["ttft_jitter_ms"] else 0.0
+    return (config["ttft_ms"] + jitter) / 1000.0
+
+def _rate_limit_headers() -> Dict[str, str]:
+    now = time.time()
+    window[:] = [entry for entry in window if now - entry[0] < 60]
+    headers = {}
+    if config["requests_per_minute"]:
+        headers["x-ratelimit-limit-requests-minute"] = str(config["requests_per_minute"])
+        headers["x-ratelimit-remaining-requests-minute"] = str(max(0, config["requests_per_minute"] - len(window)))
+    if config["tokens_per_minute"]:
+        used = sum(tokens for _, tokens in window)
+        headers["x-ratelimit-limit-tokens-minute"] = str(config["tokens_per_minute"])
+        headers["x-ratelimit-remaining-tokens-minute"] = str(max(0, config["tokens_per_minute"] - used))
+    return headers
+
+def _admission_error(estimated_tokens: int) -> Optional[JSONResponse]:
+    """Injected failures and enforced limits"""
+    headers = _rate_limit_headers()
+    over_rpm = config["requests_per_minute"] and len(window) >= config["requests_per_minute"]
+    over_tpm = config["tokens_per_minute"] and sum(t for _, t in window) + estimated_tokens > config["tokens_per_minute"]
+    if over_rpm or over_tpm or random.random() < config["rate_limit_rate"]:
+        stats["rate_limited"] += 1
+        headers["retry-after"] = str(config["retry_after_s"])
+        return JSONResponse(
+            status_code=429,
+            content={"error": {"message": "Rate limit exceeded", "type": "rate_limit_error"}},
+            headers=headers
+        )
+    if random.random() < config["error_rate"]:
+        stats["errors_injected"] += 1
+        status = random.choice([500, 502, 503])
+        return JSONResponse(status_code=status, content={"error": {"message": "Injected upstream error", "type": "server_error"}})
+
+    window.append((time.time(), estimated_tokens))
+    return None
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    messages = body.get("messages") or []
+    model = body.get("model", MODELS[0]["id"])
+    max_tokens = int(body.get("max_tokens") or config["completion_tokens"])
+    prompt_tokens = sum(_count_tokens(msg.get("content") or "") for msg in messages)
+    n_tokens = max(1, min(max_tokens, config["completion_tokens"]))
+
+    stats["requests"] += 1
+    error = _admission_error(prompt_tokens + n_tokens)
+    if error is not None:
+        return error
+
+    words = _completion_text(messages, n_tokens)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+    created = int(time.time())
+    usage = {"prompt_tokens": prompt_tokens, "completion_tokens": n_tokens, "total_tokens": prompt_tokens + n_tokens}
+    stats["completion_tokens"] += n_tokens
+    headers = _rate_limit_headers()
+
+    if not body.get("stream"):
+        await asyncio.sleep(_ttft() + n_tokens / config["tokens_per_second"])
+        return JSONResponse(
+            content={
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {"index": 0, "message": {"role": "assistant", "content": " ".join(words)}, "finish_reason": "stop"}
+                ],
+                "usage": usage
+            },
+            headers=headers
+        )
+
+    stats["streams"] += 1
+
+    async def event_stream():
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None, **extra) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                **extra
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        await asyncio.sleep(_ttft())
+        yield chunk({"role": "assistant", "content": ""})
+
+        step = max(1, config["stream_chunk_tokens"])
+        for index in range(0, len(words), step):
+            batch = words[index:index + step]
+            text = " ".join(batch) if index == 0 else " " + " ".join(batch)
+            yield chunk({"content": text})
+            await asyncio.sleep(len(batch) / config["tokens_per_second"])
+
+        yield chunk({}, finish_reason="stop", usage=usage)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=headers)
+
+@app.get("/v1/models")
+async def list_models():
+    return {"object": "list", "data": MODELS}
+
+@app.get("/v1/models/{model_id}/status")
+async def model_status(model_id: str):
+    if not any(model["id"] == model_id for model in MODELS):
+        return JSONResponse(status_code=404, content={"error": {"message": f"Model {model_id} not found"}})
+    return {
+        "model_id": model_id,
+        "status": "available",
+        "load_percentage": min(100, len(window)),
+        "queue_position": 0,
+        "estimated_time": 0
+    }
+
+@app.get("/_stub/config")
+async def get_config():
+    return {"config": config, "stats": stats, "profiles": list(PROFILES)}
+
+@app.put("/_stub/config")
+async def update_config(update: Dict[str, Any]):
+    """Change latency/error settings at runtime; {"profile": "flaky"} applies a named profile"""
+    profile = update.pop("profile", None)
+    if profile and profile not in PROFILES:
+        return JSONResponse(
+            status_code=400,
+            content={"error": {"message": f"Unknown profile {profile}", "type": "invalid_request_error", "profiles": sorted(PROFILES)}}
+        )
+    if profile:
+        config.update(PROFILES[profile])
+    config.update({key: value for key, value in update.items() if key in DEFAULT_CONFIG})
+    return {"config": config}
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible Cerebras API stand-in")
+    parser.add_argument("--host", default=os.getenv("STUB_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("STUB_PORT", "8100")))
+    parser.add_argument("--profile", choices=sorted(PROFILES), default=os.getenv("STUB_PROFILE", "realistic"))
+    parser.add_argument("--ttft-ms", type=float)
+    parser.add_argument("--ttft-jitter-ms", type=float)
+    parser.add_argument("--tokens-per-second", type=float)
+    parser.add_argument("--completion-tokens", type=int)
+    parser.add_argument("--error-rate", type=float)
+    parser.add_argument("--rate-limit-rate", type=float)
+    parser.add_argument("--requests-per-minute", type=int)
+    parser.add_argument("--tokens-per-minute", type=int)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    config.update(PROFILES[args.profile])
+    _apply_env(config)
+    for key in DEFAULT_CONFIG:
+        value = getattr(args, key, None)
+        if value is not None:
+            config[key] = value
+    if config["seed"] is not None:
+        random.seed(int(config["seed"]))
+
+    print(f"🧪 Cerebras API stand-in on http://{args.host}:{args.port} (profile: {args.profile})")
+    print(f"   TTFT {config['ttft_ms']}ms ±{config['ttft_jitter_ms']}ms, {config['tokens_per_second']} tokens/s, "
+          f"errors {config['error_rate']:.0%}, 429s {config['rate_limit_rate']:.0%}")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -12,30 +12,54 @@ import uuid
 import logging
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import SessionLocal, upgrade_schema
 from app.api.v1.api import api_router
-from app.core.websocket_manager import WebSocketManager
+from app.core.websocket_manager import websocket_manager
+from app.core.http_client import http_client_manager
+from app.services.model_catalog import model_catalog
+from app.services.execution_queue import execution_pool
+from app.services.execution_log import execution_log
 from app.services.crew_service import CrewService
 from app.services.execution_service import ExecutionService
+from app.services.batch_service import BatchService
 from app.services.cerebras_service import CerebrasService
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables and add columns missing from older databases
+upgrade_schema()
 
-# WebSocket manager
-websocket_manager = WebSocketManager()
+async def run_execution(db, execution_id: str):
+    await ExecutionService(db).run_execution(execution_id)
+
+async def recover_orphaned_executions():
+    db = SessionLocal()
+    try:
+        await ExecutionService(db).recover_orphaned_executions()
+        await BatchService(db).resume_batches()
+    finally:
+        db.close()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting CrewAI Dashboard API...")
+    await http_client_manager.start()
+    cerebras_service = CerebrasService()
+    if not cerebras_service.offline:
+        await model_catalog.start(cerebras_service._load_model_info)
+    await execution_log.start()
+    await recover_orphaned_executions()
+    await execution_pool.start(run_execution)
     yield
     # Shutdown
     logger.info("Shutting down CrewAI Dashboard API...")
+    await execution_pool.stop()
+    await execution_log.stop()
+    await model_catalog.stop()
+    await http_client_manager.close()
 
 app = FastAPI(
     title="CrewAI Dashboard API",
@@ -0,0 +1,16 @@
+import os
+import sys
+import tempfile
+
+# Settings are read at import time, so the test environment is set up before the app is imported
+_tmp = tempfile.mkdtemp(prefix="crewai-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'test.db')}"
+os.environ["LLM_CACHE_PATH"] = os.path.join(_tmp, "llm_cache.db")
+os.environ["BLOB_STORE_PATH"] = os.path.join(_tmp, "blobs")
+os.environ["CEREBRAS_API_KEY"] = "test"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import upgrade_schema
+
+upgrade_schema()
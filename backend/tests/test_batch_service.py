@@ -0,0 +1,48 @@
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import SessionLocal, Crew, Execution, ExecutionBatch, ExecutionJob
+from app.services.batch_service import BatchService
+from app.services.execution_queue import execution_pool, ExecutionQueueFullError
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        # Nothing runs the children here; keep them away from the worker pools of other tests
+        session.rollback()
+        session.query(ExecutionJob).filter(ExecutionJob.status == "queued").update({"status": "done"})
+        session.commit()
+        session.close()
+
+def create_crew(db) -> str:
+    crew_id = str(uuid.uuid4())
+    db.add(Crew(id=crew_id, name="crew"))
+    db.commit()
+    return crew_id
+
+def queued_children(db, batch_id: str) -> int:
+    return db.query(ExecutionJob).join(Execution, Execution.id == ExecutionJob.execution_id).filter(Execution.batch_id == batch_id).count()
+
+def test_concurrency_is_capped_at_the_workers(db, monkeypatch):
+    monkeypatch.setattr(settings, "EXECUTION_WORKERS", 2)
+    batch = BatchService(db).create_batch(create_crew(db), [{"topic": str(index)} for index in range(5)], concurrency=50)
+
+    assert db.get(ExecutionBatch, batch["id"]).concurrency == 2
+    assert queued_children(db, batch["id"]) == 2
+
+def test_batch_is_rejected_when_the_queue_has_no_room_for_its_first_children(db, monkeypatch):
+    crew_id = create_crew(db)
+    monkeypatch.setattr(settings, "EXECUTION_QUEUE_MAX_DEPTH", execution_pool.queue_length(db) + 1)
+
+    with pytest.raises(ExecutionQueueFullError):
+        BatchService(db).create_batch(crew_id, [{"topic": "a"}, {"topic": "b"}], concurrency=2)
+    assert db.query(ExecutionBatch).filter(ExecutionBatch.crew_id == crew_id).count() == 0
+
+    # A single child still fits
+    batch = BatchService(db).create_batch(crew_id, [{"topic": "a"}, {"topic": "b"}], concurrency=1)
+    assert queued_children(db, batch["id"]) == 1
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import time
+import uuid
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.http_client import http_client_manager
+from app.services.cerebras_service import CerebrasService, CerebrasAPIError
+from app.services.endpoint_pool import endpoint_pool, Endpoint
+from app.services.resilience import circuit_breakers, retry_policy
+from app.services.llm_telemetry import ExecutionTelemetry
+
+USAGE = {"prompt_tokens": 60, "completion_tokens": 40, "total_tokens": 100}
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Mock Cerebras endpoint answering non-streaming completions after a short delay"""
+    state = {"requests": 0}
+
+    async def handler(request):
+        state["requests"] += 1
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={
+            "model": json.loads(request.content)["model"],
+            "choices": [{"message": {"role": "assistant", "content": "answer"}}],
+            "usage": USAGE
+        })
+
+    monkeypatch.setattr(http_client_manager, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return state
+
+def test_concurrent_identical_calls_are_charged_once(llm):
+    service = CerebrasService()
+    messages = [{"role": "user", "content": "the same question"}]
+
+    async def main():
+        return await asyncio.gather(*[service.chat_completion_result(messages, 100, 0.7) for _ in range(2)])
+
+    results = asyncio.run(main())
+    telemetry = ExecutionTelemetry()
+    for result in results:
+        telemetry.record(result)
+
+    assert llm["requests"] == 1
+    assert sorted(result.coalesced for result in results) == [False, True]
+    assert telemetry.tokens_used == USAGE["total_tokens"]
+    assert telemetry.api_calls == 1
+
+def test_batch_totals_count_coalesced_items_once(llm):
+    service = CerebrasService()
+    request = {"messages": [{"role": "user", "content": "a batch question"}], "max_tokens": 100}
+
+    batch = asyncio.run(service.batch_chat_completion([request, request]))
+
+    assert llm["requests"] == 1
+    assert [item["coalesced"] for item in batch["results"]] == [False, True]
+    assert batch["stats"]["total_tokens"] == USAGE["total_tokens"]
+
+def test_request_throttled_by_the_rate_limiter_is_not_outstanding(llm, monkeypatch):
+    monkeypatch.setattr(settings, "CEREBRAS_RATE_LIMIT_ENABLED", True)
+    endpoint = Endpoint("throttled", "https://throttled.test", "key")
+    monkeypatch.setattr(endpoint_pool, "_endpoints", [endpoint])
+    service = CerebrasService()
+    limiter = service._rate_limiter(endpoint)
+    limiter.blocked_until = time.monotonic() + 60
+    messages = [{"role": "user", "content": "a throttled question"}]
+
+    async def main():
+        call = asyncio.create_task(service.chat_completion_result(messages, 100, 0.7))
+        await asyncio.sleep(0.05)
+        waiting = (endpoint.inflight, limiter.queue_depth)
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+        return waiting
+
+    # Waiting for admission doesn't count against the endpoint's load
+    assert asyncio.run(main()) == (0, 1)
+    assert endpoint.inflight == 0 and llm["requests"] == 0
+
+def endpoints(monkeypatch, *names):
+    """Point the pool at fresh endpoints named <name>-<unique suffix>, served by https://<name>.test"""
+    pool = [Endpoint(f"{name}-{uuid.uuid4().hex[:8]}", f"https://{name}.test", "key") for name in names]
+    monkeypatch.setattr(endpoint_pool, "_endpoints", pool)
+    return pool
+
+def test_failing_endpoint_opens_only_its_own_circuit(monkeypatch):
+    monkeypatch.setattr(settings, "CEREBRAS_CIRCUIT_FAILURE_THRESHOLD", 1)
+    monkeypatch.setattr(retry_policy, "base_delay", 0.001)
+    failing, healthy = endpoints(monkeypatch, "failing", "healthy")
+
+    def handler(request):
+        if request.url.host == "failing.test":
+            return httpx.Response(500, json={"error": {"message": "down"}})
+        return httpx.Response(200, json={"choices": [{"message": {"role": "assistant", "content": "ok"}}], "usage": USAGE})
+
+    monkeypatch.setattr(http_client_manager, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    service = CerebrasService()
+
+    async def main():
+        return [await service.chat_completion(
+            [{"role": "user", "content": f"question {index}"}], 100, 0.7, hedge=False
+        ) for index in range(4)]
+
+    assert asyncio.run(main()) == ["ok"] * 4
+    assert circuit_breakers.get(f"{failing.name}/chat/completions").state == "open"
+    assert circuit_breakers.get(f"{healthy.name}/chat/completions").state == "closed"
+
+def test_stream_broken_midway_counts_as_one_failure(monkeypatch):
+    broken, = endpoints(monkeypatch, "broken")
+
+    class Body(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            yield ("data: " + json.dumps({"choices": [{"delta": {"content": "partial"}}]}) + "\n\n").encode()
+            raise httpx.ReadError("connection reset")
+
+    def handler(request):
+        return httpx.Response(200, stream=Body(), headers={"content-type": "text/event-stream"})
+
+    monkeypatch.setattr(http_client_manager, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    service = CerebrasService()
+
+    async def main():
+        deltas = []
+        with pytest.raises(CerebrasAPIError):
+            async for delta, _ in service._open_stream(service.model_id, [{"role": "user", "content": "stream"}], 100, 0.7):
+                deltas.append(delta)
+        return deltas
+
+    assert asyncio.run(main()) == ["partial"]
+    stats = circuit_breakers.get(f"{broken.name}/chat/completions").get_stats()
+    assert stats["failures"] == 1 and stats["successes"] == 0
+    assert broken.inflight == 0
@@ -0,0 +1,22 @@
+from fastapi.testclient import TestClient
+
+import cerebras_stub_server
+
+def test_unknown_profile_is_rejected_with_the_valid_ones():
+    client = TestClient(cerebras_stub_server.app)
+    before = dict(cerebras_stub_server.config)
+
+    response = client.put("/_stub/config", json={"profile": "nonexistent", "ttft_ms": 1})
+
+    assert response.status_code == 400
+    assert response.json()["error"]["profiles"] == sorted(cerebras_stub_server.PROFILES)
+    assert cerebras_stub_server.config == before
+
+def test_known_profile_is_applied():
+    client = TestClient(cerebras_stub_server.app)
+    profile = sorted(cerebras_stub_server.PROFILES)[0]
+
+    response = client.put("/_stub/config", json={"profile": profile})
+
+    assert response.status_code == 200
+    assert all(response.json()["config"][key] == value for key, value in cerebras_stub_server.PROFILES[profile].items())
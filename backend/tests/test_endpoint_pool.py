@@ -0,0 +1,50 @@
+import pytest
+
+from app.core.config import settings
+from app.services.endpoint_pool import EndpointPool, Endpoint
+
+@pytest.fixture
+def pool():
+    pool = EndpointPool()
+    pool._endpoints = [Endpoint(name, f"https://{name}.test", "key") for name in ("a", "b", "c")]
+    return pool
+
+def test_calls_go_to_the_endpoint_with_the_fewest_outstanding(pool):
+    a, b, c = pool.endpoints
+    leased = [pool.acquire() for _ in range(3)]
+    assert sorted(endpoint.name for endpoint in leased) == ["a", "b", "c"]
+
+    pool.release(b, 200, 0.1)
+    assert pool.acquire() is b
+    assert (a.inflight, b.inflight, c.inflight) == (1, 1, 1)
+
+def test_picking_does_not_count_until_leased(pool):
+    endpoint = pool.pick()
+    assert endpoint.inflight == 0
+    pool.lease(endpoint)
+    assert endpoint.inflight == 1
+    assert pool.pick(exclude=pool.endpoints) is None
+
+def test_rate_limited_endpoint_is_ejected_for_its_retry_after(pool):
+    a, b, c = pool.endpoints
+    pool.release(pool.lease(a), 429, retry_after=5.0)
+    assert 4.5 < a.get_stats()["ejected_for_s"] <= 5.0
+    assert all(pool.acquire() is not a for _ in range(6))
+
+def test_consecutive_errors_eject_an_endpoint(pool, monkeypatch):
+    monkeypatch.setattr(settings, "CEREBRAS_ENDPOINT_ERROR_THRESHOLD", 2)
+    a, b, c = pool.endpoints
+    pool.release(pool.lease(a), 500)
+    pool.release(pool.lease(a), 200, 0.1)
+    pool.release(pool.lease(a), 502)
+    assert a.get_stats()["ejections"] == 0
+
+    pool.release(pool.lease(a), network_error=True)
+    assert a.get_stats()["ejections"] == 1 and a.consecutive_errors == 0
+
+def test_when_all_are_ejected_the_first_to_recover_is_used(pool):
+    a, b, c = pool.endpoints
+    for endpoint, seconds in ((a, 30.0), (b, 5.0), (c, 60.0)):
+        endpoint.eject(seconds, "test")
+    assert not pool.has_healthy()
+    assert pool.acquire() is b
@@ -0,0 +1,79 @@
+import asyncio
+import json
+import uuid
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.database import SessionLocal, Crew, Agent, Task, Execution
+from app.core.http_client import http_client_manager
+from app.core.websocket_manager import websocket_manager
+from app.services.execution_service import ExecutionService
+from app.services.token_counter import count_message_tokens
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Mock Cerebras endpoint that honours max_tokens and tracks concurrent calls"""
+    state = {"requests": 0, "in_flight": 0, "max_in_flight": 0}
+
+    class Body(httpx.AsyncByteStream):
+        def __init__(self, prompt_tokens: int, completion_tokens: int):
+            self.usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+
+        async def __aiter__(self):
+            yield ("data: " + json.dumps({"choices": [{"delta": {"content": "part one "}}]}) + "\n\n").encode()
+            await asyncio.sleep(0.1)
+            state["in_flight"] -= 1
+            yield ("data: " + json.dumps({"choices": [{"delta": {"content": "part two"}}], "usage": self.usage}) + "\n\ndata: [DONE]\n\n").encode()
+
+    def handler(request):
+        payload = json.loads(request.content)
+        state["requests"] += 1
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        body = Body(count_message_tokens(payload["messages"]), min(40, payload["max_tokens"]))
+        return httpx.Response(200, stream=body, headers={"content-type": "text/event-stream"})
+
+    async def send_to_execution(channel, message):
+        pass
+
+    monkeypatch.setattr(settings, "TASK_MEMO_ENABLED", False)
+    monkeypatch.setattr(http_client_manager, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(websocket_manager, "send_to_execution", send_to_execution)
+    return state
+
+def run_parallel_crew(**budget) -> Execution:
+    """Run a crew of two independent tasks, each with its own agent, side by side"""
+    db = SessionLocal()
+    try:
+        crew_id = str(uuid.uuid4())
+        execution_id = str(uuid.uuid4())
+        db.add(Crew(id=crew_id, name="crew"))
+        for name in ("researcher", "writer"):
+            agent_id = str(uuid.uuid4())
+            db.add(Agent(id=agent_id, crew_id=crew_id, name=name, role=name, goal=f"{name} goal"))
+            db.add(Task(id=str(uuid.uuid4()), crew_id=crew_id, name=f"{name} task", description=f"work as the {name}", expected_output="e", assigned_agent=agent_id))
+        db.add(Execution(id=execution_id, crew_id=crew_id, status="pending", max_parallel_tasks=2, **budget))
+        db.commit()
+        asyncio.run(ExecutionService(db).run_execution(execution_id))
+        db.expire_all()
+        return db.get(Execution, execution_id)
+    finally:
+        db.close()
+
+def test_parallel_tasks_run_side_by_side_without_budget(llm):
+    execution = run_parallel_crew()
+    assert execution.status == "completed"
+    assert llm["requests"] == 2 and llm["max_in_flight"] == 2
+
+def test_parallel_tasks_respect_api_call_budget(llm):
+    execution = run_parallel_crew(api_call_budget=1)
+    assert llm["requests"] == 1
+    assert execution.api_calls == 1
+    assert execution.telemetry["budget"]["exceeded"]["resource"] == "api_calls"
+
+def test_parallel_tasks_respect_token_budget(llm):
+    execution = run_parallel_crew(token_budget=150)
+    assert 0 < execution.tokens_used <= 150
+    assert llm["max_in_flight"] == 1
@@ -0,0 +1,106 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+from app.core.config import settings
+from app.core.database import SessionLocal, ExecutionLog
+from app.services import execution_log as execution_log_module
+from app.services.execution_log import ExecutionLogStore
+
+def entry(message: str):
+    return {"timestamp": datetime.utcnow().isoformat(), "message": message, "type": "info"}
+
+def stored(execution_id: str):
+    db = SessionLocal()
+    try:
+        rows = db.query(ExecutionLog).filter(ExecutionLog.execution_id == execution_id).order_by(ExecutionLog.seq).all()
+        return [(row.seq, row.message) for row in rows]
+    finally:
+        db.close()
+
+def test_seq_conflict_resequences_the_entry_without_blocking_others():
+    store = ExecutionLogStore()
+    taken_over = str(uuid.uuid4())
+    other = str(uuid.uuid4())
+
+    async def main():
+        assert await store.append(taken_over, entry("ours")) == 1
+
+        # Another process took the execution over and numbered from the stored max
+        db = SessionLocal()
+        db.add(ExecutionLog(execution_id=taken_over, seq=1, type="info", message="theirs"))
+        db.commit()
+        db.close()
+
+        await store.append(other, entry("unrelated"))
+        await store.flush()
+
+        assert stored(taken_over) == [(1, "theirs"), (2, "ours")]
+        assert stored(other) == [(1, "unrelated")]
+        stats = store.get_stats()
+        assert stats["pending"] == 0 and stats["flush_errors"] == 0 and stats["resequenced"] == 1
+
+        # Later entries continue after the moved one
+        assert await store.append(taken_over, entry("next")) == 3
+        await store.flush()
+        assert stored(taken_over)[-1] == (3, "next")
+
+    asyncio.run(main())
+
+class _UnavailableSession:
+    def bulk_insert_mappings(self, *args):
+        raise RuntimeError("database unavailable")
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+def test_buffer_is_capped_while_the_database_is_unavailable(monkeypatch):
+    store = ExecutionLogStore()
+    execution_id = str(uuid.uuid4())
+    store._next_seq[execution_id] = 1
+    monkeypatch.setattr(settings, "EXECUTION_LOG_MAX_PENDING", 5)
+    monkeypatch.setattr(execution_log_module, "SessionLocal", _UnavailableSession)
+
+    async def main():
+        for index in range(8):
+            await store.append(execution_id, entry(f"entry {index}"))
+            await store.flush()
+
+    asyncio.run(main())
+
+    stats = store.get_stats()
+    assert stats["pending"] == 5 and stats["dropped"] == 3
+    assert [item["message"] for item in store._pending] == [f"entry {index}" for index in range(3, 8)]
+
+def pending_messages(store: ExecutionLogStore, execution_id: str):
+    db = SessionLocal()
+    try:
+        return [item["message"] for item in store.read(db, execution_id)[0]]
+    finally:
+        db.close()
+
+def test_entries_being_written_stay_readable():
+    store = ExecutionLogStore()
+    execution_id = str(uuid.uuid4())
+    seen = {}
+
+    def slow_write(batch):
+        # Readers run on the loop while the batch is written in a thread
+        seen["reading"] = pending_messages(store, execution_id)
+        return ExecutionLogStore._write(store, batch)
+
+    async def main():
+        store._write = slow_write
+        await store.append(execution_id, entry("first"))
+        flush = asyncio.create_task(store.flush())
+        await asyncio.sleep(0)
+        during = pending_messages(store, execution_id)
+        await flush
+        return during
+
+    during = asyncio.run(main())
+    assert during == ["first"] and seen["reading"] == ["first"]
+    assert stored(execution_id) == [(1, "first")]
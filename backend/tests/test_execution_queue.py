@@ -0,0 +1,200 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import SessionLocal, Crew, Execution, ExecutionJob
+from app.services.execution_queue import ExecutionWorkerPool
+
+@pytest.fixture(autouse=True)
+def fast_pool(monkeypatch):
+    monkeypatch.setattr(settings, "EXECUTION_WORKERS", 2)
+    monkeypatch.setattr(settings, "EXECUTION_QUEUE_POLL_INTERVAL", 0.02)
+    monkeypatch.setattr(settings, "EXECUTION_HEARTBEAT_INTERVAL", 0.05)
+    monkeypatch.setattr(settings, "EXECUTION_CANCEL_POLL_INTERVAL", 0.05)
+    monkeypatch.setattr(settings, "EXECUTION_RETRY_BACKOFF", 0.01)
+    monkeypatch.setattr(settings, "EXECUTION_MAX_ATTEMPTS", 3)
+
+def create_execution(job: bool = True) -> str:
+    db = SessionLocal()
+    try:
+        crew_id = str(uuid.uuid4())
+        execution_id = str(uuid.uuid4())
+        db.add(Crew(id=crew_id, name="crew"))
+        db.add(Execution(id=execution_id, crew_id=crew_id, status="pending"))
+        if job:
+            now = datetime.utcnow()
+            db.add(ExecutionJob(execution_id=execution_id, status="queued", available_at=now, enqueued_at=now))
+        db.commit()
+        return execution_id
+    finally:
+        db.close()
+
+def load(execution_id: str):
+    db = SessionLocal()
+    try:
+        return db.get(Execution, execution_id), db.get(ExecutionJob, execution_id)
+    finally:
+        db.close()
+
+async def wait_until(condition, timeout: float = 3.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.02)
+
+def test_crashed_run_is_retried_then_completes():
+    execution_id = create_execution()
+    attempts = []
+
+    async def runner(db, run_id):
+        attempts.append(run_id)
+        if len(attempts) == 1:
+            raise RuntimeError("worker crashed")
+
+    async def main():
+        pool = ExecutionWorkerPool()
+        await pool.start(runner)
+        try:
+            await wait_until(lambda: pool._stats["completed"] == 1)
+        finally:
+            await pool.stop()
+        return pool
+
+    pool = asyncio.run(main())
+    _, job = load(execution_id)
+    assert attempts == [execution_id, execution_id]
+    assert job.status == "done" and job.attempts == 2
+    assert pool._stats["retried"] == 1
+
+def test_run_crashing_every_attempt_fails_the_execution():
+    execution_id = create_execution()
+
+    async def runner(db, run_id):
+        raise RuntimeError("boom")
+
+    async def main():
+        pool = ExecutionWorkerPool()
+        await pool.start(runner)
+        try:
+            await wait_until(lambda: load(execution_id)[1].status == "failed")
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+    execution, job = load(execution_id)
+    assert job.attempts == settings.EXECUTION_MAX_ATTEMPTS
+    assert job.last_error == "boom"
+    assert execution.status == "failed"
+
+def test_expired_lease_of_a_crashed_process_is_reclaimed():
+    execution_id = create_execution(job=False)
+    db = SessionLocal()
+    db.add(ExecutionJob(
+        execution_id=execution_id,
+        status="leased",
+        attempts=1,
+        lease_owner="dead-host:1/0",
+        lease_expires_at=datetime.utcnow() - timedelta(seconds=1),
+        enqueued_at=datetime.utcnow()
+    ))
+    db.commit()
+    db.close()
+    ran = []
+
+    async def runner(db, run_id):
+        ran.append(run_id)
+
+    async def main():
+        pool = ExecutionWorkerPool()
+        await pool.start(runner)
+        try:
+            await wait_until(lambda: ran == [execution_id] and load(execution_id)[1].status == "done")
+        finally:
+            await pool.stop()
+        return pool
+
+    pool = asyncio.run(main())
+    assert pool._stats["reclaimed"] == 1
+    assert load(execution_id)[1].attempts == 2
+
+def test_run_stops_when_its_lease_is_taken_over():
+    execution_id = create_execution()
+    outcome = {}
+
+    async def runner(db, run_id):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            outcome["cancelled"] = True
+            raise
+
+    async def main():
+        pool = ExecutionWorkerPool()
+        await pool.start(runner)
+        try:
+            await wait_until(lambda: execution_id in pool._running)
+            # Another process claimed the job after our lease expired
+            db = SessionLocal()
+            db.query(ExecutionJob).filter(ExecutionJob.execution_id == execution_id).update(
+                {"lease_owner": "other-host:2/0", "lease_expires_at": datetime.utcnow() + timedelta(seconds=60)}
+            )
+            db.commit()
+            db.close()
+            await wait_until(lambda: execution_id not in pool._running)
+        finally:
+            await pool.stop()
+        return pool
+
+    pool = asyncio.run(main())
+    _, job = load(execution_id)
+    assert outcome == {"cancelled": True}
+    assert pool._stats["lost_leases"] == 1
+    # The job is left to its new owner
+    assert job.status == "leased" and job.lease_owner == "other-host:2/0"
+
+def test_cancel_during_run_from_another_process():
+    execution_id = create_execution()
+
+    async def runner(db, run_id):
+        await asyncio.sleep(10)
+
+    async def main():
+        pool = ExecutionWorkerPool()
+        await pool.start(runner)
+        try:
+            await wait_until(lambda: execution_id in pool._running)
+            db = SessionLocal()
+            db.query(Execution).filter(Execution.id == execution_id).update({"status": "cancelled"})
+            db.commit()
+            db.close()
+            await wait_until(lambda: execution_id not in pool._running)
+        finally:
+            await pool.stop()
+        return pool
+
+    pool = asyncio.run(main())
+    _, job = load(execution_id)
+    assert pool._stats["cancelled"] == 1
+    assert job.status == "done"
+
+def test_local_cancel_stops_the_run_and_reports_latency():
+    execution_id = create_execution()
+
+    async def runner(db, run_id):
+        await asyncio.sleep(10)
+
+    async def main():
+        pool = ExecutionWorkerPool()
+        await pool.start(runner)
+        try:
+            await wait_until(lambda: execution_id in pool._running)
+            return await pool.cancel(execution_id)
+        finally:
+            await pool.stop()
+
+    latency_ms = asyncio.run(main())
+    assert latency_ms is not None and latency_ms < 1000
+    assert load(execution_id)[1].status == "done"
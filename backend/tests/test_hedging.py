@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.hedging import HedgingController
+
+@pytest.fixture(autouse=True)
+def hedge_settings(monkeypatch):
+    monkeypatch.setattr(settings, "CEREBRAS_HEDGE_MIN_SAMPLES", 5)
+    monkeypatch.setattr(settings, "CEREBRAS_HEDGE_PERCENTILE", 80.0)
+    monkeypatch.setattr(settings, "CEREBRAS_HEDGE_BUDGET_RATIO", 0.5)
+
+def warmed_up(latency: float = 0.02) -> HedgingController:
+    hedging = HedgingController()
+    for _ in range(5):
+        hedging.record_latency("model", "completion", latency)
+    return hedging
+
+def call(result: str, delay: float, log: list):
+    async def run():
+        log.append(result)
+        await asyncio.sleep(delay)
+        return result
+    return run
+
+def test_no_hedge_until_enough_latency_samples():
+    hedging = HedgingController()
+    hedging.record_latency("model", "completion", 0.01)
+    assert hedging.hedge_delay("model", "completion") is None
+    assert warmed_up().hedge_delay("model", "completion") == pytest.approx(0.02)
+
+def test_slow_primary_is_hedged_and_the_backup_wins(monkeypatch):
+    monkeypatch.setattr(settings, "CEREBRAS_HEDGE_BUDGET_RATIO", 1.0)
+    hedging = warmed_up()
+    log = []
+
+    result = asyncio.run(hedging.race("model", call("primary", 1.0, log), call("hedge", 0.01, log)))
+
+    assert result == "hedge" and log == ["primary", "hedge"]
+    assert hedging.get_stats()["hedge_wins"] == 1
+
+def test_fast_primary_is_not_hedged():
+    hedging = warmed_up()
+    log = []
+
+    assert asyncio.run(hedging.race("model", call("primary", 0.001, log), call("hedge", 0.001, log))) == "primary"
+    assert log == ["primary"]
+
+def test_hedges_stay_within_the_budget():
+    hedging = warmed_up()
+    log = []
+
+    async def main():
+        return [await hedging.race("model", call("primary", 0.05, log), call("hedge", 0.001, log)) for _ in range(4)]
+
+    results = asyncio.run(main())
+    # At most one hedge per two primaries
+    assert results.count("hedge") == 2
+    assert hedging.get_stats()["skipped_budget"] == 2
@@ -0,0 +1,93 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.http_client import http_client_manager
+from app.services.cerebras_service import CerebrasService
+from app.services.llm_cache import LLMResponseCache
+
+BODY = {"choices": [{"message": {"role": "assistant", "content": "answer"}}], "usage": {"prompt_tokens": 6, "completion_tokens": 4, "total_tokens": 10}}
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Mock Cerebras endpoint counting the completions it serves"""
+    state = {"requests": 0}
+
+    def handler(request):
+        state["requests"] += 1
+        return httpx.Response(200, json=BODY)
+
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", True)
+    monkeypatch.setattr(http_client_manager, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return state
+
+@pytest.mark.parametrize("temperature, use_cache, cached", [
+    (0.0, None, True),
+    (0.7, None, False),
+    (0.0, True, True),
+    (0.7, True, True),
+    (0.0, False, False),
+    (0.7, False, False),
+])
+def test_second_identical_call_hits_the_cache_only_when_caching_applies(llm, temperature, use_cache, cached):
+    service = CerebrasService()
+    messages = [{"role": "user", "content": f"question {uuid.uuid4()}"}]
+
+    async def main():
+        return [await service.chat_completion_result(messages, 100, temperature, use_cache, hedge=False) for _ in range(2)]
+
+    first, second = asyncio.run(main())
+    assert not first.cached
+    assert second.cached is cached
+    assert llm["requests"] == (1 if cached else 2)
+
+def test_nothing_is_cached_in_mock_mode_or_when_disabled(monkeypatch):
+    service = CerebrasService()
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    assert not service._should_cache(0.0, True)
+
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", True)
+    service.mock_mode = True
+    assert not service._should_cache(0.0, True)
+
+def test_cache_serves_memory_then_disk_hits_and_expires(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.db")
+    key = LLMResponseCache.make_key("model", [{"role": "user", "content": "hi"}], 0.0, 100)
+
+    async def main():
+        cache = LLMResponseCache(path, max_memory_entries=8, max_disk_entries=8, ttl=60)
+        assert await cache.get(key) is None
+        await cache.set(key, BODY)
+        assert await cache.get(key) == BODY
+
+        # A fresh process only has the disk tier
+        reopened = LLMResponseCache(path, max_memory_entries=8, max_disk_entries=8, ttl=60)
+        assert await reopened.get(key) == BODY
+        assert await reopened.get(key) == BODY
+        return cache.get_stats(), reopened.get_stats()
+
+    first, reopened = asyncio.run(main())
+    assert (first["misses"], first["memory_hits"]) == (1, 1)
+    assert (reopened["disk_hits"], reopened["memory_hits"]) == (1, 1)
+
+    async def expired():
+        cache = LLMResponseCache(path, max_memory_entries=8, max_disk_entries=8, ttl=60)
+        monkeypatch.setattr(cache, "_is_expired", lambda created_at: True)
+        return await cache.get(key)
+
+    assert asyncio.run(expired()) is None
+
+def test_key_covers_every_request_parameter():
+    messages = [{"role": "user", "content": "hi"}]
+    key = LLMResponseCache.make_key("model", messages, 0.0, 100)
+    assert key == LLMResponseCache.make_key("model", [dict(message) for message in messages], 0.0, 100)
+    assert len({
+        key,
+        LLMResponseCache.make_key("other", messages, 0.0, 100),
+        LLMResponseCache.make_key("model", [{"role": "user", "content": "hello"}], 0.0, 100),
+        LLMResponseCache.make_key("model", messages, 0.5, 100),
+        LLMResponseCache.make_key("model", messages, 0.0, 200)
+    }) == 5
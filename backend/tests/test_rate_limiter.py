@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+from app.services.rate_limiter import ModelRateLimiter
+
+def test_requests_within_the_limits_are_admitted_right_away():
+    limiter = ModelRateLimiter("model", requests_per_minute=60, tokens_per_minute=10000)
+
+    async def main():
+        return [await limiter.acquire(1000) for _ in range(5)]
+
+    assert asyncio.run(main()) == [0.0] * 5
+    assert limiter.get_stats()["tokens_available"] < 5100
+
+def test_waiters_are_admitted_round_robin_across_owners():
+    # 1200 requests/minute: one every 50ms once the bucket is empty
+    limiter = ModelRateLimiter("model", requests_per_minute=1200, tokens_per_minute=10 ** 6)
+    limiter.requests.drain(time.monotonic())
+    admitted = []
+
+    async def request(owner: str, name: str):
+        await limiter.acquire(10, owner)
+        admitted.append(name)
+
+    async def main():
+        await asyncio.gather(
+            request("busy", "busy-1"), request("busy", "busy-2"), request("busy", "busy-3"),
+            request("quiet", "quiet-1")
+        )
+
+    asyncio.run(main())
+    assert admitted == ["busy-1", "quiet-1", "busy-2", "busy-3"]
+
+def test_cancelled_waiter_spends_nothing():
+    limiter = ModelRateLimiter("model", requests_per_minute=60, tokens_per_minute=10000)
+    limiter.blocked_until = time.monotonic() + 60
+
+    async def main():
+        waiter = asyncio.create_task(limiter.acquire(500))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+    asyncio.run(main())
+    stats = limiter.get_stats()
+    assert stats["admitted"] == 0
+    assert stats["requests_available"] == 60 and stats["tokens_available"] == 10000
+
+def test_429_pauses_admissions_and_headers_resize_the_buckets():
+    limiter = ModelRateLimiter("model", requests_per_minute=60, tokens_per_minute=10000)
+    limiter.observe_response(429, {"retry-after": "5", "x-ratelimit-limit-tokens-minute": "20000"})
+
+    stats = limiter.get_stats()
+    assert 4.5 < stats["blocked_for_s"] <= 5.0
+    assert stats["requests_available"] < 1
+    assert stats["tokens_per_minute"] == 20000
+
+def test_reconcile_corrects_the_estimate_with_the_real_usage():
+    limiter = ModelRateLimiter("model", requests_per_minute=60, tokens_per_minute=10000)
+
+    async def main():
+        await limiter.acquire(4000)
+
+    asyncio.run(main())
+    limiter.reconcile(4000, 1000)
+    assert 8999 <= limiter.get_stats()["tokens_available"] <= 9001
@@ -0,0 +1,68 @@
+import asyncio
+
+from app.services.request_coalescer import RequestCoalescer
+
+def test_concurrent_callers_share_one_call():
+    coalescer = RequestCoalescer()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "result"
+
+    async def main():
+        shared = await asyncio.gather(*[coalescer.run("key", fetch) for _ in range(3)])
+        # Finished calls are not reused
+        again = await coalescer.run("key", fetch)
+        return shared, again
+
+    shared, again = asyncio.run(main())
+    assert shared == ["result"] * 3 and again == "result"
+    assert len(calls) == 2
+    assert coalescer.get_stats()["coalesced"] == 2
+
+def test_call_is_cancelled_once_its_last_waiter_leaves():
+    coalescer = RequestCoalescer()
+    outcome = {}
+
+    async def fetch():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            outcome["cancelled"] = True
+            raise
+
+    async def main():
+        waiters = [asyncio.create_task(coalescer.run("key", fetch)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        waiters[0].cancel()
+        await asyncio.sleep(0.01)
+        still_running = coalescer.is_inflight("key")
+        waiters[1].cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        # The key is free right away for a fresh caller
+        return still_running, coalescer.is_inflight("key")
+
+    assert asyncio.run(main()) == (True, False)
+    assert outcome == {"cancelled": True}
+
+def test_stream_followers_get_every_item_from_the_start():
+    coalescer = RequestCoalescer()
+    opened = []
+
+    async def produce():
+        opened.append(1)
+        for item in ("a", "b", "c"):
+            await asyncio.sleep(0.01)
+            yield item
+
+    async def consume(delay: float):
+        await asyncio.sleep(delay)
+        return [item async for item in coalescer.run_stream("stream", produce)]
+
+    async def main():
+        return await asyncio.gather(consume(0), consume(0.015))
+
+    assert asyncio.run(main()) == [["a", "b", "c"], ["a", "b", "c"]]
+    assert len(opened) == 1
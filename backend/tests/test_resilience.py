@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from app.services import resilience
+from app.services.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(resilience.time, "monotonic", fake)
+    return fake
+
+def test_backoff_is_full_jitter_within_the_capped_exponential():
+    policy = RetryPolicy(max_retries=5, base_delay=0.5, max_delay=4.0)
+    random.seed(1)
+    for attempt, ceiling in enumerate([0.5, 1.0, 2.0, 4.0, 4.0, 4.0]):
+        delays = [policy.backoff_delay(attempt) for _ in range(500)]
+        assert all(0 <= delay <= ceiling for delay in delays)
+        # Spread over the whole range rather than clustered at the ceiling
+        assert min(delays) < ceiling * 0.1 and max(delays) > ceiling * 0.9
+
+def test_retry_after_is_a_floor_for_the_backoff():
+    policy = RetryPolicy(max_retries=3, base_delay=0.5, max_delay=4.0)
+    assert all(policy.backoff_delay(0, retry_after=7.0) == 7.0 for _ in range(50))
+    assert all(0.2 <= policy.backoff_delay(3, retry_after=0.2) <= 4.0 for _ in range(50))
+
+def test_only_retryable_errors_are_retried_up_to_the_limit():
+    policy = RetryPolicy(max_retries=2, base_delay=0.5, max_delay=4.0)
+    assert policy.should_retry(0, retryable=True) and policy.should_retry(1, retryable=True)
+    assert not policy.should_retry(2, retryable=True)
+    assert not policy.should_retry(0, retryable=False)
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=10.0)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.consecutive_failures == 0
+
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 4.0
+    with pytest.raises(CircuitOpenError) as rejected:
+        breaker.before_call()
+    assert rejected.value.retry_in == pytest.approx(6.0)
+
+def test_half_open_breaker_lets_a_single_probe_through(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=10.0)
+    breaker.before_call()
+    breaker.record_failure()
+
+    clock.now += 10.0
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+def test_failed_probe_reopens_the_breaker(clock):
+    breaker = CircuitBreaker("test", failure_threshold=5, recovery_timeout=10.0)
+    for _ in range(5):
+        breaker.before_call()
+        breaker.record_failure()
+
+    clock.now += 10.0
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+def test_released_probe_frees_the_half_open_slot(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=10.0)
+    breaker.before_call()
+    breaker.record_failure()
+
+    clock.now += 10.0
+    breaker.before_call()
+    # Cancelled without a verdict: another probe may go
+    breaker.release()
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
@@ -0,0 +1,53 @@
+import json
+import uuid
+
+from app.core.database import SessionLocal, Crew, Execution, ExecutionBatch
+from app.services.batch_service import BatchService
+from app.services.execution_service import ExecutionService
+
+MISSING_BLOB = "0" * 64
+
+def create_batch() -> str:
+    """A finished batch of two children; the first one's result blob was garbage-collected"""
+    db = SessionLocal()
+    try:
+        crew_id = str(uuid.uuid4())
+        batch_id = str(uuid.uuid4())
+        db.add(Crew(id=crew_id, name="crew"))
+        db.add(ExecutionBatch(id=batch_id, crew_id=crew_id, status="completed"))
+        db.add(Execution(id=str(uuid.uuid4()), crew_id=crew_id, batch_id=batch_id, batch_index=0, status="completed", result_hash=MISSING_BLOB, result_size=100000))
+        db.add(Execution(id=str(uuid.uuid4()), crew_id=crew_id, batch_id=batch_id, batch_index=1, status="completed", result="small result"))
+        db.commit()
+        return batch_id
+    finally:
+        db.close()
+
+def children(batch_id: str):
+    db = SessionLocal()
+    try:
+        return [child.id for child in db.query(Execution).filter(Execution.batch_id == batch_id).order_by(Execution.batch_index)]
+    finally:
+        db.close()
+
+def test_missing_result_blob_reads_as_no_result():
+    execution_id, _ = children(create_batch())
+    db = SessionLocal()
+    try:
+        service = ExecutionService(db)
+        execution = service.get_execution(execution_id)
+        assert execution["status"] == "completed" and execution["result"] is None
+        assert service.get_execution_result(execution_id) is None
+    finally:
+        db.close()
+
+def test_missing_result_blob_does_not_abort_the_ndjson_stream():
+    batch_id = create_batch()
+    db = SessionLocal()
+    try:
+        lines = [json.loads(line) for line in BatchService(db).iter_results_ndjson(batch_id)]
+    finally:
+        db.close()
+
+    assert [line["index"] for line in lines] == [0, 1]
+    assert lines[0]["result"] is None and lines[0]["error"] == "result unavailable"
+    assert lines[1]["result"] == "small result" and "error" not in lines[1]
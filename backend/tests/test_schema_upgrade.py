@@ -0,0 +1,31 @@
+from sqlalchemy import create_engine, inspect, text
+
+from app.core.database import upgrade_schema
+
+def test_upgrade_adds_columns_and_indexes_to_baseline_tables(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    # Tables as the first release created them
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE crews (id VARCHAR PRIMARY KEY, name VARCHAR NOT NULL, status VARCHAR)"))
+        conn.execute(text(
+            "CREATE TABLE executions (id VARCHAR PRIMARY KEY, crew_id VARCHAR, status VARCHAR, "
+            "created_at DATETIME, tokens_used INTEGER, api_calls INTEGER, result TEXT, logs JSON)"
+        ))
+        conn.execute(text("INSERT INTO crews (id, name, status) VALUES ('c', 'crew', 'active')"))
+        conn.execute(text("INSERT INTO executions (id, crew_id, status) VALUES ('e', 'c', 'running')"))
+
+    upgrade_schema(engine)
+    upgrade_schema(engine)  # idempotent
+
+    inspector = inspect(engine)
+    crew_columns = {column["name"] for column in inspector.get_columns("crews")}
+    execution_columns = {column["name"] for column in inspector.get_columns("executions")}
+    assert {"llm_cache_enabled", "max_parallel_tasks", "token_budget"} <= crew_columns
+    assert {"max_parallel_tasks", "telemetry", "result_hash", "batch_id", "inputs"} <= execution_columns
+    assert "ix_executions_status_created" in {index["name"] for index in inspector.get_indexes("executions")}
+    assert "execution_jobs" in inspector.get_table_names()
+
+    with engine.connect() as conn:
+        # Existing rows get the column's default
+        assert conn.execute(text("SELECT llm_cache_enabled FROM crews WHERE id = 'c'")).scalar() == 0
+        assert conn.execute(text("SELECT max_parallel_tasks FROM executions WHERE id = 'e'")).scalar() is None
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import uuid
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.database import SessionLocal, Crew, Agent, Task, Execution, TaskResult
+from app.core.http_client import http_client_manager
+from app.core.websocket_manager import websocket_manager
+from app.services.execution_service import ExecutionService
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Mock Cerebras endpoint streaming a short answer; counts the requests it serves"""
+    state = {"requests": 0}
+
+    def handler(request):
+        state["requests"] += 1
+        body = (
+            "data: " + json.dumps({"choices": [{"delta": {"content": "live answer"}}]}) + "\n\n"
+            "data: " + json.dumps({"choices": [{"delta": {}}], "usage": {"prompt_tokens": 60, "completion_tokens": 40, "total_tokens": 100}}) + "\n\n"
+            "data: [DONE]\n\n"
+        )
+        return httpx.Response(200, content=body.encode(), headers={"content-type": "text/event-stream"})
+
+    async def send_to_execution(channel, message):
+        pass
+
+    monkeypatch.setattr(settings, "TASK_MEMO_ENABLED", True)
+    monkeypatch.setattr(http_client_manager, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(websocket_manager, "send_to_execution", send_to_execution)
+    return state
+
+def create_crew(llm_cache_enabled: bool) -> str:
+    db = SessionLocal()
+    try:
+        crew_id = str(uuid.uuid4())
+        agent_id = str(uuid.uuid4())
+        db.add(Crew(id=crew_id, name="crew", llm_cache_enabled=llm_cache_enabled))
+        db.add(Agent(id=agent_id, crew_id=crew_id, name="writer", role="writer", goal="write", temperature=0.7))
+        db.add(Task(id=str(uuid.uuid4()), crew_id=crew_id, name="draft", description=f"draft {crew_id}", expected_output="e", assigned_agent=agent_id))
+        db.commit()
+        return crew_id
+    finally:
+        db.close()
+
+def run(crew_id: str, mock_mode: bool = False) -> Execution:
+    db = SessionLocal()
+    try:
+        execution_id = str(uuid.uuid4())
+        db.add(Execution(id=execution_id, crew_id=crew_id, status="pending"))
+        db.commit()
+        service = ExecutionService(db)
+        if mock_mode:
+            service.cerebras_service.mock_mode = service.cerebras_service.offline = True
+        asyncio.run(service.run_execution(execution_id))
+        db.expire_all()
+        return db.get(Execution, execution_id)
+    finally:
+        db.close()
+
+def memoized(crew_id: str) -> int:
+    db = SessionLocal()
+    try:
+        return db.query(TaskResult).filter(TaskResult.crew_id == crew_id).count()
+    finally:
+        db.close()
+
+def test_mock_outputs_are_never_memoized(llm):
+    crew_id = create_crew(llm_cache_enabled=True)
+    assert run(crew_id, mock_mode=True).status == "completed"
+    assert memoized(crew_id) == 0
+
+    # Once a key is configured the task runs against the model
+    execution = run(crew_id)
+    assert llm["requests"] == 1
+    assert execution.tokens_used == 100
+
+def test_sampled_outputs_are_memoized_only_when_the_crew_enables_caching(llm):
+    opted_out = create_crew(llm_cache_enabled=False)
+    run(opted_out)
+    run(opted_out)
+    assert llm["requests"] == 2
+    assert memoized(opted_out) == 0
+
+    opted_in = create_crew(llm_cache_enabled=True)
+    run(opted_in)
+    execution = run(opted_in)
+    assert llm["requests"] == 3
+    assert memoized(opted_in) == 1 and execution.tokens_used == 0
@@ -164,10 +164,10 @@ const Executions = () => {
                 </div>
               </div>
               
-              {execution.result && (
+              {(execution.result_preview || execution.result) && (
                 <div className="mt-4 p-4 bg-slate-50 dark:bg-slate-700/50 rounded-xl">
                   <p className="text-sm text-slate-600 dark:text-slate-400 line-clamp-2">
-                    {execution.result}
+                    {execution.result_preview || execution.result}
                   </p>
                 </div>
               )}